@@ -0,0 +1,148 @@
+"""
+anomaly.py — Weekday-adjusted spike flags on daily event counts.
+
+All series (the city total, every neighborhood, the most common
+categories) share one (series × day) count matrix built with a single
+bincount. Each day's baseline is the mean of the same weekday over the
+previous BASELINE_WEEKS weeks: the matrix is folded to (series × week ×
+weekday) and every trailing window is a difference of two cumulative
+sums, so the cost is one pass whatever the window length.
+
+Residuals are scaled for count noise, (x - b) / √(b + 1), and turned into
+robust z-scores per series with the median and MAD of that series'
+residuals. The median and MAD skip days that are empty with an all-zero
+baseline, so an empty lead-in (e.g. before one stray old record) can't
+shrink the scale to zero. A day is flagged when z ≥ Z_THRESHOLD, the count
+is at least MIN_COUNT and above the baseline. `years` clips the day axis to
+the analysis window:
+
+    alerts = detect(df["occurred_at"], {"neighborhood": hoods, "category": df["offense"]},
+                    since=pd.Timestamp("2025-01-01"), years=(2020, 2025))
+    # [{"date": "2025-03-14", "series": "neighborhood", "key": "35",
+    #   "count": 41, "expected": 12.4, "z": 6.2}, ...]   newest first
+"""
+
+import numpy as np
+import pandas as pd
+
+BASELINE_WEEKS = 8
+MIN_WEEKS = 4  # days with less same-weekday history get no baseline
+Z_THRESHOLD = 3.5
+MIN_COUNT = 5
+MAX_CATEGORIES = 20  # category series kept (most common); neighborhoods are all kept
+MAX_ALERTS = 200
+CITY = "city"
+
+
+def daily_matrix(
+    times: pd.Series,
+    groups: dict[str, pd.Series],
+    max_keys: dict[str, int | None] | None = None,
+    years: tuple[int, int] | None = None,
+) -> tuple[np.ndarray, list[tuple[str, str]], pd.Timestamp]:
+    """(series × day) counts, (kind, key) per row, and the first day.
+
+    Row 0 is the city total; then each kind's keys, most common first,
+    limited to max_keys[kind] when given. Events outside `years`
+    (inclusive) are left out.
+    """
+    max_keys = max_keys or {}
+    valid = (times.notna() if years is None else times.dt.year.between(*years)).to_numpy()
+    day = times[valid].dt.floor("D")
+    first = day.min()
+    day_codes = ((day - first) // pd.Timedelta(days=1)).to_numpy(dtype="int64")
+    n_days = int(day_codes.max()) + 1 if len(day_codes) else 0
+
+    labels = [(CITY, "all")]
+    row_codes = [np.zeros(len(day_codes), dtype="int64")]
+    day_parts = [day_codes]
+    for kind, values in groups.items():
+        values = values[valid].fillna("").astype(str)
+        ranked = values[values != ""].value_counts(sort=False).sort_values(ascending=False, kind="stable")
+        keep = list(ranked.index[:max_keys.get(kind, None)])
+        codes = pd.Categorical(values, categories=keep).codes.astype("int64")
+        hit = codes >= 0
+        row_codes.append(codes[hit] + len(labels))
+        day_parts.append(day_codes[hit])
+        labels += [(kind, k) for k in keep]
+
+    flat = np.concatenate(row_codes) * n_days + np.concatenate(day_parts)
+    counts = np.bincount(flat, minlength=len(labels) * n_days).reshape(len(labels), n_days)
+    return counts, labels, first
+
+
+def baseline(counts: np.ndarray, weeks: int = BASELINE_WEEKS, min_weeks: int = MIN_WEEKS) -> np.ndarray:
+    """Mean of the same weekday over the previous `weeks` weeks (NaN with < min_weeks of history)."""
+    n, n_days = counts.shape
+    n_weeks = -(-n_days // 7)
+    folded = np.zeros((n, n_weeks * 7))
+    folded[:, :n_days] = counts
+    folded = folded.reshape(n, n_weeks, 7)
+
+    # csum[:, w] = sum of weeks < w for each weekday column
+    csum = np.zeros((n, n_weeks + 1, 7))
+    np.cumsum(folded, axis=1, out=csum[:, 1:])
+    w = np.arange(n_weeks)
+    start = np.maximum(w - weeks, 0)
+    history = w - start
+    window = csum[:, w] - csum[:, start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where((history >= min_weeks)[None, :, None], window / history[None, :, None], np.nan)
+    return mean.reshape(n, -1)[:, :n_days]
+
+
+def robust_z(counts: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """Per-series robust z of the noise-scaled residuals (NaN where there is no baseline).
+
+    Days with no events and an all-zero baseline (e.g. before a series'
+    data starts) have a residual of exactly 0 by construction and are left
+    out of the median/MAD.
+    """
+    resid = (counts - expected) / np.sqrt(expected + 1)
+    informative = np.where((counts == 0) & (expected == 0), np.nan, resid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        med = np.nanmedian(informative, axis=1, keepdims=True)
+        dev = np.abs(informative - med)
+        scale = 1.4826 * np.nanmedian(dev, axis=1, keepdims=True)
+        # Mostly-zero series have MAD 0; fall back to the mean absolute deviation
+        scale = np.where(scale > 0, scale, 1.2533 * np.nanmean(dev, axis=1, keepdims=True))
+        return np.where(scale > 0, (resid - med) / scale, np.nan)
+
+
+def detect(
+    times: pd.Series,
+    groups: dict[str, pd.Series],
+    since: pd.Timestamp | None = None,
+    max_keys: dict[str, int | None] | None = None,
+    max_alerts: int = MAX_ALERTS,
+    years: tuple[int, int] | None = None,
+) -> list[dict]:
+    """Flagged (day, series) spikes on or after `since`, strongest `max_alerts`, newest first."""
+    in_range = times.notna() if years is None else times.dt.year.between(*years)
+    if not in_range.any():
+        return []
+    if max_keys is None:
+        max_keys = {"category": MAX_CATEGORIES}
+    counts, labels, first = daily_matrix(times, groups, max_keys, years)
+    expected = baseline(counts)
+    z = robust_z(counts, expected)
+    hits = (z >= Z_THRESHOLD) & (counts >= MIN_COUNT) & (counts > expected)
+    if since is not None:
+        hits[:, : max(0, (since - first).days)] = False
+
+    rows, days = np.nonzero(hits)
+    strongest = np.argsort(-z[rows, days], kind="stable")[:max_alerts]
+    rows, days = rows[strongest], days[strongest]
+    newest = np.lexsort((-z[rows, days], -days))
+    dates = (first + pd.to_timedelta(days[newest], unit="D")).strftime("%Y-%m-%d")
+    return [
+        {
+            "date": date,
+            "series": labels[r][0],
+            "key": labels[r][1],
+            "count": int(counts[r, d]),
+            "expected": round(float(expected[r, d]), 1),
+            "z": round(float(z[r, d]), 1),
+        }
+        for date, r, d in zip(dates, rows[newest], days[newest])
+    ]
@@ -0,0 +1,133 @@
+"""
+areal.py — Area-weighted areal interpolation between two polygon layers.
+
+A sparse target × source matrix of intersection areas is built once per pair
+of layers: an STRtree query finds the candidate (source, target) pairs, and
+shapely's vectorized intersection/area overlays them in a projected CRS.
+After that, moving any source attribute (tract rent, poverty, vehicle access)
+to the targets (neighborhoods) is one sparse matrix-vector product:
+
+    weights = ArealWeights.from_frames(tracts, "GEOID", nhds, "NHD_NUM", cache_dir=CACHE_DIR)
+    pop = weights.extensive(tracts["pop"])           # counts: split by area share
+    rent = weights.intensive({"29510101100": 850})   # rates/medians: area-weighted mean
+
+The matrix is cached as .npz under data/cache/, named by a hash of both
+layers' geometries and ids, so unchanged boundaries skip the overlay.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import shapely
+from scipy import sparse
+
+PROJECTED_CRS = "EPSG:26915"  # NAD83 / UTM zone 15N (meters), covers St. Louis
+
+
+class ArealWeights:
+    def __init__(self, overlap: sparse.csr_matrix, source_ids: np.ndarray, target_ids: np.ndarray, source_area: np.ndarray):
+        self.overlap = overlap.tocsr()  # (n_targets × n_sources) intersection areas
+        self.source_ids = np.asarray(source_ids)
+        self.target_ids = np.asarray(target_ids)
+        self.source_area = np.asarray(source_area, dtype="float64")
+
+    # ── Construction ──
+
+    @classmethod
+    def from_geometries(cls, sources, source_ids, targets, target_ids) -> "ArealWeights":
+        """Overlay two arrays of projected shapely polygons."""
+        sources = np.asarray(sources)
+        targets = np.asarray(targets)
+        src_idx, tgt_idx = shapely.STRtree(targets).query(sources, predicate="intersects")
+        areas = shapely.area(shapely.intersection(sources[src_idx], targets[tgt_idx]))
+        keep = areas > 0  # drop boundary-only touches
+        overlap = sparse.csr_matrix(
+            (areas[keep], (tgt_idx[keep], src_idx[keep])), shape=(len(targets), len(sources))
+        )
+        return cls(overlap, source_ids, target_ids, shapely.area(sources))
+
+    @classmethod
+    def from_frames(
+        cls,
+        sources,
+        source_id: str,
+        targets,
+        target_id: str,
+        cache_dir: Path | None = None,
+        crs: str = PROJECTED_CRS,
+    ) -> "ArealWeights":
+        """Build (or load from cache) the weights for two GeoDataFrames."""
+        src = sources.to_crs(crs) if sources.crs else sources
+        tgt = targets.to_crs(crs) if targets.crs else targets
+        src_ids = src[source_id].astype(str).to_numpy()
+        tgt_ids = tgt[target_id].astype(str).to_numpy()
+
+        cache_path = None
+        if cache_dir is not None:
+            digest = hashlib.sha256(crs.encode())
+            for ids, geoms in ((src_ids, src.geometry), (tgt_ids, tgt.geometry)):
+                digest.update("\0".join(ids).encode())
+                for wkb in shapely.to_wkb(geoms.to_numpy()):
+                    digest.update(wkb)
+            cache_path = cache_dir / f"areal-{digest.hexdigest()[:16]}.npz"
+            if cache_path.exists():
+                return cls.load(cache_path)
+
+        weights = cls.from_geometries(src.geometry.to_numpy(), src_ids, tgt.geometry.to_numpy(), tgt_ids)
+        if cache_path is not None:
+            weights.save(cache_path)
+        return weights
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        m = self.overlap
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp,
+            data=m.data, indices=m.indices, indptr=m.indptr, shape=np.array(m.shape),
+            source_ids=self.source_ids, target_ids=self.target_ids, source_area=self.source_area,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ArealWeights":
+        with np.load(path) as z:
+            overlap = sparse.csr_matrix((z["data"], z["indices"], z["indptr"]), shape=tuple(z["shape"]))
+            return cls(overlap, z["source_ids"], z["target_ids"], z["source_area"])
+
+    # ── Interpolation ──
+
+    def _align(self, values) -> np.ndarray:
+        """Source values in matrix column order: a {source_id: value} dict or an array in source order."""
+        if isinstance(values, dict):
+            values = [values.get(i) for i in self.source_ids]
+        return np.array([np.nan if v is None else v for v in values], dtype="float64")
+
+    def share(self) -> sparse.csr_matrix:
+        """Fraction of each source's area that falls in each target."""
+        return sparse.csr_matrix(self.overlap.multiply(1.0 / np.where(self.source_area > 0, self.source_area, 1.0)))
+
+    def extensive(self, values) -> np.ndarray:
+        """Counts (population, units): each source split across targets by area share."""
+        v = np.nan_to_num(self._align(values))
+        return self.share() @ v
+
+    def intensive(self, values) -> np.ndarray:
+        """Rates/medians: area-weighted mean over the sources covering each target.
+
+        Sources with NaN are left out of the weights; targets with no valid
+        source get NaN.
+        """
+        v = self._align(values)
+        valid = ~np.isnan(v)
+        num = self.overlap @ np.where(valid, v, 0.0)
+        den = self.overlap @ valid.astype("float64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(den > 0, num / den, np.nan)
+
+    def source_counts(self, min_share: float = 0.01) -> np.ndarray:
+        """Per target, how many sources have at least `min_share` of their area in it."""
+        share = self.share()
+        share.data = (share.data >= min_share).astype("float64")
+        return np.asarray(share.sum(axis=1)).ravel().astype(int)
@@ -0,0 +1,137 @@
+"""
+census_scraper.py — Concurrent scraper for the City of STL neighborhood census pages.
+
+Each of the 79 neighborhoods has one page per census year. Instead of
+building a full BeautifulSoup tree and flattening it to text, a small
+streaming HTMLParser collects only the <h1> title and table cells, and
+turns every table row into a label → value record at fetch time:
+
+    <tr><td>Total Population</td><td>7,734</td><td>100.0%</td></tr>
+      → {"total population": 7734}
+
+Raw HTML is cached under data/raw/demographics_html/, so re-running the
+parser (or the clean step) never touches the network.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable
+
+BASE_URL = "https://www.stlouis-mo.gov/government/departments/planning/research/census/data/neighborhoods/neighborhood.cfm"
+NEIGHBORHOODS = range(1, 80)
+CENSUS_YEARS = (2020, 2010)
+
+_INT_RE = re.compile(r"^-?[\d,]+$")
+
+
+class CensusPageParser(HTMLParser):
+    """Collects the page title and the text of every table row's cells."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.tables = 0
+        self.rows: list[list[str]] = []
+        self._in_h1 = False
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "h1" and not self.title:
+            self._in_h1 = True
+        elif tag == "table":
+            self.tables += 1
+        elif tag == "tr":
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == "h1":
+            self._in_h1 = False
+        elif tag in ("td", "th") and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if any(self._row):
+                self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+        elif self._in_h1:
+            self.title += data
+
+
+def parse_census_page(html: str) -> dict:
+    """Parse one census page into {"name", "tables_found", "values"}.
+
+    `values` maps the lowercased row label to the first integer cell after it.
+    Labels repeat across sections (e.g. "White alone" under total population
+    and again under 18+); the first occurrence wins, which is the
+    total-population section.
+    """
+    parser = CensusPageParser()
+    parser.feed(html)
+    parser.close()
+
+    values: dict[str, int] = {}
+    for row in parser.rows:
+        label = row[0].strip()
+        if not label or _INT_RE.match(label):
+            continue
+        for cell in row[1:]:
+            if _INT_RE.match(cell):
+                values.setdefault(label.lower(), int(cell.replace(",", "")))
+                break
+
+    name = " ".join(parser.title.split())
+    name = re.sub(r"\s*-?\s*Census\s*Data.*", "", name, flags=re.IGNORECASE).strip()
+    return {"name": name, "tables_found": parser.tables, "values": values}
+
+
+def scrape_neighborhoods(
+    get: Callable[..., object],
+    cache_dir: Path,
+    workers: int = 8,
+    refresh: bool = False,
+) -> dict[str, dict]:
+    """Fetch (or read cached) pages for every neighborhood × census year.
+
+    `get` is a requests-style callable returning an object with `.text`
+    (e.g. Downloader.get). Returns {nhd_id: {"name", "tables_found",
+    "values_2020", "values_2010"}}.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def load(key: tuple[int, int]) -> tuple[tuple[int, int], dict | None, str]:
+        num, year = key
+        cached = cache_dir / f"{num:02d}_{year}.html"
+        try:
+            if refresh or not cached.exists():
+                resp = get(f"{BASE_URL}?number={num}&censusYear={year}", timeout=30)
+                cached.write_text(resp.text, encoding="utf-8")
+            html = cached.read_text(encoding="utf-8")
+            return key, parse_census_page(html), ""
+        except Exception as e:
+            return key, None, str(e)
+
+    keys = [(num, year) for num in NEIGHBORHOODS for year in CENSUS_YEARS]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(load, keys))
+
+    out: dict[str, dict] = {}
+    for (num, year), page, error in pages:
+        nhd_id = str(num).zfill(2)
+        entry = out.setdefault(nhd_id, {})
+        if page is None:
+            print(f"    Failed NHD {nhd_id} ({year}): {error}")
+            continue
+        if year == 2020:
+            entry["name"] = page["name"] or f"Neighborhood {nhd_id}"
+            entry["tables_found"] = page["tables_found"]
+        entry[f"values_{year}"] = page["values"]
+    return out
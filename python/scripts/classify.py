@@ -0,0 +1,64 @@
+"""
+classify.py — Keyword taxonomy classifier for free-text categories.
+
+A taxonomy is an ordered {category: [keywords]} dict; a text belongs to the
+first category any of whose keywords appears in it (case-insensitive
+substring), or to the default. The whole taxonomy is compiled into one
+regex: a lookahead at every position with one capture group per category,
+alternatives in priority order, so a single scan finds the best category
+without looping over keyword lists.
+
+Results are memoized per distinct string, and Series are classified by
+their unique values only. Category IDs are positions in the taxonomy (the
+default is last), so they're stable across runs and datasets:
+
+    arpa = KeywordClassifier(ARPA_CATEGORIES)
+    arpa.label("COVID-19 Vaccine Outreach")   # "Health"
+    df["category"] = arpa.categorize(df["title"])   # pandas Categorical
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class KeywordClassifier:
+    def __init__(self, taxonomy: dict[str, list[str]], default: str = "Other"):
+        self.labels: list[str] = [*taxonomy, default]
+        self.default_id = len(taxonomy)
+        # At each position the first group that matches wins, i.e. the
+        # highest-priority category with a keyword starting there
+        groups = ["(" + "|".join(re.escape(kw) for kw in keywords) + ")" for keywords in taxonomy.values()]
+        self.pattern = re.compile("(?=" + "|".join(groups) + ")", re.IGNORECASE) if groups else None
+        self._cache: dict[str, int] = {}
+
+    def classify(self, text) -> int:
+        """Category ID of one string (memoized)."""
+        if not isinstance(text, str):
+            return self.default_id
+        cid = self._cache.get(text)
+        if cid is None:
+            cid = self.default_id
+            if self.pattern is not None:
+                for m in self.pattern.finditer(text):
+                    cid = min(cid, m.lastindex - 1)
+                    if cid == 0:
+                        break
+            self._cache[text] = cid
+        return cid
+
+    def label(self, text) -> str:
+        return self.labels[self.classify(text)]
+
+    def codes(self, values: pd.Series) -> np.ndarray:
+        """Category IDs for a Series, classifying each distinct value once."""
+        idx, uniques = pd.factorize(values, use_na_sentinel=True)
+        ids = np.fromiter((self.classify(u) for u in uniques), dtype="int16", count=len(uniques))
+        return np.where(idx >= 0, ids[idx] if len(ids) else self.default_id, self.default_id).astype("int16")
+
+    def categorize(self, values: pd.Series) -> pd.Series:
+        """Categorical Series of labels, with categories in taxonomy order."""
+        return pd.Series(
+            pd.Categorical.from_codes(self.codes(values), categories=self.labels), index=values.index
+        )
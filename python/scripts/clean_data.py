@@ -10,20 +10,22 @@ Usage:
   uv run python scripts/fetch_raw.py   # download first (if not already done)
   uv run python scripts/clean_data.py  # then process
 
-Set DATA_YEAR env var to change the target year (default: 2025).
+Set DATA_YEAR env var to change the target year (default: 2025), and
+HISTORY_YEARS for how many years the all-years outputs keep (default: 6).
+Weather comes from the local store in data/weather/; set WEATHER_OFFLINE=1
+to skip the network, or WEATHER_FIXTURE=<file.json> to use a fixture instead.
 """
 
 import csv
-import io
 import json
 import math
 import os
 import re
 import shutil
 import sys
-import zipfile
-from collections import Counter, defaultdict
-from datetime import datetime
+import tempfile
+from collections import defaultdict
+from datetime import date
 from pathlib import Path
 
 try:
@@ -37,15 +39,25 @@ except ImportError:
     sys.exit("Missing dependency: uv sync")
 
 try:
-    import openpyxl
+    import pandas as pd
 except ImportError:
     sys.exit("Missing dependency: uv sync")
 
+from areal import ArealWeights
+from classify import KeywordClassifier
+from cube import build_cube
+from raw_store import RawStore
+from sketch import SketchGroup
+from weather_store import WeatherStore
+from xlsx_extract import extract_columns
+
 # ── Config ───────────────────────────────────────────────────────────────────
 
 PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
 ROOT = PYTHON_DIR.parent  # repo root
 RAW_DIR = PYTHON_DIR / "data" / "raw"
+CACHE_DIR = PYTHON_DIR / "data" / "cache"
+WEATHER_DIR = PYTHON_DIR / "data" / "weather"
 OUT_DIR = ROOT / "public" / "data"
 
 # Load .env from repo root
@@ -58,10 +70,17 @@ if _dotenv.exists():
             os.environ.setdefault(key.strip(), val.strip())
 
 YEAR = int(os.environ.get("DATA_YEAR", "2025"))
+# Years kept in the all-years products (cubes, forecasts, alerts, density);
+# the window runs through the current year, and rows dated outside it are dropped
+HISTORY_YEARS = int(os.environ.get("HISTORY_YEARS", "6"))
+YEARS = (YEAR - HISTORY_YEARS + 1, max(YEAR, date.today().year))
 ACS_YEAR = int(os.environ.get("ACS_YEAR", "2022"))  # ACS data lags ~2 years
 
 STL_COUNTY_FIPS = "29510"
 
+# Reads CSVs/shapefiles straight from the downloaded zips (no extraction)
+STORE = RawStore(RAW_DIR)
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 def log(msg: str):
@@ -74,25 +93,24 @@ def require_raw(path: Path, name: str):
         sys.exit(f"Missing raw data: {path}\nRun `uv run python scripts/fetch_raw.py` first.")
 
 
-def web_mercator_to_lnglat(x: float, y: float) -> tuple[float, float]:
-    """Convert Web Mercator (EPSG:3857) coordinates to lon/lat (EPSG:4326)."""
-    lng = x * 180.0 / 20037508.34
-    lat = math.atan(math.exp(y * math.pi / 20037508.34)) * 360.0 / math.pi - 90.0
-    return lng, lat
+def require_dataset(dataset: str):
+    """Exit with a helpful message if a raw archive (or its extracted dir) is missing."""
+    if not STORE.exists(dataset):
+        sys.exit(f"Missing raw data: {dataset}\nRun `uv run python scripts/fetch_raw.py` first.")
 
 
-def shapefile_to_geojson(shp_path: str) -> dict:
-    """Convert a shapefile to GeoJSON FeatureCollection."""
-    sf = shapefile.Reader(shp_path)
-    fields = [f[0] for f in sf.fields[1:]]
+def shapefile_to_geojson(dataset: str) -> dict:
+    """Convert a raw dataset's shapefile to GeoJSON FeatureCollection."""
     features = []
-    for sr in sf.shapeRecords():
-        props = dict(zip(fields, sr.record))
-        for k, v in props.items():
-            if isinstance(v, (bytes, bytearray)):
-                props[k] = v.decode("utf-8", errors="replace")
-        geom = sr.shape.__geo_interface__
-        features.append({"type": "Feature", "properties": props, "geometry": geom})
+    with STORE.shapefile_reader(dataset) as sf:
+        fields = [f[0] for f in sf.fields[1:]]
+        for sr in sf.iterShapeRecords():
+            props = dict(zip(fields, sr.record))
+            for k, v in props.items():
+                if isinstance(v, (bytes, bytearray)):
+                    props[k] = v.decode("utf-8", errors="replace")
+            geom = sr.shape.__geo_interface__
+            features.append({"type": "Feature", "properties": props, "geometry": geom})
     return {"type": "FeatureCollection", "features": features}
 
 
@@ -110,193 +128,281 @@ def safe_float(v, default=0.0):
         return default
 
 
-# ── 1. CSB 311 Data ──────────────────────────────────────────────────────────
+def count_dict(values: "pd.Series", sort_keys: bool = False) -> dict:
+    """Counter-style {str(key): count}, most common first (or sorted by key).
 
-def process_csb() -> None:
-    """Process CSB 311 complaint CSVs from raw data."""
-    csb_dir = RAW_DIR / "csb"
-    require_raw(csb_dir, "CSB")
+    Ties keep first-seen order, like Counter.most_common.
+    """
+    counts = values.dropna().value_counts(sort=False)
+    counts = counts.sort_index() if sort_keys else counts.sort_values(ascending=False, kind="stable")
+    return {str(k): int(v) for k, v in counts.items()}
 
-    csv_files = list(csb_dir.rglob("*.csv"))
-    if not csv_files:
-        sys.exit("No CSV files found in raw/csb/")
 
-    log(f"Found {len(csv_files)} CSV file(s), parsing...")
+def top_per_group(groups: "pd.Series", values: "pd.Series", n: int) -> dict:
+    """{group: {value: count}} keeping the n most common values per group."""
+    frame = pd.DataFrame({"g": groups, "v": values}).dropna()
+    counts = frame.value_counts(["g", "v"], sort=False).sort_values(ascending=False, kind="stable")
+    out: dict = {}
+    for (g, v), c in counts.groupby(level=0, sort=False).head(n).items():
+        out.setdefault(g, {})[v] = int(c)
+    return out
 
-    all_rows = []
-    for cf in csv_files:
-        with open(cf, "r", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                all_rows.append(row)
-
-    log(f"Total rows: {len(all_rows):,}")
-
-    # Identify columns
-    sample = all_rows[0] if all_rows else {}
-    date_col = next((k for k in sample if k.upper() == "DATETIMEINIT"), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower() and "request" in k.lower()), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower() and "init" in k.lower()), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower()), None)
-    cat_col = next((k for k in sample if k.upper() == "PROBLEMCODE"), None)
-    if not cat_col:
-        cat_col = next((k for k in sample if "problem" in k.lower() or "category" in k.lower()), None)
-    if not cat_col:
-        cat_col = next((k for k in sample if "type" in k.lower()), None)
-    status_col = next((k for k in sample if "status" in k.lower()), None)
-    hood_col = next((k for k in sample if "neighborhood" in k.lower() or "nhd" in k.lower()), None)
-    lat_col = next((k for k in sample if k.lower() in ("latitude", "lat", "y")), None)
-    lng_col = next((k for k in sample if k.lower() in ("longitude", "lng", "lon", "long", "x")), None)
-    srx_col = next((k for k in sample if k.upper() == "SRX"), None)
-    sry_col = next((k for k in sample if k.upper() == "SRY"), None)
-    close_date_col = next((k for k in sample if k.upper() == "DATETIMECLOSED"), None)
-    if not close_date_col:
-        close_date_col = next((k for k in sample if "close" in k.lower() and "date" in k.lower()), None)
-
-    coords_src = "lat/lon" if (lat_col and lng_col) else ("SRX/SRY" if (srx_col and sry_col) else "none")
-    log(f"Columns: date={date_col}, category={cat_col}, status={status_col}, hood={hood_col}, coords={coords_src}")
-
-    def parse_date(s: str) -> str | None:
-        if not s:
-            return None
-        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-        return None
 
-    def parse_datetime(s: str) -> datetime | None:
-        if not s:
-            return None
-        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt)
-            except ValueError:
-                continue
+def nhd_key(key: str) -> str:
+    """Zero-padded NHD_NUM for numeric keys, the key itself otherwise."""
+    try:
+        return str(int(key)).zfill(2)
+    except (ValueError, TypeError):
+        return key
+
+
+def in_stl_bbox(df: "pd.DataFrame") -> "pd.Series":
+    return df["lat"].between(38.0, 39.0, inclusive="neither") & df["lng"].between(-91.0, -89.0, inclusive="neither")
+
+
+def hood_keys(names: "pd.Series") -> "pd.Series":
+    """nhd_key() per row, computed once per distinct value."""
+    names = names.fillna("")
+    return names.map({n: nhd_key(n) for n in names.unique()})
+
+
+def neighborhood_weights():
+    """Queen-contiguity SpatialWeights of neighborhoods.geojson keyed by nhd_key(NHD_NUM), or None."""
+    import shapely.geometry
+    from hotspots import SpatialWeights
+
+    path = OUT_DIR / "neighborhoods.geojson"
+    if not path.exists():
         return None
+    with open(path) as f:
+        features = [ft for ft in json.load(f)["features"] if ft.get("geometry")]
+    keys = [nhd_key(ft["properties"].get("NHD_NUM")) for ft in features]
+    shapes = [shapely.geometry.shape(ft["geometry"]) for ft in features]
+    return SpatialWeights.queen(shapes, keys, cache_dir=CACHE_DIR)
 
-    # Filter to target year
-    year_rows = []
-    for row in all_rows:
-        d = parse_date(row.get(date_col, "")) if date_col else None
-        if d and d.startswith(str(YEAR)):
-            year_rows.append(row)
 
+def write_cube(name: str, timestamps: "pd.Series", hoods: "pd.Series", categories: "pd.Series") -> tuple[dict, dict]:
+    """Write <name>_cube.json (see cube.py) for the YEARS window of a dataset, with Gi* per cell.
+
+    Returns the cube and the per-neighborhood Gi* summary for YEAR
+    (hotspots.cube_hotspots), empty when neighborhoods.geojson has not been
+    written yet.
+    """
+    from hotspots import cube_hotspots
+
+    cube = build_cube(timestamps, hoods, categories, years=YEARS)
+    if cube["outOfRange"]:
+        log(f"{name} cube: left out {cube['outOfRange']:,} rows dated outside {YEARS[0]}–{YEARS[1]}")
+    weights = neighborhood_weights()
+    if weights is None:
+        log("No neighborhoods.geojson — skipping Gi* hotspots (run the neighborhoods step first)")
+    hotspots = cube_hotspots(cube, weights, YEAR) if weights is not None else {}
+    out_path = OUT_DIR / f"{name}_cube.json"
+    with open(out_path, "w") as f:
+        json.dump(cube, f, separators=(",", ":"))
+    log(f"Wrote {out_path.name}: {' × '.join(map(str, cube.get('shape', [0])))} cells "
+        f"({out_path.stat().st_size // 1024}KB)")
+    return cube, hotspots
+
+
+FORECAST_MONTHS = 6
+
+
+def cube_forecasts(cube: dict, last_seen: "pd.Timestamp") -> dict:
+    """Next FORECAST_MONTHS of every cube series (forecast.py); an incomplete last month is left out."""
+    from forecast import cube_forecast
+
+    # Only the cube's own last month can be partial (last_seen may be a stray date past the window)
+    partial = (
+        pd.notna(last_seen) and bool(cube.get("months"))
+        and last_seen.strftime("%Y-%m") == cube["months"][-1]
+        and (last_seen + pd.Timedelta(days=1)).month == last_seen.month
+    )
+    forecasts = cube_forecast(cube, FORECAST_MONTHS, drop_last=partial)
+    if forecasts:
+        log(f"Forecast {forecasts['months'][0]}..{forecasts['months'][-1]} for "
+            f"{1 + len(forecasts['categories']) * (1 + len(forecasts['neighborhoods'])) + len(forecasts['neighborhoods']):,} series")
+    return forecasts
+
+
+def hood_forecast(forecasts: dict, key: str, top: dict) -> dict:
+    """{"forecast": …} for one neighborhood, keeping category series only for its `top` categories."""
+    fc = forecasts.get("neighborhoods", {}).get(key)
+    if fc is None:
+        return {}
+    return {"forecast": {**fc, "categories": {c: v for c, v in fc["categories"].items() if c in top}}}
+
+
+def city_forecast(forecasts: dict) -> dict | None:
+    return {k: v for k, v in forecasts.items() if k != "neighborhoods"} or None
+
+
+def daily_alerts(times: "pd.Series", hoods: "pd.Series", categories: "pd.Series", since: "pd.Timestamp") -> list[dict]:
+    """Weekday-adjusted daily spike alerts (anomaly.py) from `since` on; baselines use the YEARS window."""
+    from anomaly import detect
+
+    since = since.normalize() if pd.notna(since) else None
+    alerts = detect(times, {"neighborhood": hoods, "category": categories}, since=since, years=YEARS)
+    log(f"Daily anomaly alerts: {len(alerts)}")
+    return alerts
+
+
+# ── 1. CSB 311 Data ──────────────────────────────────────────────────────────
+
+# Raw PROBLEMCODEs (e.g. "WTR-LEAK", "VACANT-BLDG") rolled up into groups.
+# Checked in order, so "STREETLIGHT-OUT" is a light and "STREET-SWEEP" a
+# street, not a tree.
+CSB_GROUPS = {
+    "Vacant Property": ["vacant", "vac-", "board-up", "boarding"],
+    "Trash & Dumping": ["refuse", "trash", "debris", "dump", "bulk", "litter"],
+    "Lights & Signals": ["light", "signal", "sign-"],
+    "Streets & Sidewalks": ["street", "pothole", "sidewalk", "curb", "alley", "pavement"],
+    "Weeds & Trees": ["weed", "grass", "tree", "forestry", "brush"],
+    "Water & Sewer": ["wtr", "water", "sewer", "leak", "hydrant", "drain"],
+    "Animals & Pests": ["rodent", "animal", "dog", "pest", "mosquito"],
+    "Vehicles & Parking": ["vehicle", "veh-", "parking", "auto"],
+    "Building & Zoning": ["bldg", "building", "occupancy", "permit", "zoning"],
+    "Nuisance": ["noise", "nuisance", "graffiti"],
+}
+
+
+def csb_duration_sketches(year: int | None, as_of: "pd.Timestamp") -> dict[str, SketchGroup]:
+    """Resolution-time and open-ticket-age sketches (days), streamed batch by batch.
+
+    Keys: "resolution"/"openAge" × "hood"/"category"/"city". Memory is
+    bounded by the sketches, not by how many tickets the partitions hold;
+    each sketch also carries the exact mean (avgResolutionDays).
+    """
+    import pyarrow.dataset as ds
+    import staging
+
+    sketches = {f"{m}:{k}": SketchGroup() for m in ("resolution", "openAge") for k in ("hood", "category", "city")}
+    scan = staging.dataset("csb").scanner(
+        columns=["requested_at", "closed_at", "category", "status", "neighborhood"],
+        filter=(ds.field("year") == year) if year is not None else None,
+    )
+    for batch in scan.to_batches():
+        b = batch.to_pandas()
+        if b.empty:
+            continue
+        status = b["status"].fillna("").str.lower()
+        closed = status.str.contains("closed") | status.str.contains("complete")
+        res = (b["closed_at"] - b["requested_at"]).dt.total_seconds() / 86400
+        res = res.where((b["closed_at"] > b["requested_at"]) & (res < 365))
+        age = ((as_of - b["requested_at"]).dt.total_seconds() / 86400).clip(lower=0)
+        age = age.where(~closed & b["closed_at"].isna())
+
+        keys = {
+            "hood": b["neighborhood"].fillna("").replace("", None),
+            "category": b["category"].fillna("").replace("", "Unknown"),
+            "city": pd.Series("all", index=b.index),
+        }
+        for name, values in (("resolution", res), ("openAge", age)):
+            for k, key in keys.items():
+                sketches[f"{name}:{k}"].add(key, values)
+    return sketches
+
+
+def process_csb() -> None:
+    """Process CSB 311 complaints from the staged Parquet partitions."""
+    import staging
+
+    require_dataset("csb")
+    staging.ensure("csb", STORE, log=log)
+    df = staging.read(
+        "csb",
+        columns=["requested_at", "closed_at", "category", "status", "neighborhood", "lat", "lng"],
+    )
+    if df.empty:
+        sys.exit("No CSV rows found in raw csb")
+
+    log(f"Total rows: {len(df):,}")
+
+    df["category"] = df["category"].fillna("").replace("", "Unknown")
+    df["neighborhood"] = df["neighborhood"].fillna("")
+    df["date"] = df["requested_at"].dt.strftime("%Y-%m-%d")
+    df["month"] = df["date"].str[:7]
+
+    # Filter to target year
+    year_rows = df[df["requested_at"].dt.year == YEAR]
     log(f"Rows for {YEAR}: {len(year_rows):,}")
 
-    if not year_rows:
+    sketch_year = YEAR
+    if year_rows.empty:
         log(f"WARNING: No rows found for year {YEAR}. Using all data instead.")
-        year_rows = all_rows
+        year_rows = df
+        sketch_year = None
 
     # Aggregations (year-filtered for analytics)
-    categories = Counter()
-    daily_counts = Counter()
-    hourly = Counter()
-    weekday = Counter()
-    monthly = defaultdict(Counter)
-    neighborhoods = defaultdict(lambda: {
-        "name": "", "total": 0, "closed": 0, "avgResolutionDays": 0,
-        "topCategories": Counter(), "_resolution_days": [],
-    })
-
-    for row in year_rows:
-        cat = (row.get(cat_col, "") if cat_col else "").strip() or "Unknown"
-        categories[cat] += 1
-
-        date_str = parse_date(row.get(date_col, "")) if date_col else None
-        if date_str:
-            daily_counts[date_str] += 1
-            month_key = date_str[:7]
-            monthly[month_key][cat] += 1
-
-        dt = parse_datetime(row.get(date_col, "")) if date_col else None
-        if dt:
-            hourly[str(dt.hour)] += 1
-            weekday[str(dt.weekday())] += 1
-
-        # Neighborhood
-        hood_name = (row.get(hood_col, "") if hood_col else "").strip()
-        if hood_name:
-            nb = neighborhoods[hood_name]
-            nb["name"] = hood_name
-            nb["total"] += 1
-            nb["topCategories"][cat] += 1
-
-            status = (row.get(status_col, "") if status_col else "").strip().lower()
-            if "closed" in status or "complete" in status:
-                nb["closed"] += 1
-
-            if close_date_col and date_col:
-                open_dt = parse_datetime(row.get(date_col, ""))
-                close_dt = parse_datetime(row.get(close_date_col, ""))
-                if open_dt and close_dt and close_dt > open_dt:
-                    days = (close_dt - open_dt).days
-                    if days < 365:
-                        nb["_resolution_days"].append(days)
+    categories = count_dict(year_rows["category"])
+    groups = KeywordClassifier(CSB_GROUPS).categorize(year_rows["category"])
+    category_groups = {k: v for k, v in count_dict(groups).items() if v}
+    daily_counts = count_dict(year_rows["date"], sort_keys=True)
+    hourly = count_dict(year_rows["requested_at"].dt.hour.astype("Int64"), sort_keys=True)
+    weekday = count_dict(year_rows["requested_at"].dt.weekday.astype("Int64"), sort_keys=True)
+    monthly_out = dict(sorted(top_per_group(year_rows["month"], year_rows["category"], 10).items()))
+
+    # Neighborhoods — key by zero-padded NHD_NUM
+    hoods = year_rows[year_rows["neighborhood"] != ""]
+    status = hoods["status"].fillna("").str.lower()
+    stats = pd.DataFrame({
+        "hood": hoods["neighborhood"],
+        "closed": status.str.contains("closed") | status.str.contains("complete"),
+    }).groupby("hood").agg(total=("closed", "size"), closed=("closed", "sum"))
+    top_cats = top_per_group(hoods["neighborhood"], hoods["category"], 5)
+
+    # p50/p90/p99 resolution days and open-ticket age (as of the newest request), and the
+    # mean resolution days per neighborhood, all from one batched pass
+    as_of = df["requested_at"].max()
+    sketches = csb_duration_sketches(sketch_year, as_of)
+    durations = {k: g.summary() for k, g in sketches.items()}
+    avg_res = sketches["resolution:hood"].means()
+    empty = {"count": 0, "p50": None, "p90": None, "p99": None}
+
+    # csb_cube.json (YEARS window) + Gi* hotspot scores and forecasts per neighborhood
+    all_hoods = hood_keys(df["neighborhood"])
+    cube, hotspots = write_cube("csb", df["requested_at"], all_hoods, df["category"])
+    forecasts = cube_forecasts(cube, df["requested_at"].max())
+    alerts = daily_alerts(df["requested_at"], all_hoods, df["category"], year_rows["requested_at"].min())
 
-    # Heatmap points — ALL years for time slider scrubbing
-    heatmap_points = []
-    for row in all_rows:
-        cat = (row.get(cat_col, "") if cat_col else "").strip() or "Unknown"
-        date_str = parse_date(row.get(date_col, "")) if date_col else None
-        hood_name = (row.get(hood_col, "") if hood_col else "").strip()
-
-        lat, lng = None, None
-        if lat_col and lng_col:
-            try:
-                lat = float(row.get(lat_col, ""))
-                lng = float(row.get(lng_col, ""))
-            except (ValueError, TypeError):
-                pass
-        if lat is None and srx_col and sry_col:
-            try:
-                sx = float(row.get(srx_col, ""))
-                sy = float(row.get(sry_col, ""))
-                if sx != 0 and sy != 0:
-                    lng, lat = web_mercator_to_lnglat(sx, sy)
-            except (ValueError, TypeError):
-                pass
-        if lat is not None and lng is not None:
-            if 38.0 < lat < 39.0 and -91.0 < lng < -89.0:
-                heatmap_points.append([lat, lng, cat, date_str or "", hood_name])
-    log(f"Heatmap points (all years): {len(heatmap_points):,}")
-
-    # Finalize neighborhoods — key by zero-padded NHD_NUM
     final_hoods = {}
-    for key, nb in neighborhoods.items():
-        try:
-            hood_id = str(int(key)).zfill(2)
-        except (ValueError, TypeError):
-            hood_id = key  # fallback for non-numeric
-        res_days = nb.pop("_resolution_days", [])
-        avg_res = round(sum(res_days) / len(res_days), 1) if res_days else 0
-        top_cats = dict(nb["topCategories"].most_common(5))
-        final_hoods[hood_id] = {
-            "name": nb["name"],
-            "total": nb["total"],
-            "closed": nb["closed"],
-            "avgResolutionDays": avg_res,
-            "topCategories": top_cats,
+    for hood_name, row in stats.iterrows():
+        final_hoods[nhd_key(hood_name)] = {
+            "name": hood_name,
+            "total": int(row["total"]),
+            "closed": int(row["closed"]),
+            "avgResolutionDays": round(avg_res[hood_name], 1) if avg_res.get(hood_name) is not None else 0,
+            "topCategories": top_cats.get(hood_name, {}),
+            "resolutionDays": durations["resolution:hood"].get(hood_name, empty),
+            "openAgeDays": durations["openAge:hood"].get(hood_name, empty),
+            **hotspots.get(nhd_key(hood_name), {}),
+            **hood_forecast(forecasts, nhd_key(hood_name), top_cats.get(hood_name, {})),
         }
 
-    monthly_out = {}
-    for month_key, cats in sorted(monthly.items()):
-        monthly_out[month_key] = dict(cats.most_common(10))
+    # Heatmap points — ALL years for time slider scrubbing
+    pts = df.loc[in_stl_bbox(df), ["lat", "lng", "category", "date", "neighborhood"]]
+    log(f"Heatmap points (all years): {len(pts):,}")
+    pts = pts.iloc[::max(1, len(pts) // 50000)].iloc[:50000]
+    heatmap_points = pts.assign(date=pts["date"].fillna("")).values.tolist()
 
     csb_data = {
         "year": YEAR,
         "totalRequests": sum(categories.values()),
-        "categories": dict(categories.most_common()),
+        "categories": categories,
+        "categoryGroups": category_groups,
+        "resolutionDays": durations["resolution:city"].get("all", empty),
+        "openAgeDays": durations["openAge:city"].get("all", empty),
+        "openAsOf": as_of.strftime("%Y-%m-%d") if pd.notna(as_of) else None,
+        "resolutionByCategory": dict(sorted(durations["resolution:category"].items())),
+        "openAgeByCategory": dict(sorted(durations["openAge:category"].items())),
         "neighborhoods": final_hoods,
-        "dailyCounts": dict(sorted(daily_counts.items())),
-        "hourly": dict(sorted(hourly.items(), key=lambda x: int(x[0]))),
-        "weekday": dict(sorted(weekday.items(), key=lambda x: int(x[0]))),
-        "heatmapPoints": heatmap_points[::max(1, len(heatmap_points) // 50000)][:50000],
+        "dailyCounts": daily_counts,
+        "alerts": alerts,
+        "hourly": hourly,
+        "weekday": weekday,
+        "heatmapPoints": heatmap_points,
         "monthly": monthly_out,
+        "forecast": city_forecast(forecasts),
     }
 
     out_path = OUT_DIR / f"csb_{YEAR}.json"
@@ -309,26 +415,16 @@ def process_csb() -> None:
     log(f"Copied to {latest_path.name}")
 
     # ── trends.json (multi-year) ──
-    yearly_monthly = defaultdict(dict)
-    yearly_categories = defaultdict(Counter)
+    recent = df[df["requested_at"].dt.year.isin([YEAR, YEAR - 1, YEAR - 2])]
+    years = recent["requested_at"].dt.year.astype(int).astype(str)
+    yearly_monthly = {y: count_dict(g["month"], sort_keys=True) for y, g in recent.groupby(years)}
+    yearly_categories = {y: count_dict(g["category"]) for y, g in recent.groupby(years)}
 
-    for row in all_rows:
-        d = parse_date(row.get(date_col, "")) if date_col else None
-        if not d:
-            continue
-        year = d[:4]
-        if year not in (str(YEAR), str(YEAR - 1), str(YEAR - 2)):
-            continue
-        month_key = d[:7]
-        cat = (row.get(cat_col, "") if cat_col else "").strip() or "Unknown"
-        yearly_monthly[year][month_key] = yearly_monthly[year].get(month_key, 0) + 1
-        yearly_categories[year][cat] += 1
-
-    weather_data = fetch_weather(YEAR)
+    weather_data = load_weather([int(y) for y in yearly_monthly])
 
     trends = {
-        "yearlyMonthly": {y: dict(sorted(m.items())) for y, m in sorted(yearly_monthly.items())},
-        "yearlyCategories": {y: dict(c.most_common()) for y, c in sorted(yearly_categories.items())},
+        "yearlyMonthly": dict(sorted(yearly_monthly.items())),
+        "yearlyCategories": dict(sorted(yearly_categories.items())),
         "weather": weather_data,
     }
 
@@ -338,42 +434,28 @@ def process_csb() -> None:
     log(f"Wrote {out_path.name} ({out_path.stat().st_size // 1024}KB)")
 
 
-def fetch_weather(year: int) -> dict:
-    """Fetch daily weather from Open-Meteo historical API for St. Louis."""
-    if requests is None:
-        log("WARNING: requests not available, skipping weather")
-        return {}
-    log("Fetching weather data from Open-Meteo...")
-    url = (
-        f"https://archive-api.open-meteo.com/v1/archive?"
-        f"latitude=38.627&longitude=-90.199"
-        f"&start_date={year}-01-01&end_date={year}-12-31"
-        f"&daily=temperature_2m_max,temperature_2m_min,precipitation_sum"
-        f"&temperature_unit=fahrenheit&precipitation_unit=inch"
-        f"&timezone=America/Chicago"
-    )
-    try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        daily = data.get("daily", {})
-        dates = daily.get("time", [])
-        highs = daily.get("temperature_2m_max", [])
-        lows = daily.get("temperature_2m_min", [])
-        precip = daily.get("precipitation_sum", [])
-
-        weather = {}
-        for i, d in enumerate(dates):
-            weather[d] = {
-                "high": round(highs[i], 1) if highs[i] is not None else None,
-                "low": round(lows[i], 1) if lows[i] is not None else None,
-                "precip": round(precip[i], 2) if precip[i] is not None else 0,
-            }
-        log(f"Got {len(weather)} days of weather data")
-        return weather
-    except Exception as e:
-        log(f"WARNING: Could not fetch weather data: {e}")
+def load_weather(years: list[int]) -> dict:
+    """Daily St. Louis weather for `years` from the local store in data/weather/.
+
+    Only missing or recent days are fetched from Open-Meteo. WEATHER_OFFLINE=1
+    serves from disk only; WEATHER_FIXTURE=<path> serves a {date: {high, low,
+    precip}} JSON file from a throwaway store, leaving data/weather/ untouched.
+    """
+    if not years:
         return {}
+    span = (f"{min(years)}-01-01", f"{max(years)}-12-31")
+    fixture = os.environ.get("WEATHER_FIXTURE")
+    if fixture:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = WeatherStore(Path(tmp), get=None, log=log)
+            log(f"Seeded {store.seed(Path(fixture))} days of weather from {fixture}")
+            weather = store.range(*span)
+    else:
+        offline = requests is None or os.environ.get("WEATHER_OFFLINE") == "1"
+        store = WeatherStore(WEATHER_DIR, get=None if offline else requests.get, log=log)
+        weather = store.range(*span)
+    log(f"Weather: {len(weather)} days for {min(years)}–{max(years)}")
+    return weather
 
 
 # ── 2. Neighborhood Boundaries ───────────────────────────────────────────────
@@ -382,15 +464,14 @@ def process_neighborhoods() -> None:
     """Convert neighborhood shapefiles to GeoJSON (reprojected to WGS84)."""
     import geopandas as gpd
 
-    nhd_dir = RAW_DIR / "neighborhoods"
-    require_raw(nhd_dir, "neighborhoods")
+    require_dataset("neighborhoods")
 
-    shp_files = list(nhd_dir.rglob("*.shp"))
+    shp_files = STORE.members("neighborhoods", ".shp")
     if not shp_files:
-        sys.exit("No .shp files found in raw/neighborhoods/")
+        sys.exit("No .shp files found in raw neighborhoods")
 
-    log(f"Converting {shp_files[0].name} to GeoJSON...")
-    gdf = gpd.read_file(shp_files[0])
+    log(f"Converting {shp_files[0]} to GeoJSON...")
+    gdf = gpd.read_file(STORE.gdal_path("neighborhoods", shp_files[0]))
 
     if gdf.crs and gdf.crs != "EPSG:4326":
         log(f"Reprojecting from {gdf.crs} to EPSG:4326...")
@@ -409,29 +490,15 @@ def process_neighborhoods() -> None:
 
 def process_gtfs() -> None:
     """Process GTFS feed into stops, routes, shapes, stop_stats."""
-    gtfs_dir = RAW_DIR / "gtfs"
-    require_raw(gtfs_dir, "GTFS")
-
-    # Also check for the zip file directly
-    gtfs_zip = RAW_DIR / "google_transit.zip"
-    if gtfs_zip.exists():
-        zf = zipfile.ZipFile(gtfs_zip)
-    else:
-        # Look for txt files directly in the extracted dir
-        zf = None
+    require_dataset("gtfs")
 
     def open_gtfs_file(name: str):
-        if zf and name in zf.namelist():
-            return io.TextIOWrapper(zf.open(name), encoding="utf-8-sig")
-        path = gtfs_dir / name
-        if path.exists():
-            return open(path, "r", encoding="utf-8-sig")
+        if STORE.has("gtfs", name):
+            return STORE.open_text("gtfs", name, errors="strict")
         return None
 
     def has_gtfs_file(name: str) -> bool:
-        if zf and name in zf.namelist():
-            return True
-        return (gtfs_dir / name).exists()
+        return STORE.has("gtfs", name)
 
     log("Parsing GTFS feed...")
 
@@ -569,9 +636,6 @@ def process_gtfs() -> None:
             json.dump(stats, f, separators=(",", ":"))
         log(f"Wrote {out_path.name} ({len(stats)} stops, {out_path.stat().st_size // 1024}KB)")
 
-    if zf:
-        zf.close()
-
 
 # ── 4. Food Desert Tracts ────────────────────────────────────────────────────
 
@@ -580,36 +644,38 @@ def process_food_deserts() -> None:
     xlsx_path = RAW_DIR / "food-access-research-atlas-data-download-2019.xlsx"
     require_raw(xlsx_path, "USDA food access")
 
-    tiger_dir = RAW_DIR / "tiger_tracts"
-    require_raw(tiger_dir, "TIGER tracts")
+    require_dataset("tiger_tracts")
 
     log("Parsing USDA Food Access Research Atlas...")
-    wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
-    ws = wb["Food Access Research Atlas"]
-
-    headers = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1))]
-    tract_col = next((i for i, h in enumerate(headers) if h and "CensusTract" in str(h)), None)
-    pop_col = next((i for i, h in enumerate(headers) if h and str(h).strip() == "POP2010"), None)
-    poverty_col = next((i for i, h in enumerate(headers) if h and "Poverty" in str(h) and "Rate" in str(h)), None)
-    lila_col = next((i for i, h in enumerate(headers) if h and str(h).strip() in ("LILATracts_1And10", "LILA1and10")), None)
-    vehicle_col = next((i for i, h in enumerate(headers) if h and "lahunv" in str(h).lower()), None)
-    income_col = next((i for i, h in enumerate(headers) if h and "Median" in str(h) and "Income" in str(h)), None)
+    atlas = extract_columns(
+        xlsx_path,
+        "Food Access Research Atlas",
+        columns={
+            "tract": (lambda h: "CensusTract" in h, "str"),
+            "pop": (lambda h: h == "POP2010", "num"),
+            "poverty": (lambda h: "Poverty" in h and "Rate" in h, "num"),
+            "lila": (lambda h: h in ("LILATracts_1And10", "LILA1and10"), "num"),
+            "vehicle": (lambda h: "lahunv" in h.lower(), "num"),
+            "income": (lambda h: "Median" in h and "Income" in h, "num"),
+        },
+        key="tract",
+        prefix=STL_COUNTY_FIPS,
+        cache_dir=CACHE_DIR,
+        log=log,
+    )
+    atlas = atlas.astype(object).where(atlas.notna(), None)
 
     stl_tracts = {}
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        tract_id = str(row[tract_col]) if tract_col is not None and row[tract_col] else ""
-        if not tract_id.startswith(STL_COUNTY_FIPS):
-            continue
-
-        pop = safe_float(row[pop_col] if pop_col is not None else 0)
-        poverty = safe_float(row[poverty_col] if poverty_col is not None else 0)
-        lila = bool(row[lila_col]) if lila_col is not None and row[lila_col] is not None else False
+    for row in atlas.itertuples(index=False):
+        pop = safe_float(row.pop)
+        poverty = safe_float(row.poverty)
+        lila = bool(row.lila) if row.lila is not None else False
         vehicle_pct = 0
-        if vehicle_col is not None and row[vehicle_col] and pop > 0:
-            vehicle_pct = round(safe_float(row[vehicle_col]) / pop * 100, 1)
-        median_income = safe_int(row[income_col] if income_col is not None else 0)
+        if row.vehicle and pop > 0:
+            vehicle_pct = round(safe_float(row.vehicle) / pop * 100, 1)
+        median_income = safe_int(row.income)
 
-        stl_tracts[tract_id] = {
+        stl_tracts[row.tract] = {
             "pop": safe_int(pop),
             "poverty_rate": round(poverty, 1),
             "lila": lila,
@@ -617,42 +683,40 @@ def process_food_deserts() -> None:
             "median_income": median_income,
         }
 
-    wb.close()
     log(f"Found {len(stl_tracts)} St. Louis census tracts in USDA data")
 
-    shp_files = list(tiger_dir.rglob("*.shp"))
-    if not shp_files:
-        sys.exit("No .shp files in raw/tiger_tracts/")
+    if not STORE.members("tiger_tracts", ".shp"):
+        sys.exit("No .shp files in raw tiger_tracts")
 
     log("Reading TIGER/Line tract geometries...")
-    sf = shapefile.Reader(str(shp_files[0]))
-    fields = [f[0] for f in sf.fields[1:]]
-    geoid_idx = fields.index("GEOID") if "GEOID" in fields else 0
-    name_idx = fields.index("NAMELSAD") if "NAMELSAD" in fields else 1
-
     features = []
-    for sr in sf.shapeRecords():
-        geoid = str(sr.record[geoid_idx])
-        if not geoid.startswith(STL_COUNTY_FIPS):
-            continue
+    with STORE.shapefile_reader("tiger_tracts") as sf:
+        fields = [f[0] for f in sf.fields[1:]]
+        geoid_idx = fields.index("GEOID") if "GEOID" in fields else 0
+        name_idx = fields.index("NAMELSAD") if "NAMELSAD" in fields else 1
+
+        for sr in sf.iterShapeRecords():
+            geoid = str(sr.record[geoid_idx])
+            if not geoid.startswith(STL_COUNTY_FIPS):
+                continue
 
-        tract_data = stl_tracts.get(geoid, {})
-        name = sr.record[name_idx]
+            tract_data = stl_tracts.get(geoid, {})
+            name = sr.record[name_idx]
 
-        features.append({
-            "type": "Feature",
-            "properties": {
-                "tract_id": geoid,
-                "name": name,
-                "poverty_rate": tract_data.get("poverty_rate", 0),
-                "pop": tract_data.get("pop", 0),
-                "pct_no_vehicle": tract_data.get("pct_no_vehicle", 0),
-                "nearest_grocery_miles": 1.5,  # placeholder — app computes at runtime
-                "lila": tract_data.get("lila", False),
-                "median_income": tract_data.get("median_income", 0),
-            },
-            "geometry": sr.shape.__geo_interface__,
-        })
+            features.append({
+                "type": "Feature",
+                "properties": {
+                    "tract_id": geoid,
+                    "name": name,
+                    "poverty_rate": tract_data.get("poverty_rate", 0),
+                    "pop": tract_data.get("pop", 0),
+                    "pct_no_vehicle": tract_data.get("pct_no_vehicle", 0),
+                    "nearest_grocery_miles": 1.5,  # placeholder — app computes at runtime
+                    "lila": tract_data.get("lila", False),
+                    "median_income": tract_data.get("median_income", 0),
+                },
+                "geometry": sr.shape.__geo_interface__,
+            })
 
     food_geo = {"type": "FeatureCollection", "features": features}
     out_path = OUT_DIR / "food_deserts.geojson"
@@ -710,196 +774,100 @@ def write_grocery_stores() -> None:
 # ── 6. Crime Data (SLMPD) ──────────────────────────────────────────────────
 
 def process_crime() -> None:
-    """Process SLMPD crime CSVs from raw data."""
-    crime_dir = RAW_DIR / "crime"
-    if not crime_dir.exists():
-        log("No crime data found in raw/crime/ — skipping")
-        return
+    """Process SLMPD crime incidents from the staged Parquet partitions."""
+    import staging
 
-    csv_files = list(crime_dir.rglob("*.csv")) + list(crime_dir.rglob("*.CSV"))
-    if not csv_files:
-        log("No CSV files found in raw/crime/ — skipping")
+    if not STORE.exists("crime") or not STORE.members("crime", ".csv"):
+        log("No crime data found in raw/crime/ — skipping")
         return
 
-    log(f"Found {len(csv_files)} crime CSV file(s), parsing...")
-
-    all_rows = []
-    for cf in csv_files:
-        with open(cf, "r", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                all_rows.append(row)
-
-    log(f"Total crime rows: {len(all_rows):,}")
-
-    # Identify columns (SLMPD NIBRS format)
-    sample = all_rows[0] if all_rows else {}
-    date_col = next((k for k in sample if k.upper() in ("DATEOCCUR", "DATE_OCCUR", "DATEOCCURRED")), None)
-    if not date_col:
-        date_col = next((k for k in sample if "date" in k.lower()), None)
-    crime_col = next((k for k in sample if k.upper() in ("CRIME", "OFFENSE", "NIBRS")), None)
-    if not crime_col:
-        crime_col = next((k for k in sample if "crime" in k.lower() or "offense" in k.lower()), None)
-    desc_col = next((k for k in sample if k.upper() == "DESCRIPTION"), None)
-    if not desc_col:
-        desc_col = next((k for k in sample if "desc" in k.lower()), None)
-    hood_col = next((k for k in sample if k.upper() in ("NEIGHBORHOOD", "NBRHD")), None)
-    if not hood_col:
-        hood_col = next((k for k in sample if "neighborhood" in k.lower()), None)
-    hood_num_col = next((k for k in sample if k.upper() in ("NBHDNUM", "NEIGHBORHOODNUM", "NHD_NUM")), None)
-    if not hood_num_col:
-        hood_num_col = next((k for k in sample if "nbhd" in k.lower() and "num" in k.lower()), None)
-    lat_col = next((k for k in sample if k.upper() in ("XLAT", "LAT", "LATITUDE")), None)
-    lng_col = next((k for k in sample if k.upper() in ("XLON", "LON", "LONGITUDE", "LONG")), None)
-    fel_col = next((k for k in sample if k.upper() in ("FELMISCIT", "CRIME_TYPE")), None)
-    firearm_col = next((k for k in sample if k.upper() in ("FIREARMUSED", "FIREARM")), None)
-    district_col = next((k for k in sample if k.upper() == "DISTRICT"), None)
-
-    log(f"Columns: date={date_col}, crime={crime_col}, hood={hood_col}, hoodNum={hood_num_col}, lat={lat_col}")
-
-    def parse_date(s: str) -> str | None:
-        if not s:
-            return None
-        for fmt in ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-        return None
+    staging.ensure("crime", STORE, log=log)
+    df = staging.read(
+        "crime",
+        columns=["occurred_at", "offense", "neighborhood", "neighborhood_num", "felony", "firearm", "lat", "lng"],
+    )
+    log(f"Total crime rows: {len(df):,}")
 
-    def parse_datetime(s: str) -> datetime | None:
-        if not s:
-            return None
-        for fmt in ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-            try:
-                return datetime.strptime(s.strip(), fmt)
-            except ValueError:
-                continue
-        return None
+    df["date"] = df["occurred_at"].dt.strftime("%Y-%m-%d")
+    df["month"] = df["date"].str[:7]
 
     # Filter to target year
-    year_rows = []
-    for row in all_rows:
-        d = parse_date(row.get(date_col, "")) if date_col else None
-        if d and d.startswith(str(YEAR)):
-            year_rows.append(row)
-
+    year_rows = df[df["occurred_at"].dt.year == YEAR]
     log(f"Crime rows for {YEAR}: {len(year_rows):,}")
 
-    if not year_rows:
+    if year_rows.empty:
         log(f"WARNING: No crime rows for year {YEAR}. Using all data.")
-        year_rows = all_rows
+        year_rows = df
 
     # Aggregations
-    categories = Counter()
-    daily_counts = Counter()
-    hourly = Counter()
-    weekday_counts = Counter()
-    monthly = defaultdict(Counter)
-    neighborhoods = defaultdict(lambda: {
-        "name": "", "total": 0, "topOffenses": Counter(),
-        "felonies": 0, "firearmIncidents": 0,
-    })
-    heatmap_points = []
-    total_felonies = 0
-    total_firearms = 0
-
-    for row in year_rows:
-        # Use description if available, else crime code
-        offense = ""
-        if desc_col:
-            offense = (row.get(desc_col, "") or "").strip()
-        if not offense and crime_col:
-            offense = (row.get(crime_col, "") or "").strip()
-        offense = offense or "Unknown"
-        categories[offense] += 1
-
-        date_str = parse_date(row.get(date_col, "")) if date_col else None
-        if date_str:
-            daily_counts[date_str] += 1
-            month_key = date_str[:7]
-            monthly[month_key][offense] += 1
-
-        dt = parse_datetime(row.get(date_col, "")) if date_col else None
-        if dt:
-            hourly[str(dt.hour)] += 1
-            weekday_counts[str(dt.weekday())] += 1
-
-        # Felony / firearm tracking
-        is_felony = False
-        if fel_col:
-            fel_val = (row.get(fel_col, "") or "").strip().upper()
-            is_felony = fel_val.startswith("FEL")
-            if is_felony:
-                total_felonies += 1
-
-        has_firearm = False
-        if firearm_col:
-            fa_val = (row.get(firearm_col, "") or "").strip().upper()
-            has_firearm = fa_val in ("Y", "YES", "TRUE", "1")
-            if has_firearm:
-                total_firearms += 1
-
-        # Neighborhood
-        hood_name = (row.get(hood_col, "") if hood_col else "").strip()
-        hood_num = (row.get(hood_num_col, "") if hood_num_col else "").strip()
-        hood_key = hood_num if hood_num else hood_name
-        if hood_key:
-            nb = neighborhoods[hood_key]
-            nb["name"] = hood_name or hood_key
-            nb["total"] += 1
-            nb["topOffenses"][offense] += 1
-            if is_felony:
-                nb["felonies"] += 1
-            if has_firearm:
-                nb["firearmIncidents"] += 1
-
-        # Heatmap point
-        lat, lng = None, None
-        if lat_col and lng_col:
-            try:
-                lat = float(row.get(lat_col, ""))
-                lng = float(row.get(lng_col, ""))
-            except (ValueError, TypeError):
-                pass
-        if lat is not None and lng is not None:
-            if 38.0 < lat < 39.0 and -91.0 < lng < -89.0:
-                hood_id_for_heatmap = str(int(hood_num)).zfill(2) if hood_num and hood_num.isdigit() else hood_name
-                heatmap_points.append([lat, lng, offense, date_str or "", hood_id_for_heatmap])
-
-    # Finalize neighborhoods — key by zero-padded NHD_NUM
+    categories = count_dict(year_rows["offense"])
+    daily_counts = count_dict(year_rows["date"], sort_keys=True)
+    hourly = count_dict(year_rows["occurred_at"].dt.hour.astype("Int64"), sort_keys=True)
+    weekday_counts = count_dict(year_rows["occurred_at"].dt.weekday.astype("Int64"), sort_keys=True)
+    monthly_out = dict(sorted(top_per_group(year_rows["month"], year_rows["offense"], 10).items()))
+    total_felonies = int(year_rows["felony"].sum())
+    total_firearms = int(year_rows["firearm"].sum())
+
+    # Neighborhood — keyed by NBHDNUM when present, else the name
+    hood_name = year_rows["neighborhood"].fillna("")
+    hood_num = year_rows["neighborhood_num"].fillna("")
+    hood_key = hood_num.where(hood_num != "", hood_name)
+    hoods = year_rows.assign(key=hood_key, name=hood_name.where(hood_name != "", hood_key))
+    hoods = hoods[hoods["key"] != ""]
+    stats = hoods.groupby("key").agg(
+        name=("name", "last"),
+        total=("offense", "size"),
+        felonies=("felony", "sum"),
+        firearmIncidents=("firearm", "sum"),
+    )
+    top_offenses = top_per_group(hoods["key"], hoods["offense"], 5)
+
+    # crime_cube.json (YEARS window) + Gi* hotspot scores and forecasts per neighborhood
+    all_num = df["neighborhood_num"].fillna("")
+    all_hoods = hood_keys(all_num.where(all_num != "", df["neighborhood"]))
+    cube, hotspots = write_cube("crime", df["occurred_at"], all_hoods, df["offense"])
+    forecasts = cube_forecasts(cube, df["occurred_at"].max())
+    alerts = daily_alerts(df["occurred_at"], all_hoods, df["offense"], year_rows["occurred_at"].min())
+
     final_hoods = {}
-    for key, nb in neighborhoods.items():
-        # Try to use the hood_num as key, zero-padded
-        try:
-            nhd_id = str(int(key)).zfill(2)
-        except (ValueError, TypeError):
-            # If key is a name, use a hash-based assignment
-            nhd_id = key
-        final_hoods[nhd_id] = {
-            "name": nb["name"],
-            "total": nb["total"],
-            "topOffenses": dict(nb["topOffenses"].most_common(5)),
-            "felonies": nb["felonies"],
-            "firearmIncidents": nb["firearmIncidents"],
+    for key, row in stats.iterrows():
+        final_hoods[nhd_key(key)] = {
+            "name": row["name"],
+            "total": int(row["total"]),
+            "topOffenses": top_offenses.get(key, {}),
+            "felonies": int(row["felonies"]),
+            "firearmIncidents": int(row["firearmIncidents"]),
+            **hotspots.get(nhd_key(key), {}),
+            **hood_forecast(forecasts, nhd_key(key), top_offenses.get(key, {})),
         }
 
-    monthly_out = {}
-    for month_key, cats in sorted(monthly.items()):
-        monthly_out[month_key] = dict(cats.most_common(10))
+    # Heatmap points (target year)
+    pts = year_rows[in_stl_bbox(year_rows)].iloc[:50000]
+    hood_ids = [
+        nhd_key(num) if num.isdigit() else name
+        for num, name in zip(pts["neighborhood_num"].fillna(""), pts["neighborhood"].fillna(""))
+    ]
+    heatmap_points = [
+        [lat, lng, offense, date, hood]
+        for lat, lng, offense, date, hood in zip(
+            pts["lat"].tolist(), pts["lng"].tolist(), pts["offense"], pts["date"].fillna(""), hood_ids
+        )
+    ]
 
     crime_data = {
         "year": YEAR,
         "totalIncidents": sum(categories.values()),
         "totalFelonies": total_felonies,
         "totalFirearms": total_firearms,
-        "categories": dict(categories.most_common()),
+        "categories": categories,
         "neighborhoods": final_hoods,
-        "dailyCounts": dict(sorted(daily_counts.items())),
-        "hourly": dict(sorted(hourly.items(), key=lambda x: int(x[0]))),
-        "weekday": dict(sorted(weekday_counts.items(), key=lambda x: int(x[0]))),
+        "dailyCounts": daily_counts,
+        "alerts": alerts,
+        "hourly": hourly,
+        "weekday": weekday_counts,
         "monthly": monthly_out,
-        "heatmapPoints": heatmap_points[:50000],
+        "heatmapPoints": heatmap_points,
+        "forecast": city_forecast(forecasts),
     }
 
     out_path = OUT_DIR / "crime.json"
@@ -910,8 +878,23 @@ def process_crime() -> None:
 
 # ── 7. ARPA Fund Expenditures ──────────────────────────────────────────────
 
+# Checked in order: a title goes to the first category with a matching keyword
+ARPA_CATEGORIES = {
+    "Health": ["health", "covid", "vaccine", "medical", "hospital", "clinic"],
+    "Public Safety": ["police", "fire", "safety", "enforcement", "security"],
+    "Infrastructure": ["infrastructure", "water", "sewer", "road", "bridge", "building"],
+    "Housing": ["housing", "rent", "mortgage", "homeless", "shelter"],
+    "Economic Recovery": ["business", "economic", "workforce", "employment", "job"],
+    "Community": ["community", "youth", "education", "park", "recreation"],
+    "Technology": ["technology", "broadband", "internet", "digital"],
+}
+ARPA_DATE_FORMATS = ("%B, %d %Y %H:%M:%S", "%B, %d %Y", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
 def process_arpa() -> None:
     """Process ARPA expenditures JSON into frontend-ready format."""
+    from staging import parse_datetimes
+
     arpa_path = RAW_DIR / "arpa.json"
     if not arpa_path.exists():
         log("No ARPA data found — skipping")
@@ -927,97 +910,54 @@ def process_arpa() -> None:
         return
 
     log(f"Processing {len(records)} ARPA transactions...")
+    df = pd.DataFrame(records, dtype=object)
+
+    def field(*names: str, default="") -> "pd.Series":
+        """First non-null value across the field-name variants."""
+        out = pd.Series(default, index=df.index, dtype=object)
+        for name in reversed(names):
+            if name in df.columns:
+                out = df[name].combine_first(out)
+        return out
+
+    tx = pd.DataFrame({
+        "project": field("PROJECTID", "projectid", "PROJECT_ID", default=0).astype(str),
+        "title": field("PROJECTTITLE", "projecttitle", "PROJECT_TITLE").astype(str).str.strip(),
+        "vendor": field("VENDOR", "vendor").astype(str).str.strip(),
+        "amount": pd.to_numeric(field("AMOUNT", "amount", default=0), errors="coerce").fillna(0.0),
+        "month": parse_datetimes(field("DATE", "date", "EXPENDITURE_DATE"), ARPA_DATE_FORMATS).dt.strftime("%Y-%m"),
+    })
+    total_spent = float(tx["amount"].sum())
 
-    # Category keywords for classification
-    CATEGORY_KEYWORDS = {
-        "Health": ["health", "covid", "vaccine", "medical", "hospital", "clinic"],
-        "Public Safety": ["police", "fire", "safety", "enforcement", "security"],
-        "Infrastructure": ["infrastructure", "water", "sewer", "road", "bridge", "building"],
-        "Housing": ["housing", "rent", "mortgage", "homeless", "shelter"],
-        "Economic Recovery": ["business", "economic", "workforce", "employment", "job"],
-        "Community": ["community", "youth", "education", "park", "recreation"],
-        "Technology": ["technology", "broadband", "internet", "digital"],
-    }
-
-    def categorize(title: str) -> str:
-        title_lower = title.lower()
-        for cat, keywords in CATEGORY_KEYWORDS.items():
-            if any(kw in title_lower for kw in keywords):
-                return cat
-        return "Other"
-
-    # Parse transactions
-    project_totals = defaultdict(lambda: {"title": "", "totalSpent": 0, "category": ""})
-    vendor_totals = Counter()
-    monthly_spending = Counter()
-    total_spent = 0
-
-    for rec in records:
-        # Try various field name formats
-        amount = safe_float(rec.get("AMOUNT", rec.get("amount", 0)))
-        title = str(rec.get("PROJECTTITLE", rec.get("projecttitle", rec.get("PROJECT_TITLE", "")))).strip()
-        project_id = str(rec.get("PROJECTID", rec.get("projectid", rec.get("PROJECT_ID", 0))))
-        vendor = str(rec.get("VENDOR", rec.get("vendor", ""))).strip()
-        date_str = str(rec.get("DATE", rec.get("date", rec.get("EXPENDITURE_DATE", "")))).strip()
-
-        total_spent += amount
-
-        # Project aggregation
-        p = project_totals[project_id]
-        p["title"] = title or p["title"]
-        p["totalSpent"] += amount
-        p["category"] = categorize(p["title"])
-
-        # Vendor
-        if vendor:
-            vendor_totals[vendor] += amount
-
-        # Monthly
-        if date_str:
-            for fmt in ("%B, %d %Y %H:%M:%S", "%B, %d %Y", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    month_key = dt.strftime("%Y-%m")
-                    monthly_spending[month_key] += amount
-                    break
-                except ValueError:
-                    continue
-
-    # Build projects list
-    projects = []
-    for pid, p in project_totals.items():
-        try:
-            pid_int = int(pid)
-        except (ValueError, TypeError):
-            pid_int = 0
-        projects.append({
-            "id": pid_int,
-            "title": p["title"],
-            "totalSpent": round(p["totalSpent"], 2),
-            "category": p["category"],
-        })
-    projects.sort(key=lambda x: -x["totalSpent"])
+    # Projects: latest non-empty title, categorized once per distinct title
+    by_project = tx.assign(title=tx["title"].replace("", None)).groupby("project", sort=False).agg(
+        title=("title", "last"), totalSpent=("amount", "sum")
+    )
+    by_project["title"] = by_project["title"].fillna("")
+    by_project["category"] = KeywordClassifier(ARPA_CATEGORIES).categorize(by_project["title"]).astype(object)
+    by_project["totalSpent"] = by_project["totalSpent"].round(2)
+    by_project = by_project.sort_values("totalSpent", ascending=False, kind="stable")
+
+    projects = [
+        {"id": safe_int(pid), "title": p.title, "totalSpent": p.totalSpent, "category": p.category}
+        for pid, p in zip(by_project.index, by_project.itertuples(index=False))
+    ]
 
     # Top vendors
+    vendors = tx[tx["vendor"] != ""].groupby("vendor", sort=False)["amount"].sum()
     top_vendors = [
         {"name": name, "totalSpent": round(amount, 2)}
-        for name, amount in vendor_totals.most_common(20)
+        for name, amount in vendors.sort_values(ascending=False, kind="stable").head(20).items()
     ]
 
     # Category breakdown
-    cat_breakdown = Counter()
-    for p in projects:
-        cat_breakdown[p["category"]] += p["totalSpent"]
-    category_breakdown = {k: round(v, 2) for k, v in cat_breakdown.most_common()}
+    cats = by_project.groupby("category", sort=False)["totalSpent"].sum().sort_values(ascending=False, kind="stable")
+    category_breakdown = {k: round(v, 2) for k, v in cats.items()}
 
     # Monthly + cumulative spending
-    monthly_sorted = dict(sorted(monthly_spending.items()))
-    cumulative = {}
-    running = 0
-    for k, v in monthly_sorted.items():
-        running += v
-        cumulative[k] = round(running, 2)
-    monthly_sorted = {k: round(v, 2) for k, v in monthly_sorted.items()}
+    monthly = tx.dropna(subset=["month"]).groupby("month")["amount"].sum()
+    monthly_sorted = {k: round(v, 2) for k, v in monthly.items()}
+    cumulative = {k: round(v, 2) for k, v in monthly.cumsum().items()}
 
     arpa_data = {
         "totalSpent": round(total_spent, 2),
@@ -1040,13 +980,14 @@ def process_arpa() -> None:
 def process_demographics() -> None:
     """Process scraped neighborhood census data into demographics JSON.
 
-    The scraped text has a line-by-line table format where the value
-    appears on the line AFTER the label:
+    fetch_raw.py stores each page as a structured label → value map
+    (`values_2020`, `values_2010`), keyed by the lowercased table row label:
+
+        {"total population": 7734, "white alone": 3334, ...}
 
-        Total Population
-        7,734
-        White alone
-        3,334
+    Older raw files only carry flattened page text (`text`, `text_2010`),
+    where the value appears on the line AFTER the label; those are still
+    parsed line by line.
     """
     demo_path = RAW_DIR / "demographics.json"
     if not demo_path.exists():
@@ -1066,7 +1007,7 @@ def process_demographics() -> None:
             return 0
 
     def build_line_map(text: str) -> dict[str, int]:
-        """Build label→value map from consecutive line pairs.
+        """Build label→value map from consecutive line pairs (legacy text format).
 
         Scans for lines where the next non-empty line is a number.
         """
@@ -1080,21 +1021,26 @@ def process_demographics() -> None:
                 result[label.lower()] = parse_int(next_line)
         return result
 
+    def value_map(page_data: dict, year: int) -> dict[str, int]:
+        values = page_data.get(f"values_{year}")
+        if values is not None:
+            return values
+        text = page_data.get("text" if year == 2020 else f"text_{year}", "")
+        return build_line_map(text) if text else {}
+
     demographics = {}
     for nhd_id, page_data in raw.items():
         name = page_data.get("name", f"Neighborhood {nhd_id}")
         # Strip " Census Data" suffix from name
         name = re.sub(r"\s*Census Data\s*$", "", name, flags=re.IGNORECASE).strip()
-        text = page_data.get("text", "")
 
-        lm = build_line_map(text)
+        lm = value_map(page_data, 2020)
 
         # Population (2020)
         pop_2020 = lm.get("total population", 0)
 
         # Population (2010) — from separate scrape if available
-        text_2010 = page_data.get("text_2010", "")
-        lm_2010 = build_line_map(text_2010) if text_2010 else {}
+        lm_2010 = value_map(page_data, 2010)
         pop_2010 = lm_2010.get("total population", 0)
 
         # Population change 2010 → 2020
@@ -1149,16 +1095,59 @@ def process_demographics() -> None:
 
 # ── 9. Real Vacancy Data ───────────────────────────────────────────────────
 
+# Radii (meters) for event counts around vacant parcels; the first drives the scores
+VACANCY_RADII_M = tuple(int(r) for r in os.environ.get("VACANCY_RADII_M", "250,500").split(","))
+RECENT_COMPLAINTS = 5
+
+
+def nearby_events(lat: list[float], lng: list[float]) -> dict:
+    """Dated staged CSB/crime events (all years) within VACANCY_RADII_M of each site.
+
+    Returns {dataset: {radius: counts array}} plus "recent": the newest CSB
+    complaints within the first radius per site. Datasets that aren't
+    staged are left out.
+    """
+    import staging
+    from proximity import RadiusIndex
+
+    sources = {
+        "csb": ("requested_at", ["category", "status"]),
+        "crime": ("occurred_at", ["offense"]),
+    }
+    out: dict = {}
+    for dataset, (time_col, extra) in sources.items():
+        if not (staging.STAGING_DIR / dataset).exists():
+            continue
+        # year=0 holds rows whose date didn't parse
+        events = staging.read(dataset, columns=[time_col, *extra, "lat", "lng"], filters=[("year", ">", 0)])
+        events = events[in_stl_bbox(events) & events[time_col].notna()].reset_index(drop=True)
+        index = RadiusIndex(events["lat"], events["lng"], events[time_col])
+        out[dataset] = {r: index.counts(lat, lng, r) for r in VACANCY_RADII_M}
+        log(f"Nearby {dataset}: {len(index):,} events indexed, {len(lat):,} sites × {len(VACANCY_RADII_M)} radii")
+
+        if dataset == "csb":
+            dates = events[time_col].dt.strftime("%Y-%m-%d").fillna("").to_numpy()
+            category = events["category"].fillna("").replace("", "Unknown").to_numpy()
+            status = events["status"].fillna("").to_numpy()
+            out["recent"] = [
+                [{"category": category[j], "date": dates[j], "status": status[j]} for j in rows]
+                for rows in index.recent(lat, lng, VACANCY_RADII_M[0], RECENT_COMPLAINTS)
+            ]
+    return out
+
+
 def process_vacancies() -> None:
     """Join vacancy API overview with parcel shapefile to produce vacancies.json.
 
     Data sources:
     - raw/vacancies/vacancy_overview.json — from stlcitypermits.com API (keyed by HANDLE)
-    - raw/parcels/PARCELS/PARCELS.shp — city parcel shapefile (has geometry, address, owner, etc.)
+    - raw/PARCELS.zip (PARCELS/PARCELS.shp) — city parcel shapefile (has geometry, address, owner, etc.)
 
     The vacancy overview provides: minor violations, major violations, CSB complaints, unpaid fines.
     The parcel shapefile provides: address, owner, lat/lng (via centroid), neighborhood, lot size, etc.
     We join on HANDLE and compute triage scores from real data.
+    Complaint and crime counts around each parcel come from the staged
+    CSB/crime events (see nearby_events).
     """
     import geopandas as gpd
 
@@ -1168,8 +1157,7 @@ def process_vacancies() -> None:
         log("No vacancy_overview.json found — skipping (run fetch_raw.py first)")
         return
 
-    parcel_dir = RAW_DIR / "parcels"
-    shp_files = list(parcel_dir.rglob("*.shp")) if parcel_dir.exists() else []
+    shp_files = STORE.members("parcels", ".shp") if STORE.exists("parcels") else []
     if not shp_files:
         log("No parcel shapefile found — skipping (run fetch_raw.py first)")
         return
@@ -1180,8 +1168,8 @@ def process_vacancies() -> None:
     log(f"Loaded {len(vacancy_overview)} vacant parcels from API")
 
     # Load parcel shapefile and reproject to WGS84
-    log(f"Reading parcel shapefile ({shp_files[0].name})...")
-    gdf = gpd.read_file(shp_files[0])
+    log(f"Reading parcel shapefile ({shp_files[0]})...")
+    gdf = gpd.read_file(STORE.gdal_path("parcels", shp_files[0]))
     if gdf.crs and gdf.crs != "EPSG:4326":
         log(f"Reprojecting from {gdf.crs} to EPSG:4326...")
         gdf = gdf.to_crs(epsg=4326)
@@ -1204,7 +1192,8 @@ def process_vacancies() -> None:
         "taxDelinquency": 0.15,
     }
 
-    properties = []
+    # Matched parcels with a usable centroid
+    sites = []
     matched = 0
     for handle, vdata in vacancy_overview.items():
         parcel = parcel_lookup.get(handle)
@@ -1221,7 +1210,19 @@ def process_vacancies() -> None:
         lng = round(centroid.x, 6)
         if not (38.0 < lat < 39.0 and -91.0 < lng < -89.0):
             continue
+        sites.append((matched, handle, vdata, parcel, lat, lng))
+
+    # Complaint + crime pressure around each parcel (one KD-tree query per radius)
+    nearby = nearby_events([site[4] for site in sites], [site[5] for site in sites])
+    primary = VACANCY_RADII_M[0]
+    pressure = None
+    if "csb" in nearby or "crime" in nearby:
+        pressure = sum(nearby[d][primary] for d in ("csb", "crime") if d in nearby)
+        # Percentile of nearby activity among all vacant parcels, 0–100
+        pressure = pd.Series(pressure).rank(pct=True, method="average").mul(100).round().astype(int).tolist()
 
+    properties = []
+    for i, (site_id, handle, vdata, parcel, lat, lng) in enumerate(sites):
         # Parcel fields
         address = str(parcel.get("SITEADDR", "")).strip()
         if not address:
@@ -1273,8 +1274,13 @@ def process_vacancies() -> None:
         est_annual_tax = max(assessed_value * 0.08, 500) if assessed_value > 0 else 500
         tax_years = min(10, round(tax_balance / est_annual_tax)) if tax_balance > 0 else 0
 
-        # Proximity score: use CSB complaints as a proxy for neighborhood activity
-        proximity = min(100, 30 + csb_complaints * 15)
+        # Proximity score: nearby complaint + crime activity (API CSB count if nothing is staged)
+        if pressure is not None:
+            proximity = pressure[i]
+        else:
+            proximity = min(100, 30 + csb_complaints * 15)
+        # complaintsNearby stays the API's per-parcel CSB count (scoring.ts scales it by /20); the
+        # all-years staged counts around the parcel go out separately as nearbyCounts
         complaints_nearby = csb_complaints
 
         # Score breakdown (mirrors scoring.ts)
@@ -1314,7 +1320,7 @@ def process_vacancies() -> None:
             best_use = "garden"
 
         properties.append({
-            "id": matched,
+            "id": site_id,
             "parcelId": parcel_id,
             "address": address,
             "zip": zip_code,
@@ -1329,6 +1335,10 @@ def process_vacancies() -> None:
             "zoning": zoning,
             "taxYearsDelinquent": tax_years,
             "complaintsNearby": complaints_nearby,
+            "crimeNearby": int(nearby["crime"][primary][i]) if "crime" in nearby else None,
+            "nearbyCounts": {
+                d: {str(r): int(nearby[d][r][i]) for r in VACANCY_RADII_M} for d in ("csb", "crime") if d in nearby
+            },
             "proximityScore": proximity,
             "neighborhoodDemand": 50,
             "boardUpStatus": "Unknown",
@@ -1337,7 +1347,7 @@ def process_vacancies() -> None:
             "assessedValue": assessed_value,
             "yearBuilt": year_built,
             "stories": 1,
-            "recentComplaints": [],
+            "recentComplaints": nearby["recent"][i] if "recent" in nearby else [],
             "vacancyCategory": "Vacant Building",
             "triageScore": triage_score,
             "scoreBreakdown": scores,
@@ -1355,7 +1365,7 @@ def process_vacancies() -> None:
 # ── 10. Census ACS Housing Data ──────────────────────────────────────────────
 
 def process_housing() -> None:
-    """Spatial-join ACS tract-level housing data to neighborhoods, output housing.json."""
+    """Area-weight ACS tract-level housing data onto neighborhoods, output housing.json."""
     import geopandas as gpd
 
     acs_path = RAW_DIR / "housing_acs.json"
@@ -1368,8 +1378,7 @@ def process_housing() -> None:
         log("neighborhoods.geojson not found — run process_neighborhoods first")
         return
 
-    tiger_dir = RAW_DIR / "tiger_tracts"
-    shp_files = list(tiger_dir.rglob("*.shp")) if tiger_dir.exists() else []
+    shp_files = STORE.members("tiger_tracts", ".shp") if STORE.exists("tiger_tracts") else []
     if not shp_files:
         log("No TIGER tract shapefile found — skipping housing")
         return
@@ -1409,46 +1418,39 @@ def process_housing() -> None:
     log(f"City median rent: ${city_median_rent}, home value: ${city_median_value}")
 
     # Load TIGER tracts as GeoDataFrame
-    log("Loading TIGER tracts for spatial join...")
-    tracts_gdf = gpd.read_file(shp_files[0])
+    log("Loading TIGER tracts for areal interpolation...")
+    tracts_gdf = gpd.read_file(STORE.gdal_path("tiger_tracts", shp_files[0]))
     tracts_gdf = tracts_gdf[tracts_gdf["GEOID"].str.startswith(STL_COUNTY_FIPS)]
     if tracts_gdf.crs and tracts_gdf.crs != "EPSG:4326":
         tracts_gdf = tracts_gdf.to_crs(epsg=4326)
 
-    # Add ACS values to tracts
-    tracts_gdf["rent"] = tracts_gdf["GEOID"].map(lambda g: (tract_data.get(g, {}).get("rent")))
-    tracts_gdf["home_value"] = tracts_gdf["GEOID"].map(lambda g: (tract_data.get(g, {}).get("value")))
-
     # Load neighborhoods
     nhd_gdf = gpd.read_file(nhd_path)
     if nhd_gdf.crs and nhd_gdf.crs != "EPSG:4326":
         nhd_gdf = nhd_gdf.to_crs(epsg=4326)
 
-    # Spatial join: assign each tract to the neighborhood it overlaps most
-    joined = gpd.sjoin(tracts_gdf, nhd_gdf, how="left", predicate="intersects")
-    log(f"Spatial join: {len(joined)} tract-neighborhood matches")
-
-    # Aggregate per neighborhood
-    neighborhoods = {}
-    for nhd_num in nhd_gdf["NHD_NUM"].unique():
-        nhd_id = str(int(nhd_num)).zfill(2)
-        nhd_row = nhd_gdf[nhd_gdf["NHD_NUM"] == nhd_num].iloc[0]
-        nhd_name = nhd_row.get("NHD_NAME", f"Neighborhood {nhd_id}")
-
-        matched = joined[joined["NHD_NUM"] == nhd_num]
-        tract_count = len(matched)
-
-        rent_vals = [r for r in matched["rent"].dropna() if r > 0]
-        value_vals = [v for v in matched["home_value"].dropna() if v > 0]
+    # Tract → neighborhood area weights (cached); a tract split across
+    # neighborhoods contributes to each in proportion to the overlap
+    weights = ArealWeights.from_frames(tracts_gdf, "GEOID", nhd_gdf, "NHD_NUM", cache_dir=CACHE_DIR)
+    log(f"Areal weights: {weights.overlap.nnz} tract-neighborhood overlaps")
 
-        avg_rent = round(sum(rent_vals) / len(rent_vals)) if rent_vals else None
-        avg_value = round(sum(value_vals) / len(value_vals)) if value_vals else None
+    valid_rent = {g: d["rent"] for g, d in tract_data.items() if d["rent"] and d["rent"] > 0}
+    valid_value = {g: d["value"] for g, d in tract_data.items() if d["value"] and d["value"] > 0}
+    rent_by_nhd = weights.intensive(valid_rent)
+    value_by_nhd = weights.intensive(valid_value)
+    tract_counts = weights.source_counts()
 
+    names = dict(zip(nhd_gdf["NHD_NUM"].astype(str), nhd_gdf.get("NHD_NAME", nhd_gdf["NHD_NUM"].astype(str))))
+    neighborhoods = {}
+    for i, nhd_num in enumerate(weights.target_ids):
+        nhd_id = str(int(float(nhd_num))).zfill(2)
+        if nhd_id in neighborhoods:
+            continue
         neighborhoods[nhd_id] = {
-            "name": nhd_name,
-            "medianRent": avg_rent,
-            "medianHomeValue": avg_value,
-            "tractCount": tract_count,
+            "name": names.get(nhd_num, f"Neighborhood {nhd_id}"),
+            "medianRent": round(float(rent_by_nhd[i])) if not math.isnan(rent_by_nhd[i]) else None,
+            "medianHomeValue": round(float(value_by_nhd[i])) if not math.isnan(value_by_nhd[i]) else None,
+            "tractCount": int(tract_counts[i]),
         }
 
     housing = {
@@ -1466,13 +1468,99 @@ def process_housing() -> None:
 
 # ── Main ─────────────────────────────────────────────────────────────────────
 
+def stage_events() -> None:
+    """Convert raw CSB/crime CSVs to partitioned Parquet (only new or changed files)."""
+    import staging
+
+    for dataset in staging.DATASETS:
+        if not STORE.exists(dataset):
+            log(f"No raw {dataset} data — skipping")
+            continue
+        path = staging.ensure(dataset, STORE, log=log)
+        log(f"{dataset}: up to date in {path.relative_to(PYTHON_DIR)}/")
+
+
+def build_event_store() -> None:
+    """Write the memory-mapped event store (data/events/) from the staged CSB + crime data."""
+    import event_store
+    import staging
+
+    frames = {}
+    if (staging.STAGING_DIR / "crime").exists():
+        crime = staging.read("crime", columns=["occurred_at", "offense", "neighborhood", "neighborhood_num", "lat", "lng"])
+        num = crime["neighborhood_num"].fillna("")
+        frames["crime"] = pd.DataFrame({
+            "t": crime["occurred_at"],
+            "lat": crime["lat"],
+            "lng": crime["lng"],
+            "category": crime["offense"],
+            "neighborhood": hood_keys(num.where(num != "", crime["neighborhood"])),
+        })
+    if (staging.STAGING_DIR / "csb").exists():
+        csb = staging.read("csb", columns=["requested_at", "category", "neighborhood", "lat", "lng"])
+        frames["csb"] = pd.DataFrame({
+            "t": csb["requested_at"],
+            "lat": csb["lat"],
+            "lng": csb["lng"],
+            "category": csb["category"],
+            "neighborhood": hood_keys(csb["neighborhood"]),
+        })
+    if not frames:
+        log("No staged data — run the staging step first")
+        return
+
+    rows = event_store.build(frames)
+    size = (event_store.EVENTS_DIR / "events.npy").stat().st_size
+    log(f"Event store: {rows:,} events in {event_store.EVENTS_DIR.relative_to(PYTHON_DIR)}/ ({size // 1024 // 1024}MB)")
+
+
+def build_density() -> None:
+    """Write KDE hotspot rasters (density/<dataset>/) for YEAR and the YEARS window (see density.py)."""
+    import density
+    import staging
+
+    sources = {
+        "csb": ("requested_at", "category"),
+        "crime": ("occurred_at", "offense"),
+    }
+    for name, (time_col, cat_col) in sources.items():
+        if not (staging.STAGING_DIR / name).exists():
+            log(f"No staged {name} data — skipping")
+            continue
+        df = staging.read(
+            name, columns=[time_col, cat_col, "lat", "lng"],
+            filters=[("year", ">=", YEARS[0]), ("year", "<=", YEARS[1])],
+        )
+        groups = df[cat_col]
+        if name == "csb":
+            groups = KeywordClassifier(CSB_GROUPS).categorize(groups.fillna(""))
+
+        out_dir = OUT_DIR / "density" / name
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        manifest = density.build(
+            df[time_col], df["lat"], df["lng"], groups, out_dir, YEAR, years=YEARS, cache_dir=CACHE_DIR
+        )
+        manifest["path"] = f"density/{name}/{{group}}/{{period}}.png"
+
+        out_path = OUT_DIR / f"{name}_density.json"
+        with open(out_path, "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        size = sum(p.stat().st_size for p in out_dir.rglob("*.png"))
+        log(f"Wrote {out_path.name}: {len(manifest['groups'])} groups × {len(manifest['periods'])} periods "
+            f"of {' × '.join(map(str, manifest['shape']))} cells ({size // 1024}KB of PNG)")
+
+
 STEPS = {
+    "staging": ("Parquet staging (CSB + crime)", stage_events),
+    "events": ("Event store (CSB + crime)", build_event_store),
     "neighborhoods": ("Neighborhoods", process_neighborhoods),
     "gtfs": ("GTFS transit", process_gtfs),
     "food": ("Food deserts", process_food_deserts),
     "grocery": ("Grocery stores", write_grocery_stores),
     "csb": ("CSB 311 data", process_csb),
     "crime": ("Crime data", process_crime),
+    "density": ("Hotspot density rasters (CSB + crime)", build_density),
     "arpa": ("ARPA funds", process_arpa),
     "demographics": ("Demographics", process_demographics),
     "vacancies": ("Vacancy data", process_vacancies),
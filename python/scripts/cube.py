@@ -0,0 +1,110 @@
+"""
+cube.py — Dense neighborhood × month × category count cubes for the explorer.
+
+The time slider, neighborhood and category pickers only ever need counts,
+so instead of scanning heatmap points per tick the frontend can slice-sum a
+precomputed cube. Each axis is dictionary-encoded (a sorted list of labels,
+cells addressed by position), months form a contiguous range so a slider
+span is one contiguous slice, and the counts are a flat little-endian
+array in C order, base64-encoded like crime_scenarios.json:
+
+    count = counts[(n * len(months) + m) * len(categories) + c]
+
+The hour × weekday margin is kept per month ((month × weekday × hour),
+weekday 0 = Monday) so it follows the slider too. Both arrays come out of
+one bincount pass over the same integer codes.
+
+Rows without a neighborhood or timestamp are left out of both arrays, and
+so are rows dated outside `years` (counted in "outOfRange"): the month axis
+spans only the data inside the window, so one stray old timestamp can't
+stretch the cube. Categories past the `max_categories` most common are
+pooled into OTHER.
+"""
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+MAX_CATEGORIES = 40
+OTHER = "(other)"
+
+
+def _encode(values: np.ndarray) -> tuple[str, str]:
+    """(dtype name, base64) using the smallest unsigned dtype that fits."""
+    top = int(values.max()) if values.size else 0
+    dtype = next(d for d in ("uint8", "uint16", "uint32") if top <= np.iinfo(d).max)
+    data = values.astype(np.dtype(dtype).newbyteorder("<"), copy=False)
+    return dtype, base64.b64encode(data.tobytes()).decode("ascii")
+
+
+def decode(dtype: str, data: str, shape: list[int]) -> np.ndarray:
+    """Inverse of the cube encoding."""
+    raw = base64.b64decode(data)
+    return np.frombuffer(raw, dtype=np.dtype(dtype).newbyteorder("<")).reshape(shape)
+
+
+def build_cube(
+    timestamps: pd.Series,
+    neighborhoods: pd.Series,
+    categories: pd.Series,
+    max_categories: int = MAX_CATEGORIES,
+    years: tuple[int, int] | None = None,
+) -> dict:
+    """Count cube + hour × weekday margins as a JSON-ready dict; `years` is an inclusive window."""
+    valid = timestamps.notna() & neighborhoods.fillna("").ne("")
+    out_of_range = 0
+    if years is not None:
+        in_range = timestamps.dt.year.between(*years)
+        out_of_range = int((valid & ~in_range).sum())
+        valid &= in_range
+    ts = timestamps[valid]
+    hoods = neighborhoods[valid].astype(str)
+    cats = categories[valid].fillna("").astype(str).replace("", "Unknown")
+
+    if ts.empty:
+        return {"neighborhoods": [], "months": [], "categories": [], "total": 0, "outOfRange": out_of_range}
+
+    # Dictionaries
+    hood_codes, hood_labels = pd.factorize(hoods, sort=True)
+    ordinal = ts.dt.year.to_numpy() * 12 + ts.dt.month.to_numpy() - 1
+    first = int(ordinal.min())
+    month_codes = ordinal - first
+    n_months = int(month_codes.max()) + 1
+    months = [f"{(first + i) // 12}-{(first + i) % 12 + 1:02d}" for i in range(n_months)]
+
+    ranked = cats.value_counts(sort=False).sort_values(ascending=False, kind="stable")
+    keep = list(ranked.index[:max_categories])
+    if len(ranked) > max_categories:
+        cats = cats.where(cats.isin(keep), OTHER)
+        keep.append(OTHER)
+    cat_codes = pd.Categorical(cats, categories=keep).codes
+
+    # One pass: the same row codes feed both the cube and the margins
+    shape = (len(hood_labels), n_months, len(keep))
+    cube = np.bincount(
+        (hood_codes * n_months + month_codes) * len(keep) + cat_codes, minlength=int(np.prod(shape))
+    )
+    weekday = ts.dt.weekday.to_numpy()
+    hour = ts.dt.hour.to_numpy()
+    margins = np.bincount((month_codes * 7 + weekday) * 24 + hour, minlength=n_months * 7 * 24)
+
+    cube_dtype, cube_data = _encode(cube)
+    margin_dtype, margin_data = _encode(margins)
+    return {
+        "dims": ["neighborhood", "month", "category"],
+        "neighborhoods": [str(h) for h in hood_labels],
+        "months": months,
+        "categories": keep,
+        "total": int(cube.sum()),
+        "outOfRange": out_of_range,
+        "shape": list(shape),
+        "dtype": cube_dtype,
+        "counts": cube_data,
+        "hourWeekday": {
+            "dims": ["month", "weekday", "hour"],
+            "shape": [n_months, 7, 24],
+            "dtype": margin_dtype,
+            "counts": margin_data,
+        },
+    }
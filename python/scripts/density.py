@@ -0,0 +1,233 @@
+"""
+density.py — Gaussian kernel density rasters of point events, via FFT.
+
+Every event is binned into a fixed grid of CELL_M cells over the city,
+one count grid per (period, category group), and each grid is convolved
+with a normalized Gaussian of BANDWIDTH_M in the frequency domain. The
+convolution costs O(cells · log cells) per grid no matter how many events
+fell into it, and the periods are fixed (the target year's months, the
+year, all years), so the output stays the same size however much history
+is staged.
+
+Rasters are written as 8-bit grayscale PNGs (row 0 = north) next to a
+manifest that georeferences them:
+
+    manifest = build(times, lat, lng, groups, OUT_DIR / "density" / "csb", 2025, years=(2020, 2026))
+    # → density/csb/<group index>/<period>.png, periods "2025-01".."2025-12",
+    #   "2025" and "all" (2020–2026): at most 14 × (groups + 1) surfaces
+    #   pixel value v ↦ v / 255 * manifest["max"][group][period] events/km²
+
+"coordinates" are the four image corners (NW, NE, SE, SW) as a Mapbox image
+source expects them. Group 0 is always "All"; categories past `max_groups`
+are pooled into cube.OTHER. Empty rasters are not written (max 0).
+
+Next to each density PNG, <period>-gi.png holds Getis-Ord Gi* z-scores of
+the same counts on a coarser grid (HOTSPOT_BLOCK × HOTSPOT_BLOCK cells,
+distance-band weights of HOTSPOT_BAND_M, see hotspots.py), georeferenced by
+manifest["giStar"]: pixel v ↦ z = (v - 128) × zStep.
+"""
+
+import copy
+import math
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cube import OTHER
+from hotspots import SpatialWeights, gi_star
+from proximity import EARTH_RADIUS_M, ORIGIN_LAT
+
+BOUNDS = (-90.33, 38.52, -90.16, 38.78)  # west, south, east, north — St. Louis city
+CELL_M = 50
+BANDWIDTH_M = 150
+TRUNCATE = 4  # kernel support, in bandwidths
+MAX_GROUPS = 12
+CHUNK_GRIDS = 16  # grids per batched FFT
+HOTSPOT_BLOCK = 5  # density cells per Gi* cell side (250 m)
+HOTSPOT_BAND_M = 500
+Z_STEP = 0.05  # Gi* z per PNG level; 8 bits span ±6.4
+ALL = "All"
+
+
+class Grid:
+    """Square CELL_M cells (equirectangular about ORIGIN_LAT) covering `bounds`."""
+
+    def __init__(self, bounds=BOUNDS, cell_m: float = CELL_M):
+        west, south, east, north = bounds
+        self.cell_m = cell_m
+        self.dlat = math.degrees(cell_m / EARTH_RADIUS_M)
+        self.dlng = self.dlat / math.cos(math.radians(ORIGIN_LAT))
+        self.west, self.north = west, north
+        self.shape = (math.ceil((north - south) / self.dlat), math.ceil((east - west) / self.dlng))
+
+    @property
+    def size(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    def cells(self, lat, lng) -> np.ndarray:
+        """Flat cell index per point, -1 outside the grid (or missing)."""
+        lat = np.asarray(lat, dtype="float64")
+        lng = np.asarray(lng, dtype="float64")
+        with np.errstate(invalid="ignore"):
+            row = np.floor((self.north - lat) / self.dlat)
+            col = np.floor((lng - self.west) / self.dlng)
+        ok = (row >= 0) & (row < self.shape[0]) & (col >= 0) & (col < self.shape[1])
+        return np.where(ok, np.where(ok, row, 0) * self.shape[1] + np.where(ok, col, 0), -1).astype("int64")
+
+    def coarsen(self, factor: int) -> "Grid":
+        """factor × factor blocks of this grid, same NW corner (edge blocks may overhang)."""
+        coarse = copy.copy(self)
+        coarse.cell_m, coarse.dlat, coarse.dlng = self.cell_m * factor, self.dlat * factor, self.dlng * factor
+        coarse.shape = (-(-self.shape[0] // factor), -(-self.shape[1] // factor))
+        return coarse
+
+    def centers(self) -> np.ndarray:
+        """(size, 2) cell-center x/y in meters from the NW corner, in flat cell order."""
+        row, col = np.divmod(np.arange(self.size), self.shape[1])
+        return np.column_stack([(col + 0.5) * self.cell_m, (row + 0.5) * self.cell_m])
+
+    def georef(self) -> dict:
+        south = self.north - self.shape[0] * self.dlat
+        east = self.west + self.shape[1] * self.dlng
+        r = lambda v: round(v, 6)  # noqa: E731
+        return {
+            "bounds": [r(self.west), r(south), r(east), r(self.north)],
+            "coordinates": [[r(self.west), r(self.north)], [r(east), r(self.north)], [r(east), r(south)], [r(self.west), r(south)]],
+            "shape": list(self.shape),
+            "cellMeters": self.cell_m,
+        }
+
+
+def gaussian_kernel_fft(shape: tuple[int, int], sigma_cells: float) -> tuple[np.ndarray, int]:
+    """rfft2 of a normalized Gaussian, zero-padded for linear (non-wrapping) convolution."""
+    pad = math.ceil(TRUNCATE * sigma_cells)
+    taps = np.exp(-0.5 * (np.arange(-pad, pad + 1) / sigma_cells) ** 2)
+    taps /= taps.sum()
+    size = (shape[0] + 2 * pad, shape[1] + 2 * pad)
+    return np.fft.rfft2(np.outer(taps, taps), s=size), pad
+
+
+def smooth(grids: np.ndarray, kernel: np.ndarray, pad: int) -> np.ndarray:
+    """Convolve each (…, H, W) grid with the kernel from gaussian_kernel_fft ("same" output)."""
+    h, w = grids.shape[-2:]
+    size = (h + 2 * pad, w + 2 * pad)
+    out = np.fft.irfft2(np.fft.rfft2(grids, s=size) * kernel, s=size)
+    return np.clip(out[..., pad:pad + h, pad:pad + w], 0, None)  # FFT round-off goes slightly negative
+
+
+def block_sum(grids: np.ndarray, factor: int) -> np.ndarray:
+    """Sum (…, H, W) grids over factor × factor blocks (zero-padded to whole blocks)."""
+    h, w = grids.shape[-2:]
+    hb, wb = -(-h // factor), -(-w // factor)
+    padded = np.zeros(grids.shape[:-2] + (hb * factor, wb * factor), dtype=grids.dtype)
+    padded[..., :h, :w] = grids
+    return padded.reshape(grids.shape[:-2] + (hb, factor, wb, factor)).sum(axis=(-3, -1))
+
+
+def encode_png(gray: np.ndarray) -> bytes:
+    """8-bit grayscale PNG; every row uses the Sub filter, which suits smooth surfaces."""
+    h, w = gray.shape
+    sub = np.diff(gray, axis=1, prepend=np.zeros((h, 1), dtype="uint8"))  # wraps mod 256, as PNG expects
+    raw = np.hstack([np.ones((h, 1), dtype="uint8"), sub]).tobytes()
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    header = struct.pack(">IIBBBBB", w, h, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 9)) + chunk(b"IEND", b"")
+
+
+def build(
+    times: pd.Series,
+    lat: pd.Series,
+    lng: pd.Series,
+    groups: pd.Series,
+    out_dir: Path,
+    year: int,
+    years: tuple[int, int] | None = None,
+    max_groups: int = MAX_GROUPS,
+    grid: Grid | None = None,
+    bandwidth_m: float = BANDWIDTH_M,
+    cache_dir: Path | None = None,
+) -> dict:
+    """Write density + Gi* PNGs per (group, period) under out_dir and return the manifest.
+
+    Periods are the months of `year`, `year` itself and "all" (every year in
+    `years`, inclusive; default just `year`). Events outside `years` are
+    ignored, so a stray old timestamp can't widen anything. Grids are built
+    one period at a time, so memory is a few grids per group whatever the
+    history length. `cache_dir` caches the Gi* grid weights (see
+    hotspots.SpatialWeights).
+    """
+    grid = grid or Grid()
+    first_year, last_year = years or (year, year)
+    cells = grid.cells(lat, lng)
+    event_year = times.dt.year.to_numpy(dtype="float64", na_value=np.nan)
+    valid = (cells >= 0) & (event_year >= first_year) & (event_year <= last_year)
+    cells = cells[valid]
+    ts = times[valid]
+    labels = groups[valid].astype("object").fillna("").astype(str).replace("", "Unknown")
+
+    periods = [f"{year}-{m:02d}" for m in range(1, 13)] + [str(year), "all"]
+    manifest = {
+        **grid.georef(),
+        "bandwidthMeters": bandwidth_m,
+        "unit": "events/km²",
+        "years": [first_year, last_year],
+        "events": [],
+        "max": [],
+    }
+    if ts.empty:
+        return {**manifest, "periods": [], "groups": []}
+
+    in_year = (ts.dt.year == year).to_numpy()
+    month = ts.dt.month.to_numpy()
+    selections = [in_year & (month == m) for m in range(1, 13)] + [in_year, np.ones(len(ts), dtype=bool)]
+
+    ranked = labels.value_counts(sort=False).sort_values(ascending=False, kind="stable")
+    keep = list(ranked.index[:max_groups])
+    if len(ranked) > max_groups:
+        labels = labels.where(labels.isin(keep), OTHER)
+        keep.append(OTHER)
+    # Group 0 is "All"; group codes are shifted by one
+    group_codes = pd.Categorical(labels, categories=keep).codes.astype("int64") + 1
+    n_groups = len(keep) + 1
+
+    kernel, pad = gaussian_kernel_fft(grid.shape, bandwidth_m / grid.cell_m)
+    cell_km2 = (grid.cell_m / 1000) ** 2
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for g in range(n_groups):
+        (out_dir / str(g)).mkdir(exist_ok=True)
+
+    coarse = grid.coarsen(HOTSPOT_BLOCK)
+    weights = SpatialWeights.distance_band(coarse.centers(), np.arange(coarse.size), HOTSPOT_BAND_M, cache_dir)
+    manifest["giStar"] = {**coarse.georef(), "bandMeters": HOTSPOT_BAND_M, "zStep": Z_STEP}
+
+    events = np.zeros((n_groups, len(periods)), dtype="int64")
+    peaks = np.zeros((n_groups, len(periods)))
+    for k, rows in enumerate(selections):
+        # Every group's counts for this period: (n_groups, H, W)
+        flat = np.concatenate([cells[rows], group_codes[rows] * grid.size + cells[rows]])
+        counts = np.bincount(flat, minlength=n_groups * grid.size).reshape(n_groups, *grid.shape).astype("float64")
+        events[:, k] = counts.sum(axis=(1, 2))
+
+        # Gi* for every group of the period in one sparse product
+        z, _ = gi_star(weights, block_sum(counts, HOTSPOT_BLOCK).reshape(n_groups, -1).T)
+        z_levels = np.clip(np.rint(z.T / Z_STEP) + 128, 0, 255).astype("uint8").reshape(n_groups, *coarse.shape)
+
+        for start in range(0, n_groups, CHUNK_GRIDS):
+            density = smooth(counts[start:start + CHUNK_GRIDS], kernel, pad) / cell_km2
+            for g, surface in enumerate(density, start):
+                if not events[g, k]:
+                    continue
+                peaks[g, k] = peak = float(surface.max())
+                gray = np.rint(surface * (255 / peak)).astype("uint8")
+                (out_dir / str(g) / f"{periods[k]}.png").write_bytes(encode_png(gray))
+                (out_dir / str(g) / f"{periods[k]}-gi.png").write_bytes(encode_png(z_levels[g]))
+
+    manifest["events"] = events.tolist()
+    manifest["max"] = np.round(peaks, 2).tolist()
+    return {**manifest, "periods": periods, "groups": [ALL] + keep}
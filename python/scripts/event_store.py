@@ -0,0 +1,314 @@
+"""
+event_store.py — Memory-mapped crime + 311 event store with an indexed query API.
+
+Every staged event (both datasets) becomes one row of a NumPy structured
+array saved as data/events/events.npy, with its dictionaries and index in
+events.json next to it:
+
+    t             datetime64[s]
+    lat, lng      float32
+    z             uint32   Morton (Z-order) key of lat/lng on a 2^16 grid over the city
+    category      uint16   index into meta["categories"]
+    neighborhood  uint16   index into meta["neighborhoods"]
+    source        uint8    index into meta["sources"] ("crime", "csb")
+
+Rows are sorted by (month, z): each month is a contiguous block (offsets in
+meta["monthOffsets"]), and within a block nearby points are nearby rows. A query
+picks the month blocks from the time range, turns the bbox into a handful
+of Z-ranges and binary-searches each block for them, so only candidate
+rows are touched before the exact filters:
+
+    from event_store import EventStore
+    store = EventStore.open()
+    rows = store.query(bbox=(-90.25, 38.60, -90.20, 38.65), t0="2024-06-01", t1="2024-09-01",
+                       categories=["ASSAULT"], sources=["crime"])
+    store.count(t0="2024-01-01", neighborhoods=["35"])
+    store.sample(1000, sources=["csb"])      # DataFrame of random matching events
+
+The array is opened with mmap_mode="r", so opening is instant and only the
+pages a query reads are loaded. Rows without coordinates get z = 2^32-1
+(end of each block): they never match a bbox but do match other filters.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
+EVENTS_DIR = PYTHON_DIR / "data" / "events"
+
+# Z-order grid extent (lng/lat); points outside are clamped to the edge
+BOUNDS = (-91.0, 38.0, -89.0, 39.0)
+GRID_BITS = 16
+NO_LOCATION = np.uint32(0xFFFFFFFF)
+MAX_RANGES = 64  # Z-ranges per bbox; coarser cells just add candidates
+SPAN_GAP = 4096  # candidate spans closer than this are scanned as one slice
+
+DTYPE = np.dtype([
+    ("t", "M8[s]"),
+    ("lat", "<f4"),
+    ("lng", "<f4"),
+    ("z", "<u4"),
+    ("category", "<u2"),
+    ("neighborhood", "<u2"),
+    ("source", "u1"),
+])
+
+
+# ── Z-order keys ──
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the low 16 bits."""
+    v = v.astype(np.uint32) & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def grid_xy(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    """Grid cell of each point (clamped to BOUNDS)."""
+    x0, y0, x1, y1 = BOUNDS
+    n = (1 << GRID_BITS) - 1
+    x = np.clip((np.asarray(lng, dtype="float64") - x0) / (x1 - x0) * n, 0, n)
+    y = np.clip((np.asarray(lat, dtype="float64") - y0) / (y1 - y0) * n, 0, n)
+    return x.astype(np.uint32), y.astype(np.uint32)
+
+
+def z_keys(lng, lat) -> np.ndarray:
+    lng, lat = np.asarray(lng), np.asarray(lat)
+    x, y = grid_xy(np.nan_to_num(lng), np.nan_to_num(lat))
+    z = _spread(x) | (_spread(y) << 1)
+    return np.where(np.isnan(lng) | np.isnan(lat), NO_LOCATION, z).astype(np.uint32)
+
+
+def z_ranges(bbox: tuple[float, float, float, float], max_ranges: int = MAX_RANGES) -> list[tuple[int, int]]:
+    """Inclusive Z-key ranges covering the grid cells of `bbox` (min_lng, min_lat, max_lng, max_lat).
+
+    Quadtree descent: cells fully inside are emitted whole, partial cells are
+    split until the range budget runs out and then emitted whole too.
+    """
+    (qx0, qx1), (qy0, qy1) = (grid_xy([bbox[0], bbox[2]], [bbox[1], bbox[3]]))
+    qx0, qx1, qy0, qy1 = int(qx0), int(qx1), int(qy0), int(qy1)
+    out = []
+    level = [(0, 0, GRID_BITS)]  # (x, y, size bits) of cells, in Z order
+    while level:
+        nxt = []
+        for x, y, bits in level:
+            size = 1 << bits
+            if x > qx1 or y > qy1 or x + size - 1 < qx0 or y + size - 1 < qy0:
+                continue
+            inside = x >= qx0 and y >= qy0 and x + size - 1 <= qx1 and y + size - 1 <= qy1
+            if inside or bits == 0 or len(out) + len(nxt) + 4 > max_ranges:
+                out.append((x, y, bits))
+            else:
+                half = size >> 1
+                nxt += [(x, y, bits - 1), (x + half, y, bits - 1), (x, y + half, bits - 1), (x + half, y + half, bits - 1)]
+        level = nxt
+
+    ranges = []
+    for x, y, bits in out:
+        lo = int(_spread(np.array([x]))[0] | (_spread(np.array([y]))[0] << 1))
+        ranges.append((lo, lo + (1 << (2 * bits)) - 1))
+    ranges.sort()
+    merged = [ranges[0]] if ranges else []
+    for lo, hi in ranges[1:]:
+        if lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+# ── Build ──
+
+def build(frames: dict[str, pd.DataFrame], events_dir: Path = EVENTS_DIR) -> int:
+    """Write the store from {source: DataFrame[t, lat, lng, category, neighborhood]}. Returns rows."""
+    parts = [f.assign(source=name) for name, f in frames.items() if not f.empty]
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["t", "lat", "lng", "category", "neighborhood", "source"])
+    df = df[df["t"].notna()]
+
+    sources = list(frames)
+    cat_codes, categories = pd.factorize(df["category"].fillna("").astype(str), sort=True)
+    hood_codes, neighborhoods = pd.factorize(df["neighborhood"].fillna("").astype(str), sort=True)
+    # Codes past the column's range would wrap silently on assignment
+    for field, labels in (("category", categories), ("neighborhood", neighborhoods), ("source", sources)):
+        limit = np.iinfo(DTYPE[field]).max + 1
+        if len(labels) > limit:
+            raise ValueError(f"{len(labels):,} distinct {field} values; the {DTYPE[field]} column holds at most {limit:,}")
+
+    events = np.empty(len(df), dtype=DTYPE)
+    events["t"] = df["t"].to_numpy(dtype="datetime64[s]")
+    events["lat"] = df["lat"].to_numpy(dtype="float64")
+    events["lng"] = df["lng"].to_numpy(dtype="float64")
+    events["z"] = z_keys(df["lng"].to_numpy(dtype="float64"), df["lat"].to_numpy(dtype="float64"))
+    events["category"] = cat_codes
+    events["neighborhood"] = hood_codes
+    events["source"] = pd.Categorical(df["source"], categories=sources).codes
+
+    month = events["t"].astype("M8[M]").astype("int64")
+    order = np.lexsort((events["z"], month))
+    events, month = events[order], month[order]
+
+    first = int(month[0]) if len(month) else 0
+    n_months = int(month[-1]) - first + 1 if len(month) else 0
+    offsets = np.searchsorted(month, np.arange(first, first + n_months + 1))
+    meta = {
+        "rows": len(events),
+        "sources": sources,
+        "categories": [str(c) for c in categories],
+        "neighborhoods": [str(h) for h in neighborhoods],
+        "bounds": list(BOUNDS),
+        "gridBits": GRID_BITS,
+        "firstMonth": str(np.datetime64(first, "M")) if n_months else None,
+        "monthOffsets": offsets.tolist(),
+    }
+
+    events_dir.mkdir(parents=True, exist_ok=True)
+    tmp = events_dir / "events.tmp.npy"
+    np.save(tmp, events)
+    tmp.replace(events_dir / "events.npy")
+    (events_dir / "events.json").write_text(json.dumps(meta, separators=(",", ":")))
+    return len(events)
+
+
+# ── Query ──
+
+def _datetime(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).to_datetime64(), "s")
+
+
+def _merge_spans(spans: list[tuple[int, int]], gap: int = SPAN_GAP) -> list[tuple[int, int]]:
+    """Sort row spans and join those less than `gap` rows apart (fewer, larger slices)."""
+    merged: list[tuple[int, int]] = []
+    for a, b in sorted(spans):
+        if merged and a - merged[-1][1] < gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+        else:
+            merged.append((a, b))
+    return merged
+
+
+class EventStore:
+    def __init__(self, events: np.ndarray, meta: dict):
+        self.events = events
+        self.meta = meta
+        self.sources: list[str] = meta["sources"]
+        self.categories: list[str] = meta["categories"]
+        self.neighborhoods: list[str] = meta["neighborhoods"]
+        self.offsets = np.asarray(meta["monthOffsets"], dtype="int64")
+        self.first_month = np.datetime64(meta["firstMonth"], "M") if meta["firstMonth"] else None
+        self._ids = {
+            "source": {s: i for i, s in enumerate(self.sources)},
+            "category": {c: i for i, c in enumerate(self.categories)},
+            "neighborhood": {h: i for i, h in enumerate(self.neighborhoods)},
+        }
+
+    @classmethod
+    def open(cls, events_dir: Path = EVENTS_DIR) -> "EventStore":
+        if not (events_dir / "events.npy").exists():
+            raise FileNotFoundError(f"No event store in {events_dir} — run `clean_data.py --only events`")
+        meta = json.loads((events_dir / "events.json").read_text())
+        if meta["bounds"] != list(BOUNDS) or meta["gridBits"] != GRID_BITS:
+            raise ValueError("Event store was built with a different grid — rebuild it")
+        return cls(np.load(events_dir / "events.npy", mmap_mode="r"), meta)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _month_blocks(self, t0, t1) -> tuple[int, int]:
+        """Month block range [lo, hi) overlapping [t0, t1)."""
+        n = len(self.offsets) - 1
+        if self.first_month is None:
+            return 0, 0
+        lo = 0 if t0 is None else int((_datetime(t0).astype("M8[M]") - self.first_month).astype(int))
+        hi = n if t1 is None else int(((_datetime(t1) - np.timedelta64(1, "s")).astype("M8[M]") - self.first_month).astype(int)) + 1
+        return max(lo, 0), min(hi, n)
+
+    def _lookup(self, field: str, labels) -> np.ndarray | None:
+        if labels is None:
+            return None
+        ids = self._ids[field]
+        return np.array([ids[str(v)] for v in labels if str(v) in ids], dtype="int64")
+
+    def query(
+        self,
+        bbox: tuple[float, float, float, float] | None = None,
+        t0=None,
+        t1=None,
+        categories=None,
+        neighborhoods=None,
+        sources=None,
+    ) -> np.ndarray:
+        """Sorted row indices of events matching every given filter.
+
+        bbox is (min_lng, min_lat, max_lng, max_lat); the time range is
+        [t0, t1); categories/neighborhoods/sources are label lists.
+        """
+        lo, hi = self._month_blocks(t0, t1)
+        if lo >= hi:
+            return np.empty(0, dtype="int64")
+
+        # Candidate row spans: whole month blocks, or their Z-ranges found
+        # by binary search inside each block
+        starts, ends = self.offsets[lo:hi], self.offsets[lo + 1:hi + 1]
+        if bbox is not None:
+            ranges = np.array(z_ranges(bbox), dtype="int64").reshape(-1, 2)
+            z = self.events["z"]
+            spans = []
+            for s, e in zip(starts, ends):
+                block = z[s:e]
+                a = s + np.searchsorted(block, ranges[:, 0], side="left")
+                b = s + np.searchsorted(block, ranges[:, 1], side="right")
+                spans += [(x, y) for x, y in zip(a.tolist(), b.tolist()) if y > x]
+        else:
+            spans = list(zip(starts.tolist(), ends.tolist()))
+
+        # Exact filters, one contiguous slice at a time (nearby spans merged)
+        ids = {
+            field: self._lookup(field, labels)
+            for field, labels in (("category", categories), ("neighborhood", neighborhoods), ("source", sources))
+        }
+        lo_t = _datetime(t0) if t0 is not None else None
+        hi_t = _datetime(t1) if t1 is not None else None
+        out = []
+        for a, b in _merge_spans(spans):
+            cand = self.events[a:b]
+            keep = np.ones(b - a, dtype=bool)
+            if bbox is not None:
+                lng, lat = cand["lng"], cand["lat"]
+                keep &= (lng >= bbox[0]) & (lat >= bbox[1]) & (lng <= bbox[2]) & (lat <= bbox[3])
+            if lo_t is not None:
+                keep &= cand["t"] >= lo_t
+            if hi_t is not None:
+                keep &= cand["t"] < hi_t
+            for field, field_ids in ids.items():
+                if field_ids is not None:
+                    keep &= np.isin(cand[field], field_ids)
+            out.append(a + np.flatnonzero(keep))
+        return np.concatenate(out) if out else np.empty(0, dtype="int64")
+
+    def count(self, **filters) -> int:
+        return len(self.query(**filters))
+
+    def sample(self, n: int, seed: int = 0, **filters) -> pd.DataFrame:
+        """Up to `n` random matching events (in store order) as a DataFrame."""
+        rows = self.query(**filters)
+        if len(rows) > n:
+            rows = np.sort(np.random.default_rng(seed).choice(rows, n, replace=False))
+        return self.to_frame(rows)
+
+    def to_frame(self, rows: np.ndarray | None = None) -> pd.DataFrame:
+        """Decode rows (all if None) with categorical labels."""
+        ev = self.events if rows is None else self.events[rows]
+        return pd.DataFrame({
+            "t": ev["t"].astype("M8[ns]"),
+            "lat": ev["lat"].astype("float64"),
+            "lng": ev["lng"].astype("float64"),
+            "category": pd.Categorical.from_codes(ev["category"].astype("int64"), categories=self.categories),
+            "neighborhood": pd.Categorical.from_codes(ev["neighborhood"].astype("int64"), categories=self.neighborhoods),
+            "source": pd.Categorical.from_codes(ev["source"].astype("int64"), categories=self.sources),
+        })
@@ -2,7 +2,9 @@
 """
 fetch_raw.py — Download all raw datasets into python/data/raw/.
 
-Just fetches and extracts. No processing, no aggregation.
+Just fetches. No processing, no aggregation. Zips are kept as downloaded;
+clean_data.py and the notebooks read their members directly via
+raw_store.RawStore, so nothing is extracted to disk.
 Do EDA and cleaning in notebooks.
 
 Usage:
@@ -14,14 +16,17 @@ import json
 import os
 import re
 import sys
-import zipfile
+import time
 from pathlib import Path
 
 try:
-    import requests
+    import requests  # noqa: F401 — required by downloader
 except ImportError:
     sys.exit("Missing dependency: pip install requests")
 
+from census_scraper import scrape_neighborhoods
+from downloader import DownloadJob, DownloadResult, Downloader, Manifest
+
 ROOT = Path(__file__).resolve().parent.parent  # python/
 REPO_ROOT = ROOT.parent  # repo root
 RAW_DIR = ROOT / "data" / "raw"
@@ -36,6 +41,7 @@ if _dotenv.exists():
             os.environ.setdefault(key.strip(), val.strip())
 
 YEAR = int(os.environ.get("DATA_YEAR", "2025"))
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
 
 SOURCES = {
     "csb": {
@@ -62,67 +68,70 @@ SOURCES = {
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (STL Urban Analytics data pipeline)"}
 
+# Shared engine: one pooled Session per host, reused by every fetch_* below.
+# The manifest remembers ETag/Last-Modified/SHA-256 per artifact so unchanged
+# sources cost a single conditional request.
+MANIFEST = Manifest(RAW_DIR / "manifest.json")
+DOWNLOADER = Downloader(max_workers=FETCH_WORKERS, headers=HEADERS, manifest=MANIFEST)
+
 
-def download(url: str, dest: Path, quiet: bool = False) -> Path:
+def download(url: str, dest: Path, quiet: bool = False) -> DownloadResult:
     if not quiet:
         print(f"  \U0001f4e5 {url.split('/')[-1]}...", end=" ", flush=True)
-    resp = requests.get(url, stream=True, timeout=120, headers=HEADERS)
-    resp.raise_for_status()
-    downloaded = 0
-    with open(dest, "wb") as f:
-        for chunk in resp.iter_content(chunk_size=8192):
-            f.write(chunk)
-            downloaded += len(chunk)
-    size_mb = downloaded / 1024 / 1024
+    result = DOWNLOADER.fetch(DownloadJob(url, dest))
+    if not result.ok:
+        if not quiet:
+            print("failed")
+        raise RuntimeError(result.error)
     if not quiet:
-        print(f"{size_mb:.1f} MB")
-    return dest
+        if result.status == "not_modified":
+            print("not modified")
+        else:
+            print(f"{result.bytes / 1024 / 1024:.1f} MB")
+    return result
 
 
-def fetch_crime() -> None:
-    """Download SLMPD crime CSVs.
+def crime_jobs() -> list[DownloadJob]:
+    """Scrape the SLMPD crime stats page and return download jobs for every CSV.
 
     SLMPD publishes monthly NIBRS CSV files (e.g. January2025.csv) plus a
-    bulk historical file (2021-2023.csv). We scrape the crime stats page
-    and download all available CSVs.
+    bulk historical file (2021-2023.csv). Files already on disk are requested
+    conditionally, so an updated CSV is picked up and an unchanged one costs
+    a 304.
     """
     crime_dir = RAW_DIR / "crime"
     crime_dir.mkdir(parents=True, exist_ok=True)
 
     print("  Scraping SLMPD crime stats page for CSV links...")
-    try:
-        resp = requests.get(
-            "https://www.slmpd.org/crime_stats.shtml",
-            timeout=30,
-            headers=HEADERS,
-        )
-        resp.raise_for_status()
-        csv_links = re.findall(r'href="([^"]*\.(?:csv|CSV))"', resp.text)
-
-        if not csv_links:
-            print("  WARNING: No CSV links found on SLMPD page")
-            return
-
-        downloaded = 0
-        total_bytes = 0
-        for link in csv_links:
-            if not link.startswith("http"):
-                link = f"https://www.slmpd.org/{link.lstrip('/')}"
-            filename = link.split("/")[-1]
-            dest = crime_dir / filename
-            if dest.exists():
-                continue  # skip already-downloaded files
-            try:
-                download(link, dest, quiet=True)
-                total_bytes += dest.stat().st_size
-                downloaded += 1
-            except Exception:
-                continue
-
-        existing = sum(1 for f in crime_dir.iterdir() if f.suffix.lower() == ".csv")
-        total_mb = sum(f.stat().st_size for f in crime_dir.iterdir() if f.suffix.lower() == ".csv") / 1024 / 1024
-        print(f"  \U0001f4e5 {downloaded} new, {existing} total CSV files ({total_mb:.1f} MB)")
+    resp = DOWNLOADER.get("https://www.slmpd.org/crime_stats.shtml", timeout=30)
+    csv_links = re.findall(r'href="([^"]*\.(?:csv|CSV))"', resp.text)
+    if not csv_links:
+        print("  WARNING: No CSV links found on SLMPD page")
+        return []
+
+    jobs = []
+    for link in csv_links:
+        if not link.startswith("http"):
+            link = f"https://www.slmpd.org/{link.lstrip('/')}"
+        dest = crime_dir / link.split("/")[-1]
+        jobs.append(DownloadJob(link, dest, label=f"crime/{dest.name}"))
+    return jobs
+
+
+def report_crime(results: list[DownloadResult]) -> None:
+    crime_dir = RAW_DIR / "crime"
+    csvs = [f for f in crime_dir.iterdir() if f.suffix.lower() == ".csv"]
+    total_mb = sum(f.stat().st_size for f in csvs) / 1024 / 1024
+    changed = sum(1 for r in results if r.ok and r.changed)
+    print(f"  \U0001f4e5 {changed} new or updated, {len(csvs)} total CSV files ({total_mb:.1f} MB)")
+
 
+def fetch_crime() -> None:
+    """Download SLMPD crime CSVs concurrently over a pooled session."""
+    try:
+        jobs = crime_jobs()
+        results = DOWNLOADER.fetch_many(jobs, quiet=True)
+        report_crime(results)
     except Exception as e:
         print(f"  Scraping failed: {e}")
         print("  WARNING: Could not download crime data. Place CSV manually in python/data/raw/crime/")
@@ -133,8 +142,7 @@ def fetch_arpa() -> None:
     print("  Fetching ARPA expenditures JSON...")
     url = "https://www.stlouis-mo.gov/customcf/endpoints/arpa/expenditures.cfm?format=json"
     try:
-        resp = requests.get(url, timeout=60, headers=HEADERS)
-        resp.raise_for_status()
+        resp = DOWNLOADER.get(url, timeout=60)
         data = resp.json()
         dest = RAW_DIR / "arpa.json"
         with open(dest, "w") as f:
@@ -145,49 +153,18 @@ def fetch_arpa() -> None:
 
 
 def fetch_demographics() -> None:
-    """Scrape neighborhood census pages from City of STL (all 79 neighborhoods)."""
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        print("  WARNING: beautifulsoup4 not installed, skipping demographics")
-        return
+    """Scrape neighborhood census pages from City of STL (all 79 neighborhoods).
 
+    Pages are fetched concurrently, cached as raw HTML under
+    demographics_html/, and reduced to label → value records at fetch time.
+    """
     print("  Scraping 79 neighborhood census pages (2020 + 2010)...")
-    base_url = "https://www.stlouis-mo.gov/government/departments/planning/research/census/data/neighborhoods/neighborhood.cfm"
-    all_data = {}
-
-    for num in range(1, 80):
-        nhd_id = str(num).zfill(2)
-        page_data = {}
-
-        for year in (2020, 2010):
-            url = f"{base_url}?number={num}&censusYear={year}"
-            try:
-                resp = requests.get(url, timeout=30, headers=HEADERS)
-                resp.raise_for_status()
-                soup = BeautifulSoup(resp.text, "lxml")
-
-                if year == 2020:
-                    h1 = soup.find("h1")
-                    name = h1.get_text(strip=True) if h1 else f"Neighborhood {nhd_id}"
-                    name = re.sub(r"\s*-\s*Census\s*Data.*", "", name).strip()
-                    page_data["name"] = name
-                    tables = soup.find_all("table")
-                    page_data["tables_found"] = len(tables)
-
-                text_content = soup.get_text(separator="\n")
-                page_data[f"text_{year}"] = text_content[:5000]
-                # Keep backward compat: "text" key is the 2020 data
-                if year == 2020:
-                    page_data["text"] = text_content[:5000]
-
-            except Exception as e:
-                print(f"    Failed NHD {nhd_id} ({year}): {e}")
-
-        all_data[nhd_id] = page_data
-
-        if num % 10 == 0:
-            print(f"    Scraped {num}/79 neighborhoods...")
+    all_data = scrape_neighborhoods(
+        DOWNLOADER.get,
+        RAW_DIR / "demographics_html",
+        workers=FETCH_WORKERS,
+        refresh=os.environ.get("REFRESH_CENSUS") == "1",
+    )
 
     dest = RAW_DIR / "demographics.json"
     with open(dest, "w") as f:
@@ -215,8 +192,7 @@ def fetch_housing_acs() -> None:
     ]
     print("  Fetching ACS 5-Year housing data (B25064 + B25077)...")
     try:
-        resp = requests.get(base, params=params, timeout=60, headers=HEADERS)
-        resp.raise_for_status()
+        resp = DOWNLOADER.get(base, params=params, timeout=60)
         data = resp.json()
         dest = RAW_DIR / "housing_acs.json"
         with open(dest, "w") as f:
@@ -234,12 +210,10 @@ def fetch_vacancies() -> None:
     # 1. Fetch vacancy overview from the live API (keyed by parcel HANDLE)
     print("  Fetching vacancy overview from stlcitypermits.com API...")
     try:
-        resp = requests.get(
+        resp = DOWNLOADER.get(
             "https://www.stlcitypermits.com/API/VacantBuilding/GetVacantBuildingOverview",
             timeout=120,
-            headers=HEADERS,
         )
-        resp.raise_for_status()
         data = resp.json()
         dest = vacancy_dir / "vacancy_overview.json"
         with open(dest, "w") as f:
@@ -251,20 +225,11 @@ def fetch_vacancies() -> None:
     # 2. Download parcel shapefile (has address + geometry, keyed by HANDLE)
     parcel_url = "https://static.stlouis-mo.gov/open-data/ASSESSOR/PARCELS.zip"
     parcel_dest = RAW_DIR / "PARCELS.zip"
-    if not parcel_dest.exists():
-        print("  Downloading parcel shapefile...")
-        try:
-            download(parcel_url, parcel_dest)
-            extract_dir = RAW_DIR / "parcels"
-            extract_dir.mkdir(exist_ok=True)
-            with zipfile.ZipFile(parcel_dest) as zf:
-                zf.extractall(extract_dir)
-            files = list(extract_dir.rglob("*"))
-            print(f"  Extracted {sum(1 for f in files if f.is_file())} files to parcels/")
-        except Exception as e:
-            print(f"  Failed to download parcel shapefile: {e}")
-    else:
-        print("  Parcel shapefile already downloaded")
+    print("  Downloading parcel shapefile...")
+    try:
+        download(parcel_url, parcel_dest)
+    except Exception as e:
+        print(f"  Failed to download parcel shapefile: {e}")
 
 
 ALL_SOURCES = {
@@ -312,34 +277,32 @@ def main():
         print(f"  Only: {args.only}")
     print("=" * 50)
 
-    # Static zip sources (from SOURCES dict)
-    for name, info in SOURCES.items():
-        if args.only and args.only != name:
-            continue
-        print(f"\n{info['desc']}")
-        url = info["url"]
-        filename = url.split("/")[-1]
-        dest = RAW_DIR / filename
-
+    # Static zip sources (from SOURCES dict) and crime CSVs share one pool
+    jobs = [
+        DownloadJob(info["url"], RAW_DIR / info["url"].split("/")[-1], label=name)
+        for name, info in SOURCES.items()
+        if not args.only or args.only == name
+    ]
+    static_count = len(jobs)
+    batch_crime = not args.only or args.only == "crime"
+    if batch_crime:
+        print("\nSLMPD Crime Data")
         try:
-            download(url, dest)
-
-            # Auto-extract zips into a subfolder
-            if dest.suffix == ".zip":
-                extract_dir = RAW_DIR / name
-                extract_dir.mkdir(exist_ok=True)
-                with zipfile.ZipFile(dest) as zf:
-                    zf.extractall(extract_dir)
-                contents = list(extract_dir.rglob("*"))
-                files = [f for f in contents if f.is_file()]
-                print(f"  Extracted {len(files)} files to {name}/")
-
+            jobs += crime_jobs()
         except Exception as e:
-            print(f"  Failed: {e}")
+            print(f"  Scraping failed: {e}")
+            print("  WARNING: Could not download crime data. Place CSV manually in python/data/raw/crime/")
+
+    if jobs:
+        print(f"\nDownloading {len(jobs)} files ({FETCH_WORKERS} workers)...")
+        start = time.monotonic()
+        results = DOWNLOADER.fetch_many(jobs)
+        DOWNLOADER.summarize(results, elapsed=time.monotonic() - start)
+        if batch_crime:
+            report_crime(results[static_count:])
 
     # Custom fetch sources
     custom_sources = [
-        ("crime", "SLMPD Crime Data", fetch_crime),
         ("arpa", "ARPA Fund Expenditures", fetch_arpa),
         ("demographics", "Neighborhood Demographics", fetch_demographics),
         ("vacancies", "Vacant Building List", fetch_vacancies),
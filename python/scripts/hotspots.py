@@ -0,0 +1,193 @@
+"""
+hotspots.py — Getis-Ord Gi* hotspot statistics over sparse spatial weights.
+
+Spatial weights are a binary sparse matrix (1 = neighbors, no diagonal),
+built once per layer and cached as .npz under data/cache/, named by a hash
+of the geometries/ids like areal.py:
+
+    W = SpatialWeights.queen(shapes, keys, cache_dir=CACHE_DIR)                  # polygons sharing a vertex
+    W = SpatialWeights.distance_band(xy_m, cell_ids, 500, cache_dir=CACHE_DIR)   # points within 500 m
+
+Gi* is then one sparse × dense product for any number of variables: each
+column of X (n_locations × k) is one period × category, and
+
+    z, p = gi_star(W, X)    # both (n_locations × k); p two-sided
+
+Gi* includes each location in its own neighborhood (w_ii = 1). Columns
+with no variance (all zero) get z = 0, p = 1. cube_hotspots() runs it over
+every month × category of a count cube (cube.py) in one batch.
+"""
+
+import base64
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import shapely
+from scipy import sparse
+from scipy.spatial import cKDTree
+from scipy.special import ndtr
+
+from cube import decode
+
+QUEEN_TOLERANCE = 1e-5  # degrees (~1 m): closes digitizing slivers between neighbors
+SIGNIFICANCE = 0.05
+
+
+class SpatialWeights:
+    def __init__(self, matrix: sparse.csr_matrix, ids):
+        self.matrix = matrix.tocsr()
+        self.ids = np.asarray(ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def cardinalities(self) -> np.ndarray:
+        return np.diff(self.matrix.indptr)
+
+    # ── Construction ──
+
+    @classmethod
+    def from_pairs(cls, i, j, ids) -> "SpatialWeights":
+        """Symmetric binary weights from (i, j) index pairs; self-pairs are dropped."""
+        i, j = np.asarray(i), np.asarray(j)
+        keep = i != j
+        i, j = np.concatenate([i[keep], j[keep]]), np.concatenate([j[keep], i[keep]])
+        matrix = sparse.csr_matrix((np.ones(len(i)), (i, j)), shape=(len(ids), len(ids)))
+        matrix.data[:] = 1.0  # duplicate pairs summed above
+        return cls(matrix, ids)
+
+    @classmethod
+    def queen(cls, shapes, ids, cache_dir: Path | None = None, tolerance: float = QUEEN_TOLERANCE) -> "SpatialWeights":
+        """Polygons that share any boundary point (within `tolerance`) are neighbors."""
+        shapes = np.asarray(shapes)
+        ids = np.asarray(ids).astype(str)
+
+        def build():
+            i, j = shapely.STRtree(shapes).query(shapely.buffer(shapes, tolerance), predicate="intersects")
+            return cls.from_pairs(i, j, ids)
+
+        digest = hashlib.sha256(f"queen:{tolerance}".encode())
+        digest.update("\0".join(ids).encode())
+        for wkb in shapely.to_wkb(shapes):
+            digest.update(wkb)
+        return cls._cached(cache_dir, "queen", digest, build)
+
+    @classmethod
+    def distance_band(cls, xy, ids, threshold: float, cache_dir: Path | None = None) -> "SpatialWeights":
+        """Points within `threshold` (same units as xy) of each other are neighbors."""
+        xy = np.ascontiguousarray(xy, dtype="float64")
+        ids = np.asarray(ids)
+
+        def build():
+            pairs = cKDTree(xy).query_pairs(threshold, output_type="ndarray")
+            return cls.from_pairs(pairs[:, 0], pairs[:, 1], ids)
+
+        digest = hashlib.sha256(f"band:{threshold}".encode())
+        digest.update(xy.tobytes())
+        digest.update(np.asarray(ids).astype(str).tobytes())
+        return cls._cached(cache_dir, "band", digest, build)
+
+    @classmethod
+    def _cached(cls, cache_dir: Path | None, kind: str, digest, build) -> "SpatialWeights":
+        if cache_dir is None:
+            return build()
+        path = cache_dir / f"weights-{kind}-{digest.hexdigest()[:16]}.npz"
+        if path.exists():
+            return cls.load(path)
+        weights = build()
+        weights.save(path)
+        return weights
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        m = self.matrix
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, indices=m.indices, indptr=m.indptr, shape=np.array(m.shape), ids=self.ids)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SpatialWeights":
+        with np.load(path) as z:
+            indices = z["indices"]
+            matrix = sparse.csr_matrix((np.ones(len(indices)), indices, z["indptr"]), shape=tuple(z["shape"]))
+            return cls(matrix, z["ids"])
+
+
+def gi_star(weights: SpatialWeights, X) -> tuple[np.ndarray, np.ndarray]:
+    """Gi* z-scores and two-sided p-values for every column of X (rows in weights.ids order)."""
+    X = np.asarray(X, dtype="float64")
+    if X.ndim == 1:
+        X = X[:, None]
+    n = X.shape[0]
+    if n != len(weights):
+        raise ValueError(f"X has {n} rows for {len(weights)} locations")
+
+    # Binary weights with the diagonal: Σw = Σw² = cardinality + 1
+    w = (weights.cardinalities + 1.0)[:, None]
+    lag = weights.matrix @ X + X
+    mean = X.mean(axis=0)
+    std = np.sqrt(np.maximum((X ** 2).mean(axis=0) - mean ** 2, 0))
+    denom = std * np.sqrt(np.maximum(n * w - w ** 2, 0) / max(n - 1, 1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(denom > 0, (lag - mean * w) / denom, 0.0)
+    return z, 2 * ndtr(-np.abs(z))
+
+
+def cube_hotspots(cube: dict, weights: SpatialWeights, year: int) -> dict:
+    """Gi* for every neighborhood × month × category cell of a count cube, plus `year` totals.
+
+    Adds cube["giStar"]: z × 100 as int16, same layout as the counts (0 for
+    neighborhoods without a polygon). Returns, per weights id:
+
+        {"giStar": {"z", "p"},                  # year total, all categories
+         "giStarMonthly": {month: z},           # months of `year`, all categories
+         "giStarCategories": {category: {"z", "p"}}}   # year, only p < SIGNIFICANCE
+
+    Neighborhoods with a polygon but no events count as zeros; cube rows
+    without a polygon are left out of the statistic. A year with no data
+    falls back to all months.
+    """
+    if not cube.get("total"):
+        return {}
+    counts = decode(cube["dtype"], cube["counts"], cube["shape"]).astype("float64")
+    _, n_months, n_cats = counts.shape
+
+    pos = {k: i for i, k in enumerate(cube["neighborhoods"])}
+    matched = [(i, pos[k]) for i, k in enumerate(weights.ids) if k in pos]
+    rows = np.array([i for i, _ in matched], dtype="int64")
+    src = np.array([j for _, j in matched], dtype="int64")
+    X = np.zeros((len(weights), n_months, n_cats))
+    X[rows] = counts[src]
+
+    months = [i for i, m in enumerate(cube["months"]) if m.startswith(f"{year}-")] or list(range(n_months))
+    by_year = X[:, months, :].sum(axis=1)
+
+    # One batch: month × category, month totals, year × category, year total
+    n = len(weights)
+    z, p = gi_star(weights, np.hstack([
+        X.reshape(n, -1), X.sum(axis=2), by_year, by_year.sum(axis=1, keepdims=True),
+    ]))
+    cells = n_months * n_cats
+    z_cells = z[:, :cells].reshape(n, n_months, n_cats)
+    z_months = z[:, cells:cells + n_months]
+    z_year, p_year = z[:, -n_cats - 1:-1], p[:, -n_cats - 1:-1]
+
+    out_z = np.zeros(counts.shape)
+    out_z[src] = z_cells[rows]
+    scaled = np.clip(np.rint(out_z * 100), -32768, 32767).astype("<i2")
+    cube["giStar"] = {"dtype": "int16", "scale": 0.01, "z": base64.b64encode(scaled.tobytes()).decode("ascii")}
+
+    r = lambda v: round(float(v), 2)  # noqa: E731
+    out = {}
+    for i, key in enumerate(weights.ids):
+        sig = np.flatnonzero(p_year[i] < SIGNIFICANCE)
+        out[str(key)] = {
+            "giStar": {"z": r(z[i, -1]), "p": round(float(p[i, -1]), 4)},
+            "giStarMonthly": {cube["months"][m]: r(z_months[i, m]) for m in months},
+            "giStarCategories": {
+                cube["categories"][c]: {"z": r(z_year[i, c]), "p": round(float(p_year[i, c]), 4)} for c in sig
+            },
+        }
+    return out
@@ -0,0 +1,75 @@
+"""
+proximity.py — Radius counts of point events around sites, via a KD-tree.
+
+Events (311 complaints, crime incidents) are projected to local meters
+around St. Louis and loaded into a scipy cKDTree once. Every site is then
+answered in one batched call per radius:
+
+    index = RadiusIndex(events["lat"], events["lng"], events["requested_at"])
+    counts = index.counts(parcels_lat, parcels_lng, 250)        # (n_sites,)
+    newest = index.recent(parcels_lat, parcels_lng, 250, n=5)   # row ids per site, newest first
+
+The projection is equirectangular about the city's latitude; over a
+~20 km city that is well within a meter of geodesic distance at these
+radii. Rows without coordinates are dropped from the tree; rows without a
+time sort after every dated row in recent(). Returned row ids always refer
+to positions in the arrays passed in.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_M = 6_371_008.8
+ORIGIN_LAT = 38.63  # St. Louis
+CHUNK_SITES = 512  # sites per query_ball_point list batch in recent()
+
+
+def project(lat, lng, origin_lat: float = ORIGIN_LAT) -> np.ndarray:
+    """(n, 2) local x/y meters for lat/lng degrees."""
+    lat = np.radians(np.asarray(lat, dtype="float64"))
+    lng = np.radians(np.asarray(lng, dtype="float64"))
+    return np.column_stack([EARTH_RADIUS_M * np.cos(np.radians(origin_lat)) * lng, EARTH_RADIUS_M * lat])
+
+
+class RadiusIndex:
+    def __init__(self, lat, lng, times=None):
+        xy = project(lat, lng)
+        keep = np.flatnonzero(np.isfinite(xy).all(axis=1))
+        if times is not None:
+            # Newest first, so tree position order is recency order; undated rows last
+            t = np.asarray(times, dtype="datetime64[s]")[keep]
+            undated = np.isnat(t)
+            seconds = np.where(undated, 0, t.astype("int64"))
+            keep = keep[np.lexsort((-seconds, undated))]
+        self.rows = keep
+        self.tree = cKDTree(xy[keep])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def counts(self, lat, lng, radius_m: float) -> np.ndarray:
+        """Events within `radius_m` of each site."""
+        if not len(self.rows):
+            return np.zeros(len(np.atleast_1d(lat)), dtype="int64")
+        sites = project(lat, lng)
+        ok = np.isfinite(sites).all(axis=1)
+        out = np.zeros(len(sites), dtype="int64")
+        out[ok] = self.tree.query_ball_point(sites[ok], radius_m, return_length=True, workers=-1)
+        return out
+
+    def recent(self, lat, lng, radius_m: float, n: int) -> list[np.ndarray]:
+        """Row ids of the `n` newest events within `radius_m` of each site (needs `times`)."""
+        sites = project(lat, lng)
+        out = [np.empty(0, dtype="int64") for _ in range(len(sites))]
+        if not len(self.rows):
+            return out
+        ok = np.flatnonzero(np.isfinite(sites).all(axis=1))
+        for start in range(0, len(ok), CHUNK_SITES):
+            chunk = ok[start:start + CHUNK_SITES]
+            for i, hits in zip(chunk, self.tree.query_ball_point(sites[chunk], radius_m, workers=-1)):
+                if hits:
+                    hits = np.asarray(hits)
+                    if len(hits) > n:
+                        hits = np.partition(hits, n - 1)[:n]
+                    out[i] = self.rows[np.sort(hits)]  # tree order = newest first
+        return out
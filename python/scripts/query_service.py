@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+query_service.py — Local HTTP service for aggregate queries over public/data/.
+
+Loads the processed outputs once (lazily, per dataset) and answers small
+parameterized queries, so a client asks for a few KB instead of fetching
+whole datasets:
+
+    GET /counts?dataset=crime&by=neighborhood&start=2024-01&end=2024-06&category=ASSAULT
+    GET /hours?dataset=csb&start=2024-01&end=2024-12
+    GET /vacancies/top?n=20&neighborhood=Downtown&type=building&bestUse=housing
+    GET /stops/near?lat=38.627&lng=-90.199&radius=800&limit=10
+    GET /health
+
+Counts come from the neighborhood × month × category cubes (cube.py);
+`by` is neighborhood, month or category (omit it for a single total), and
+neighborhood/category take comma-separated lists. Month bounds are
+inclusive YYYY-MM.
+
+Responses are JSON with a strong ETag (hash of the body); a request whose
+If-None-Match matches gets 304 with no body. Results are kept in an LRU
+cache keyed by the normalized query, so repeated slider positions are
+served without touching the arrays.
+
+Usage:
+  cd python/
+  uv run python scripts/query_service.py            # http://127.0.0.1:8765
+  uv run python scripts/query_service.py --port 9000
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import sys
+import threading
+import traceback
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("Missing dependency: uv sync")
+
+from cube import decode
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
+DATA_DIR = PYTHON_DIR.parent / "public" / "data"
+
+CACHE_SIZE = 512
+MAX_REQUEST_BYTES = 16 * 1024
+EARTH_RADIUS_M = 6_371_000
+REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class QueryError(ValueError):
+    """Bad query parameters (HTTP 400)."""
+
+
+def _list(params: dict, name: str) -> list[str] | None:
+    value = params.get(name, "").strip()
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+
+def _number(params: dict, name: str, default=None, cast=float):
+    if name not in params:
+        if default is None:
+            raise QueryError(f"Missing parameter: {name}")
+        return default
+    try:
+        return cast(params[name])
+    except ValueError:
+        raise QueryError(f"Bad {name}: {params[name]!r}") from None
+
+
+# ── Datasets ──
+
+class Datasets:
+    """Processed outputs, each read from DATA_DIR on first use and then kept in memory."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+        self.loaded: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _json(self, name: str):
+        path = self.data_dir / name
+        if not path.exists():
+            raise FileNotFoundError(f"{name} not found — run scripts/clean_data.py first")
+        with open(path) as f:
+            return json.load(f)
+
+    def _once(self, key: str, load):
+        with self._lock:
+            if key not in self.loaded:
+                self.loaded[key] = load()
+            return self.loaded[key]
+
+    def cube(self, dataset: str) -> dict:
+        if dataset not in ("crime", "csb"):
+            raise QueryError(f"Unknown dataset: {dataset!r}")
+        return self._once(f"{dataset}_cube", lambda: self._load_cube(dataset))
+
+    def vacancies(self) -> dict:
+        return self._once("vacancies", self._load_vacancies)
+
+    def stops(self) -> dict:
+        return self._once("stops", self._load_stops)
+
+    def _load_cube(self, dataset: str) -> dict:
+        cube = self._json(f"{dataset}_cube.json")
+        if not cube.get("total"):
+            shape = [len(cube["neighborhoods"]), len(cube["months"]), len(cube["categories"])]
+            counts, hours = np.zeros(shape, dtype="int64"), np.zeros((len(cube["months"]), 7, 24), dtype="int64")
+        else:
+            counts = decode(cube["dtype"], cube["counts"], cube["shape"]).astype("int64")
+            margin = cube["hourWeekday"]
+            hours = decode(margin["dtype"], margin["counts"], margin["shape"]).astype("int64")
+        return {
+            "neighborhoods": cube["neighborhoods"],
+            "months": cube["months"],
+            "categories": cube["categories"],
+            "counts": counts,
+            "hours": hours,
+        }
+
+    def _load_vacancies(self) -> dict:
+        records = self._json("vacancies.json")
+        scores = np.array([r.get("triageScore") or 0 for r in records], dtype="float64")
+        order = np.argsort(-scores, kind="stable")
+        return {"records": [records[i] for i in order]}
+
+    def _load_stops(self) -> dict:
+        features = self._json("stops.geojson")["features"]
+        stats_path = self.data_dir / "stop_stats.json"
+        stats = self._json("stop_stats.json") if stats_path.exists() else {}
+        coords = np.array([f["geometry"]["coordinates"] for f in features], dtype="float64").reshape(-1, 2)
+        return {
+            "props": [f["properties"] for f in features],
+            "lng": np.radians(coords[:, 0]),
+            "lat": np.radians(coords[:, 1]),
+            "stats": stats,
+        }
+
+
+# ── Queries ──
+
+class QueryEngine:
+    def __init__(self, datasets: Datasets, cache_size: int = CACHE_SIZE):
+        self.datasets = datasets
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+        self.routes = {
+            "/counts": self.counts,
+            "/hours": self.hours,
+            "/vacancies/top": self.top_vacancies,
+            "/stops/near": self.stops_near,
+            "/health": self.health,
+        }
+
+    # The LRU cache is only touched from the event loop; compute() may run in a thread
+
+    def cached(self, key: tuple) -> tuple[bytes, str] | None:
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+
+    def store(self, key: tuple, result: tuple[bytes, str]) -> None:
+        if key[0] == "/health":
+            return
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def compute(self, path: str, params: dict) -> tuple[bytes, str]:
+        """(JSON body, ETag) for a route."""
+        body = json.dumps(self.routes[path](params), separators=(",", ":")).encode()
+        return body, '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+    def _cube_slice(self, params: dict) -> tuple[dict, slice, np.ndarray, np.ndarray]:
+        cube = self.datasets.cube(params.get("dataset", "crime"))
+        months = cube["months"]
+        lo = bisect_left(months, params["start"]) if params.get("start") else 0
+        hi = bisect_right(months, params["end"]) if params.get("end") else len(months)
+
+        def index(name: str, labels: list[str]) -> np.ndarray:
+            wanted = _list(params, name)
+            if wanted is None:
+                return np.arange(len(labels))
+            lookup = {label: i for i, label in enumerate(labels)}
+            return np.array([lookup[w] for w in wanted if w in lookup], dtype="int64")
+
+        return cube, slice(lo, hi), index("neighborhood", cube["neighborhoods"]), index("category", cube["categories"])
+
+    def counts(self, params: dict) -> dict:
+        cube, months, hoods, cats = self._cube_slice(params)
+        sub = cube["counts"][hoods][:, months][:, :, cats]
+        by = params.get("by")
+        axes = {"neighborhood": 0, "month": 1, "category": 2}
+        if by is None:
+            return {"total": int(sub.sum())}
+        if by not in axes:
+            raise QueryError(f"Bad by: {by!r} (neighborhood, month or category)")
+        labels = {
+            "neighborhood": [cube["neighborhoods"][i] for i in hoods],
+            "month": cube["months"][months],
+            "category": [cube["categories"][i] for i in cats],
+        }[by]
+        totals = sub.sum(axis=tuple(a for a in axes.values() if a != axes[by]))
+        counts = {label: int(c) for label, c in zip(labels, totals) if c}
+        return {"total": int(sub.sum()), "by": by, "counts": counts}
+
+    def hours(self, params: dict) -> dict:
+        """City-wide weekday (0 = Monday) × hour counts over the month range."""
+        if _list(params, "neighborhood") or _list(params, "category"):
+            raise QueryError("hour × weekday margins are city-wide; drop neighborhood/category")
+        cube, months, _, _ = self._cube_slice(params)
+        matrix = cube["hours"][months].sum(axis=0)
+        return {"total": int(matrix.sum()), "weekdayHour": matrix.tolist()}
+
+    def top_vacancies(self, params: dict) -> dict:
+        n = _number(params, "n", 20, int)
+        if not 1 <= n <= 500:
+            raise QueryError("n must be 1–500")
+        filters = {
+            "neighborhood": _list(params, "neighborhood"),
+            "propertyType": _list(params, "type"),
+            "bestUse": _list(params, "bestUse"),
+            "owner": _list(params, "owner"),
+        }
+        fields = ("id", "parcelId", "address", "lat", "lng", "neighborhood", "propertyType", "owner",
+                  "triageScore", "bestUse", "vacancyCategory")
+        out = []
+        for r in self.datasets.vacancies()["records"]:
+            if all(allowed is None or str(r.get(k)) in allowed for k, allowed in filters.items()):
+                out.append({k: r.get(k) for k in fields})
+                if len(out) == n:
+                    break
+        return {"count": len(out), "vacancies": out}
+
+    def stops_near(self, params: dict) -> dict:
+        lat, lng = _number(params, "lat"), _number(params, "lng")
+        radius = _number(params, "radius", 800.0)
+        limit = _number(params, "limit", 20, int)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or radius <= 0:
+            raise QueryError("Bad lat/lng/radius")
+        if limit < 1:
+            raise QueryError("limit must be at least 1")
+        stops = self.datasets.stops()
+        # Haversine distance from the query point to every stop
+        phi, lam = math.radians(lat), math.radians(lng)
+        h = np.sin((stops["lat"] - phi) / 2) ** 2 + math.cos(phi) * np.cos(stops["lat"]) * np.sin((stops["lng"] - lam) / 2) ** 2
+        dist = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+        within = np.flatnonzero(dist <= radius)
+        nearest = within[np.argsort(dist[within], kind="stable")][:limit]
+        out = []
+        for i in nearest:
+            props = stops["props"][i]
+            stat = stops["stats"].get(props.get("stop_id", ""), {})
+            out.append({
+                **props,
+                "lat": round(math.degrees(stops["lat"][i]), 6),
+                "lng": round(math.degrees(stops["lng"][i]), 6),
+                "distanceM": round(float(dist[i]), 1),
+                "tripCount": stat.get("trip_count", 0),
+                "routes": stat.get("routes", []),
+            })
+        return {"count": int(len(within)), "stops": out}
+
+    def health(self, params: dict) -> dict:
+        return {"dataDir": str(self.datasets.data_dir), "loaded": sorted(self.datasets.loaded), "cached": len(self._cache)}
+
+
+# ── HTTP ──
+
+def _response(status: int, body: bytes = b"", headers: dict | None = None) -> bytes:
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    head += [f"{k}: {v}" for k, v in {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "Access-Control-Allow-Origin": "*",
+        "Connection": "close",
+        **(headers or {}),
+    }.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+
+def _error(status: int, message: str) -> bytes:
+    return _response(status, json.dumps({"error": message}).encode())
+
+
+async def handle(engine: QueryEngine, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        try:
+            raw = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            return
+        writer.write(await _reply(engine, raw))
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _reply(engine: QueryEngine, raw: bytes) -> bytes:
+    lines = raw.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if len(parts) != 3:
+        return _error(400, "Malformed request line")
+    if parts[0] != "GET":
+        return _error(405, "Only GET is supported")
+
+    url = urlsplit(parts[1])
+    path = url.path.rstrip("/") or "/"
+    if path not in engine.routes:
+        return _error(404, f"Unknown path: {url.path}")
+    params = dict(parse_qsl(url.query))
+    key = (path, tuple(sorted(params.items())))
+    result = engine.cached(key)
+    if result is None:
+        try:
+            # A dataset's first use reads JSON from disk; keep it off the event loop
+            result = await asyncio.to_thread(engine.compute, path, params)
+        except QueryError as e:
+            return _error(400, str(e))
+        except FileNotFoundError as e:
+            return _error(404, str(e))
+        except Exception as e:
+            traceback.print_exc()
+            return _error(500, f"{type(e).__name__}: {e}")
+        engine.store(key, result)
+
+    body, etag = result
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+        return _response(304, headers=cache_headers)
+    return _response(200, body, cache_headers)
+
+
+async def serve(host: str, port: int, data_dir: Path = DATA_DIR) -> None:
+    engine = QueryEngine(Datasets(data_dir))
+    server = await asyncio.start_server(
+        lambda r, w: handle(engine, r, w), host, port, limit=MAX_REQUEST_BYTES
+    )
+    print(f"Serving {data_dir} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local aggregate query service over public/data/")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+raw_store.py — Read raw datasets straight out of their downloaded archives.
+
+fetch_raw.py keeps each source as the zip it was served as (csb.zip,
+neighborhoods.zip, google_transit.zip, ...). RawStore opens CSVs and
+shapefiles directly from the archive members, streaming, so nothing is
+extracted to disk. A dataset that has no archive (crime CSVs) or that was
+extracted by an older fetch_raw.py is read from data/raw/<dataset>/.
+
+    store = RawStore(RAW_DIR)
+    for name in store.members("csb", ".csv"):
+        with store.open_text("csb", name) as f:
+            ...
+    sf = store.shapefile_reader("tiger_tracts")   # pyshp, file-like members
+    gdf = gpd.read_file(store.gdal_path("parcels"))  # zip:// path
+"""
+
+import io
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# dataset -> archive filename in RAW_DIR (None = plain directory of files)
+ARCHIVES = {
+    "csb": "csb.zip",
+    "neighborhoods": "neighborhoods.zip",
+    "gtfs": "google_transit.zip",
+    "tiger_tracts": "tl_2024_29_tract.zip",
+    "parcels": "PARCELS.zip",
+    "crime": None,
+}
+
+
+class RawStore:
+    def __init__(self, raw_dir: Path):
+        self.raw_dir = raw_dir
+        self._zips: dict[str, zipfile.ZipFile] = {}
+
+    def archive(self, dataset: str) -> Path | None:
+        """Path of the dataset's zip if it has been downloaded, else None."""
+        name = ARCHIVES.get(dataset)
+        path = self.raw_dir / name if name else None
+        return path if path and path.exists() else None
+
+    def directory(self, dataset: str) -> Path:
+        return self.raw_dir / dataset
+
+    def exists(self, dataset: str) -> bool:
+        return self.archive(dataset) is not None or self.directory(dataset).exists()
+
+    def members(self, dataset: str, suffix: str = "") -> list[str]:
+        """Sorted member names (archive-relative or dir-relative) ending in `suffix`."""
+        suffix = suffix.lower()
+        zf = self._zip(dataset)
+        if zf is not None:
+            names = [n for n in zf.namelist() if not n.endswith("/")]
+        elif self.directory(dataset).exists():
+            base = self.directory(dataset)
+            names = [p.relative_to(base).as_posix() for p in base.rglob("*") if p.is_file()]
+        else:
+            names = []
+        return sorted(n for n in names if n.lower().endswith(suffix) and not n.startswith("__MACOSX"))
+
+    def has(self, dataset: str, member: str) -> bool:
+        """True if a member with this basename exists (GTFS files may sit in a subfolder)."""
+        return self._resolve(dataset, member) is not None
+
+    def fingerprint(self, dataset: str, member: str) -> str:
+        """Cheap change detector: CRC-32 + size for archive members, size + mtime for files."""
+        resolved = self._resolve(dataset, member)
+        if resolved is None:
+            raise FileNotFoundError(f"{member} not found in raw {dataset}")
+        zf = self._zip(dataset)
+        if zf is not None:
+            info = zf.getinfo(resolved)
+            return f"crc32:{info.CRC:08x}:{info.file_size}"
+        st = (self.directory(dataset) / resolved).stat()
+        return f"stat:{st.st_size}:{st.st_mtime_ns}"
+
+    def open_binary(self, dataset: str, member: str):
+        resolved = self._resolve(dataset, member)
+        if resolved is None:
+            raise FileNotFoundError(f"{member} not found in raw {dataset}")
+        zf = self._zip(dataset)
+        if zf is not None:
+            return zf.open(resolved)
+        return open(self.directory(dataset) / resolved, "rb")
+
+    def open_text(self, dataset: str, member: str, encoding: str = "utf-8-sig", errors: str = "replace"):
+        return io.TextIOWrapper(self.open_binary(dataset, member), encoding=encoding, errors=errors, newline="")
+
+    @contextmanager
+    def shapefile_reader(self, dataset: str, shp: str | None = None):
+        """pyshp Reader over the .shp/.shx/.dbf members (first .shp if not given)."""
+        import shapefile  # pyshp
+
+        shp = shp or self._first_shp(dataset)
+        stem = shp[:-4]
+        handles = {"shp": self.open_binary(dataset, shp)}
+        for ext in ("shx", "dbf"):
+            if self.has(dataset, f"{stem}.{ext}"):
+                handles[ext] = self.open_binary(dataset, f"{stem}.{ext}")
+        try:
+            with shapefile.Reader(**handles) as sf:
+                yield sf
+        finally:
+            for h in handles.values():
+                h.close()
+
+    def gdal_path(self, dataset: str, shp: str | None = None) -> str:
+        """Path string geopandas/pyogrio can open without extraction."""
+        shp = shp or self._first_shp(dataset)
+        archive = self.archive(dataset)
+        if archive is not None:
+            return f"zip://{archive}!{shp}"
+        return str(self.directory(dataset) / shp)
+
+    def close(self) -> None:
+        for zf in self._zips.values():
+            zf.close()
+        self._zips.clear()
+
+    def _first_shp(self, dataset: str) -> str:
+        shps = self.members(dataset, ".shp")
+        if not shps:
+            raise FileNotFoundError(f"No .shp files found in raw {dataset}")
+        return shps[0]
+
+    def _zip(self, dataset: str) -> zipfile.ZipFile | None:
+        if dataset not in self._zips:
+            archive = self.archive(dataset)
+            if archive is None:
+                return None
+            self._zips[dataset] = zipfile.ZipFile(archive)
+        return self._zips[dataset]
+
+    def _resolve(self, dataset: str, member: str) -> str | None:
+        names = self.members(dataset)
+        if member in names:
+            return member
+        base = member.rsplit("/", 1)[-1]
+        return next((n for n in names if n.rsplit("/", 1)[-1] == base), None)
@@ -0,0 +1,172 @@
+"""
+sketch.py — Mergeable, bounded-memory quantile sketches.
+
+A DDSketch-style log-bucket histogram: a positive value v lands in bucket
+ceil(log_γ v) with γ = (1 + α) / (1 - α), so every quantile estimate is
+within relative error α of a true sample value. Values below MIN_VALUE
+(including zeros) share one zero bucket. Memory depends only on the value
+range, never on how many values were added — about 650 buckets cover one
+minute to a year at α = 1% — and two sketches merge exactly by adding
+bucket counts, so partial sketches from different files, batches or
+worker processes combine into the same result as one pass over all data.
+Each sketch also keeps the exact sum of its values, so the mean comes out
+of the same pass.
+
+    by_hood = SketchGroup()
+    for batch in batches:
+        by_hood.add(batch["neighborhood"], batch["days"])   # vectorized
+    by_hood.merge(SketchGroup.from_dict(other_worker))     # e.g. via JSON
+    by_hood.summary()   # {hood: {"count": n, "p50": …, "p90": …, "p99": …}}
+    by_hood.means()     # {hood: exact mean}
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+RELATIVE_ACCURACY = 0.01
+MIN_VALUE = 1 / 1440  # one minute, in days
+MAX_BINS = 2048
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileSketch:
+    def __init__(self, alpha: float = RELATIVE_ACCURACY, max_bins: int = MAX_BINS):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins: dict[int, int] = {}
+        self.zero = 0
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.bins.values())
+
+    @property
+    def mean(self) -> float | None:
+        n = self.count
+        return self.sum / n if n else None
+
+    def bucket(self, values: np.ndarray) -> np.ndarray:
+        """Bucket index per value; -2^31 marks the zero bucket."""
+        values = np.asarray(values, dtype="float64")
+        small = values < MIN_VALUE
+        idx = np.ceil(np.log(np.where(small, 1.0, values)) / self.log_gamma)
+        return np.where(small, np.iinfo("int32").min, idx).astype("int32")
+
+    def add_counts(self, buckets, counts) -> None:
+        zero = np.iinfo("int32").min
+        for b, c in zip(np.asarray(buckets).tolist(), np.asarray(counts).tolist()):
+            if b == zero:
+                self.zero += c
+            else:
+                self.bins[b] = self.bins.get(b, 0) + c
+        self._collapse()
+
+    def add(self, values) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        buckets, counts = np.unique(self.bucket(values), return_counts=True)
+        self.add_counts(buckets, counts)
+        self.sum += float(values.sum())
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.zero += other.zero
+        self.sum += other.sum
+        for b, c in other.bins.items():
+            self.bins[b] = self.bins.get(b, 0) + c
+        self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets together past max_bins (keeps the upper quantiles exact)."""
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        cut = keys[len(keys) - self.max_bins]
+        folded = sum(self.bins.pop(k) for k in keys if k < cut)
+        self.bins[cut] += folded
+
+    def quantile(self, q: float) -> float | None:
+        n = self.count
+        if n == 0:
+            return None
+        rank = q * (n - 1)
+        if rank < self.zero:
+            return 0.0
+        seen = self.zero
+        for b in sorted(self.bins):
+            seen += self.bins[b]
+            if seen > rank:
+                return 2 * self.gamma ** b / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def summary(self, quantiles=QUANTILES, digits: int = 1) -> dict:
+        out = {"count": self.count}
+        for q in quantiles:
+            v = self.quantile(q)
+            out[f"p{round(q * 100):g}"] = round(v, digits) if v is not None else None
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha, "zero": self.zero, "sum": self.sum,
+            "bins": {str(b): c for b, c in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(alpha=data["alpha"])
+        sketch.zero = data["zero"]
+        sketch.sum = data.get("sum", 0.0)
+        sketch.bins = {int(b): c for b, c in data["bins"].items()}
+        return sketch
+
+
+class SketchGroup:
+    """One QuantileSketch per key, updated from whole columns at a time."""
+
+    def __init__(self, alpha: float = RELATIVE_ACCURACY):
+        self.alpha = alpha
+        self.sketches: dict[str, QuantileSketch] = {}
+        self._proto = QuantileSketch(alpha)
+
+    def add(self, keys, values) -> None:
+        frame = pd.DataFrame({"key": np.asarray(keys), "value": np.asarray(values, dtype="float64")}).dropna()
+        if frame.empty:
+            return
+        frame["bucket"] = self._proto.bucket(frame["value"].to_numpy())
+        counts = frame.groupby(["key", "bucket"], sort=False).size()
+        sums = frame.groupby("key", sort=False)["value"].sum()
+        for key, part in counts.groupby(level=0, sort=False):
+            sketch = self.sketches.setdefault(str(key), QuantileSketch(self.alpha))
+            sketch.add_counts(part.index.get_level_values(1), part.to_numpy())
+            sketch.sum += float(sums[key])
+
+    def merge(self, other: "SketchGroup") -> "SketchGroup":
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = QuantileSketch.from_dict(sketch.to_dict())
+        return self
+
+    def summary(self, quantiles=QUANTILES, digits: int = 1) -> dict:
+        return {key: s.summary(quantiles, digits) for key, s in self.sketches.items()}
+
+    def means(self) -> dict:
+        return {key: s.mean for key, s in self.sketches.items()}
+
+    def to_dict(self) -> dict:
+        return {key: s.to_dict() for key, s in self.sketches.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SketchGroup":
+        group = cls(alpha=next(iter(data.values()))["alpha"] if data else RELATIVE_ACCURACY)
+        group.sketches = {key: QuantileSketch.from_dict(s) for key, s in data.items()}
+        return group
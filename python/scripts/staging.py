@@ -0,0 +1,338 @@
+"""
+staging.py — Typed, partitioned Parquet copies of the raw event CSVs.
+
+CSB 311 and SLMPD crime CSVs are parsed once per source file into
+data/staging/<dataset>/year=YYYY/month=MM/part-<source>.parquet with
+normalized column names and real types (timestamps, floats, booleans).
+Downstream steps and notebooks then read only the partitions and columns
+they need, with filters pushed down to the Parquet scan:
+
+    from staging import read
+    df = read("crime", columns=["occurred_at", "offense", "lat", "lng"],
+              filters=[("year", "=", 2024), ("month", ">=", 6)])
+
+Each source file's fingerprint (raw_store.RawStore.fingerprint) is stored in
+data/staging/<dataset>/_sources.json; `ensure()` re-parses only sources that
+were added or changed since the last run. Rows whose date cannot be parsed
+land in the year=0/month=0 partition.
+
+Canonical columns (all other raw columns are kept as snake_case strings):
+
+    csb:   requested_at, closed_at, category, status, neighborhood, lat, lng
+    crime: occurred_at, offense, crime_code, description, neighborhood,
+           neighborhood_num, district, felony, firearm, lat, lng
+"""
+
+import json
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from raw_store import RawStore
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
+RAW_DIR = PYTHON_DIR / "data" / "raw"
+STAGING_DIR = PYTHON_DIR / "data" / "staging"
+
+DATASETS = ("csb", "crime")
+
+CSB_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d")
+CRIME_DATE_FORMATS = ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+SCHEMAS = {
+    "csb": {
+        "requested_at": pa.timestamp("ms"),
+        "closed_at": pa.timestamp("ms"),
+        "category": pa.string(),
+        "status": pa.string(),
+        "neighborhood": pa.string(),
+        "lat": pa.float64(),
+        "lng": pa.float64(),
+    },
+    "crime": {
+        "occurred_at": pa.timestamp("ms"),
+        "offense": pa.string(),
+        "crime_code": pa.string(),
+        "description": pa.string(),
+        "neighborhood": pa.string(),
+        "neighborhood_num": pa.string(),
+        "district": pa.string(),
+        "felony": pa.bool_(),
+        "firearm": pa.bool_(),
+        "lat": pa.float64(),
+        "lng": pa.float64(),
+    },
+}
+
+# Column that drives the year/month partition for each dataset
+TIME_COLUMN = {"csb": "requested_at", "crime": "occurred_at"}
+
+
+# ── Column detection (mirrors the heuristics clean_data.py used on dict rows) ──
+
+def _pick(cols: list[str], *tests) -> str | None:
+    for test in tests:
+        hit = next((c for c in cols if test(c)), None)
+        if hit:
+            return hit
+    return None
+
+
+def snake_case(name: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", name.strip().lstrip("﻿").lower()).strip("_")
+
+
+def parse_datetimes(values: pd.Series, formats: tuple[str, ...]) -> pd.Series:
+    """Vectorized strptime cascade: each format fills the rows still unparsed."""
+    s = values.fillna("").astype(str).str.strip()
+    out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    for fmt in formats:
+        todo = out.isna() & (s != "")
+        if not todo.any():
+            break
+        out[todo] = pd.to_datetime(s[todo], format=fmt, errors="coerce")
+    return out
+
+
+def web_mercator_to_lnglat(x, y):
+    """Convert Web Mercator (EPSG:3857) coordinates to lon/lat (EPSG:4326); scalars or arrays."""
+    lng = x * 180.0 / 20037508.34
+    lat = np.arctan(np.exp(y * np.pi / 20037508.34)) * 360.0 / np.pi - 90.0
+    return lng, lat
+
+
+def _float(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values, errors="coerce").astype("float64")
+
+
+def _text(values: pd.Series | None, index) -> pd.Series:
+    if values is None:
+        return pd.Series("", index=index, dtype=object)
+    return values.fillna("").astype(str).str.strip().astype(object)
+
+
+def normalize_csb(raw: pd.DataFrame) -> pd.DataFrame:
+    cols = list(raw.columns)
+    date_col = _pick(
+        cols,
+        lambda k: k.upper() == "DATETIMEINIT",
+        lambda k: "date" in k.lower() and "request" in k.lower(),
+        lambda k: "date" in k.lower() and "init" in k.lower(),
+        lambda k: "date" in k.lower(),
+    )
+    cat_col = _pick(
+        cols,
+        lambda k: k.upper() == "PROBLEMCODE",
+        lambda k: "problem" in k.lower() or "category" in k.lower(),
+        lambda k: "type" in k.lower(),
+    )
+    status_col = _pick(cols, lambda k: "status" in k.lower())
+    hood_col = _pick(cols, lambda k: "neighborhood" in k.lower() or "nhd" in k.lower())
+    lat_col = _pick(cols, lambda k: k.lower() in ("latitude", "lat", "y"))
+    lng_col = _pick(cols, lambda k: k.lower() in ("longitude", "lng", "lon", "long", "x"))
+    srx_col = _pick(cols, lambda k: k.upper() == "SRX")
+    sry_col = _pick(cols, lambda k: k.upper() == "SRY")
+    close_col = _pick(
+        cols,
+        lambda k: k.upper() == "DATETIMECLOSED",
+        lambda k: "close" in k.lower() and "date" in k.lower(),
+    )
+
+    idx = raw.index
+    out = pd.DataFrame(index=idx)
+    out["requested_at"] = parse_datetimes(raw[date_col], CSB_DATE_FORMATS) if date_col else pd.NaT
+    out["closed_at"] = parse_datetimes(raw[close_col], CSB_DATE_FORMATS) if close_col else pd.NaT
+    out["category"] = _text(raw.get(cat_col) if cat_col else None, idx)
+    out["status"] = _text(raw.get(status_col) if status_col else None, idx)
+    out["neighborhood"] = _text(raw.get(hood_col) if hood_col else None, idx)
+
+    lat = _float(raw[lat_col]) if lat_col and lng_col else pd.Series(np.nan, index=idx)
+    lng = _float(raw[lng_col]) if lat_col and lng_col else pd.Series(np.nan, index=idx)
+    if srx_col and sry_col:
+        # SRX/SRY are Web Mercator (EPSG:3857); use them where lat/lon is missing
+        sx, sy = _float(raw[srx_col]), _float(raw[sry_col])
+        use = (lat.isna() | lng.isna()) & sx.notna() & sy.notna() & (sx != 0) & (sy != 0)
+        merc_lng, merc_lat = web_mercator_to_lnglat(sx, sy)
+        lng = lng.where(~use, merc_lng)
+        lat = lat.where(~use, merc_lat)
+    out["lat"] = lat
+    out["lng"] = lng
+
+    used = {date_col, cat_col, status_col, hood_col, lat_col, lng_col, close_col}
+    return _with_extras(out, raw, used)
+
+
+def normalize_crime(raw: pd.DataFrame) -> pd.DataFrame:
+    cols = list(raw.columns)
+    date_col = _pick(
+        cols,
+        lambda k: k.upper() in ("DATEOCCUR", "DATE_OCCUR", "DATEOCCURRED"),
+        lambda k: "date" in k.lower(),
+    )
+    crime_col = _pick(
+        cols,
+        lambda k: k.upper() in ("CRIME", "OFFENSE", "NIBRS"),
+        lambda k: "crime" in k.lower() or "offense" in k.lower(),
+    )
+    desc_col = _pick(cols, lambda k: k.upper() == "DESCRIPTION", lambda k: "desc" in k.lower())
+    hood_col = _pick(
+        cols,
+        lambda k: k.upper() in ("NEIGHBORHOOD", "NBRHD"),
+        lambda k: "neighborhood" in k.lower(),
+    )
+    hood_num_col = _pick(
+        cols,
+        lambda k: k.upper() in ("NBHDNUM", "NEIGHBORHOODNUM", "NHD_NUM"),
+        lambda k: "nbhd" in k.lower() and "num" in k.lower(),
+    )
+    lat_col = _pick(cols, lambda k: k.upper() in ("XLAT", "LAT", "LATITUDE"))
+    lng_col = _pick(cols, lambda k: k.upper() in ("XLON", "LON", "LONGITUDE", "LONG"))
+    fel_col = _pick(cols, lambda k: k.upper() in ("FELMISCIT", "CRIME_TYPE"))
+    firearm_col = _pick(cols, lambda k: k.upper() in ("FIREARMUSED", "FIREARM"))
+    district_col = _pick(cols, lambda k: k.upper() == "DISTRICT")
+
+    idx = raw.index
+    out = pd.DataFrame(index=idx)
+    out["occurred_at"] = parse_datetimes(raw[date_col], CRIME_DATE_FORMATS) if date_col else pd.NaT
+    out["crime_code"] = _text(raw.get(crime_col) if crime_col else None, idx)
+    out["description"] = _text(raw.get(desc_col) if desc_col else None, idx)
+    # Use description if available, else crime code
+    offense = out["description"].where(out["description"] != "", out["crime_code"])
+    out["offense"] = offense.where(offense != "", "Unknown")
+    out["neighborhood"] = _text(raw.get(hood_col) if hood_col else None, idx)
+    out["neighborhood_num"] = _text(raw.get(hood_num_col) if hood_num_col else None, idx)
+    out["district"] = _text(raw.get(district_col) if district_col else None, idx)
+    fel = _text(raw.get(fel_col) if fel_col else None, idx).str.upper()
+    out["felony"] = fel.str.startswith("FEL")
+    fa = _text(raw.get(firearm_col) if firearm_col else None, idx).str.upper()
+    out["firearm"] = fa.isin(("Y", "YES", "TRUE", "1"))
+    out["lat"] = _float(raw[lat_col]) if lat_col else np.nan
+    out["lng"] = _float(raw[lng_col]) if lng_col else np.nan
+
+    used = {date_col, crime_col, desc_col, hood_col, hood_num_col, lat_col, lng_col, fel_col, firearm_col, district_col}
+    return _with_extras(out, raw, used)
+
+
+NORMALIZERS = {"csb": normalize_csb, "crime": normalize_crime}
+
+
+def _with_extras(out: pd.DataFrame, raw: pd.DataFrame, used: set) -> pd.DataFrame:
+    """Append the remaining raw columns as snake_case strings."""
+    for col in raw.columns:
+        if col in used:
+            continue
+        name = snake_case(col)
+        if not name or name in out.columns or name in ("year", "month"):
+            continue
+        out[name] = raw[col].fillna("").astype(str).astype(object)
+    return out
+
+
+# ── Ingest ───────────────────────────────────────────────────────────────────
+
+def _source_id(member: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", member).strip("-")
+
+
+def _arrow_schema(dataset: str, df: pd.DataFrame) -> pa.Schema:
+    typed = SCHEMAS[dataset]
+    return pa.schema([(c, typed.get(c, pa.string())) for c in df.columns])
+
+
+def _drop_source(dataset_dir: Path, source_id: str) -> None:
+    for part in dataset_dir.glob(f"year=*/month=*/part-{source_id}.parquet"):
+        part.unlink()
+        for parent in (part.parent, part.parent.parent):
+            if parent != dataset_dir and not any(parent.iterdir()):
+                parent.rmdir()
+
+
+def ingest_source(store: RawStore, dataset: str, member: str, dataset_dir: Path) -> int:
+    """Parse one raw CSV and write its rows into the year/month partitions."""
+    with store.open_binary(dataset, member) as f:
+        raw = pd.read_csv(f, dtype=str, keep_default_na=False, encoding="utf-8-sig", encoding_errors="replace")
+    df = NORMALIZERS[dataset](raw)
+    ts = df[TIME_COLUMN[dataset]]
+    year = ts.dt.year.fillna(0).astype("int32")
+    month = ts.dt.month.fillna(0).astype("int32")
+
+    source_id = _source_id(member)
+    _drop_source(dataset_dir, source_id)
+    schema = _arrow_schema(dataset, df)
+    for (y, m), chunk in df.groupby([year, month], sort=True):
+        part_dir = dataset_dir / f"year={y}" / f"month={m}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        pq.write_table(table, part_dir / f"part-{source_id}.parquet", compression="zstd")
+    return len(df)
+
+
+def ensure(dataset: str, store: RawStore | None = None, staging_dir: Path = STAGING_DIR, log=print) -> Path:
+    """Bring data/staging/<dataset>/ up to date with the raw CSVs. Returns the dataset dir."""
+    store = store or RawStore(RAW_DIR)
+    dataset_dir = staging_dir / dataset
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    state_path = dataset_dir / "_sources.json"
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+    members = store.members(dataset, ".csv") if store.exists(dataset) else []
+    for gone in set(state) - set(members):
+        _drop_source(dataset_dir, _source_id(gone))
+        del state[gone]
+
+    for member in members:
+        fp = store.fingerprint(dataset, member)
+        if state.get(member, {}).get("fingerprint") == fp:
+            continue
+        rows = ingest_source(store, dataset, member, dataset_dir)
+        state[member] = {"fingerprint": fp, "rows": rows}
+        state_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+        log(f"Staged {member} ({rows:,} rows)")
+
+    state_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+    return dataset_dir
+
+
+def rebuild(dataset: str, **kwargs) -> Path:
+    """Drop and re-stage a dataset from scratch."""
+    staging_dir = kwargs.get("staging_dir", STAGING_DIR)
+    shutil.rmtree(staging_dir / dataset, ignore_errors=True)
+    return ensure(dataset, **kwargs)
+
+
+# ── Read ─────────────────────────────────────────────────────────────────────
+
+def dataset(name: str, staging_dir: Path = STAGING_DIR) -> ds.Dataset:
+    """pyarrow Dataset over all partitions, with the schema unified across source files."""
+    path = staging_dir / name
+    base = ds.dataset(path, format="parquet", partitioning="hive", exclude_invalid_files=True)
+    fragments = list(base.get_fragments())
+    if not fragments:
+        return base
+    schema = pa.unify_schemas([base.schema] + [frag.physical_schema for frag in fragments])
+    return ds.dataset(path, format="parquet", partitioning="hive", schema=schema, exclude_invalid_files=True)
+
+
+def read(
+    name: str,
+    columns: list[str] | None = None,
+    filters: list | None = None,
+    staging_dir: Path = STAGING_DIR,
+) -> pd.DataFrame:
+    """Read a staged dataset into pandas.
+
+    `filters` uses the pandas/pyarrow DNF form, e.g.
+    [("year", "in", [2024, 2025]), ("category", "=", "WTR-LEAK")]. Filters on
+    year/month prune whole partitions; the rest are pushed into the scan.
+    """
+    if not (staging_dir / name).exists():
+        raise FileNotFoundError(f"No staged {name} data — run `clean_data.py --only staging`")
+    expr = pq.filters_to_expression(filters) if filters else None
+    table = dataset(name, staging_dir).to_table(columns=columns, filter=expr)
+    return table.to_pandas()
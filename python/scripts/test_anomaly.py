@@ -0,0 +1,61 @@
+"""
+test_anomaly.py — anomaly.py flags planted spikes and ignores stray history.
+
+    uv run pytest scripts/test_anomaly.py     # or: python test_anomaly.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from anomaly import baseline, detect
+
+
+def poisson_events(rate: float = 3.0, start: str = "2023-01-01", end: str = "2025-12-31", seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, end, freq="D")
+    per_day = rng.poisson(rate, len(days))
+    times = np.repeat(days.to_numpy(), per_day) + pd.to_timedelta(rng.uniform(0, 86400, per_day.sum()), unit="s").to_numpy()
+    return pd.Series(times)
+
+
+def alerts(times: pd.Series, **kwargs) -> list[dict]:
+    hoods = pd.Series("35", index=times.index)
+    return detect(times, {"neighborhood": hoods}, since=pd.Timestamp("2025-01-01"), **kwargs)
+
+
+def test_stray_old_record_does_not_change_alerts():
+    times = poisson_events()
+    clean = alerts(times)
+    stray = pd.concat([times, pd.Series(pd.to_datetime(["2008-03-04 12:00"]))], ignore_index=True)
+    assert alerts(stray, years=(2020, 2025)) == clean
+    # Without a window the lead-in is 15 empty years; it must not collapse the
+    # scale (it used to turn a handful of alerts into ~100)
+    assert len(clean) <= 5
+    assert len(alerts(stray)) <= len(clean) + 2
+
+
+def test_planted_spikes_are_found():
+    times = poisson_events(seed=1)
+    spikes = pd.to_datetime(["2025-03-14 10:00", "2025-07-02 18:00", "2025-11-20 09:00"])
+    planted = pd.Series(np.repeat(spikes.to_numpy(), 20))
+    found = alerts(pd.concat([times, planted], ignore_index=True))
+    dates = {a["date"] for a in found if a["series"] == "neighborhood"}
+    assert {"2025-03-14", "2025-07-02", "2025-11-20"} <= dates
+    assert [a["date"] for a in found] == sorted((a["date"] for a in found), reverse=True)
+
+
+def test_baseline_is_same_weekday_mean():
+    rng = np.random.default_rng(2)
+    counts = rng.poisson(4, size=(3, 120)).astype("float64")
+    expected = baseline(counts, weeks=8, min_weeks=4)
+    for day in (28, 40, 63, 119):
+        prior = [day - 7 * w for w in range(1, 9) if day - 7 * w >= 0]
+        assert np.allclose(expected[:, day], counts[:, prior].mean(axis=1))
+    assert np.isnan(expected[:, 27]).all()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
@@ -0,0 +1,51 @@
+"""
+test_cube.py — cube.py counts match the input and the month axis stays in the year window.
+
+    uv run pytest scripts/test_cube.py     # or: python test_cube.py
+"""
+
+import numpy as np
+import pandas as pd
+
+from cube import build_cube, decode
+
+
+def rows(n: int = 20_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2020-01-01").value
+    end = pd.Timestamp("2025-12-31").value
+    return pd.DataFrame({
+        "t": pd.to_datetime(rng.integers(start, end, n)),
+        "hood": rng.choice([f"{i:02d}" for i in range(1, 30)], n),
+        "cat": rng.choice([f"cat{i}" for i in range(12)], n),
+    })
+
+
+def test_counts_match_groupby():
+    df = rows()
+    cube = build_cube(df["t"], df["hood"], df["cat"], years=(2020, 2025))
+    counts = decode(cube["dtype"], cube["counts"], cube["shape"])
+    month = df["t"].dt.strftime("%Y-%m")
+    expected = df.groupby([df["hood"], month, df["cat"]]).size()
+    for (hood, m, cat), n in expected.sample(200, random_state=0).items():
+        assert counts[cube["neighborhoods"].index(hood), cube["months"].index(m), cube["categories"].index(cat)] == n
+    assert cube["total"] == len(df) and cube["outOfRange"] == 0
+    margins = decode(cube["hourWeekday"]["dtype"], cube["hourWeekday"]["counts"], cube["hourWeekday"]["shape"])
+    assert np.array_equal(margins.sum(axis=(1, 2)), counts.sum(axis=(0, 2)))
+
+
+def test_stray_rows_do_not_stretch_month_axis():
+    df = rows(5_000, seed=1)
+    stray = pd.DataFrame({"t": pd.to_datetime(["1970-01-01", "2091-06-01"]), "hood": "01", "cat": "cat0"})
+    both = pd.concat([df, stray], ignore_index=True)
+    cube = build_cube(both["t"], both["hood"], both["cat"], years=(2020, 2025))
+    assert cube["months"][0] >= "2020-01" and cube["months"][-1] <= "2025-12"
+    assert len(cube["months"]) <= 72
+    assert cube["outOfRange"] == 2 and cube["total"] == len(df)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
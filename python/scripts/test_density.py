@@ -0,0 +1,88 @@
+"""
+test_density.py — density.py output stays bounded and matches the input.
+
+    uv run pytest scripts/test_density.py     # or: python test_density.py
+
+Synthetic events over many years must produce at most 14 periods per
+group (the target year's months, the year, all years), a bounded number of
+PNG bytes, and counts that only include events inside the year window.
+"""
+
+import tempfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from density import BOUNDS, Grid, build, encode_png
+
+MAX_BYTES = 8 * 1024 * 1024  # whole density/<dataset>/ directory
+
+
+def events(n: int = 300_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    west, south, east, north = BOUNDS
+    start = pd.Timestamp("2008-01-01").value
+    end = pd.Timestamp("2025-12-31").value
+    # Clustered points so the surfaces aren't uniform noise
+    centers = rng.uniform([south, west], [north, east], size=(40, 2))
+    pick = rng.integers(0, len(centers), n)
+    lat = centers[pick, 0] + rng.normal(0, 0.004, n)
+    lng = centers[pick, 1] + rng.normal(0, 0.005, n)
+    return pd.DataFrame({
+        "t": pd.to_datetime(rng.integers(start, end, n)),
+        "lat": lat,
+        "lng": lng,
+        "group": rng.choice([f"cat{i}" for i in range(10)], n),
+    })
+
+
+def run(df: pd.DataFrame, out_dir: Path, **kwargs) -> dict:
+    return build(df["t"], df["lat"], df["lng"], df["group"], out_dir, 2025, **kwargs)
+
+
+def test_output_is_bounded():
+    df = events()
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp) / "csb"
+        manifest = run(df, out_dir, years=(2020, 2025))
+        pngs = list(out_dir.rglob("*.png"))
+
+        assert manifest["periods"] == [f"2025-{m:02d}" for m in range(1, 13)] + ["2025", "all"]
+        assert manifest["groups"][0] == "All" and len(manifest["groups"]) == 11
+        written = sum(1 for row in manifest["events"] for n in row if n)
+        assert len(pngs) == 2 * written <= 2 * 14 * 11
+        assert sum(p.stat().st_size for p in pngs) < MAX_BYTES
+
+
+def test_counts_respect_year_window():
+    df = events(50_000, seed=1)
+    stray = pd.DataFrame({"t": pd.to_datetime(["1970-01-01", "2091-06-01"]), "lat": 38.63, "lng": -90.2, "group": "cat0"})
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = run(pd.concat([df, stray], ignore_index=True), Path(tmp), years=(2020, 2025))
+    inside = Grid().cells(df["lat"], df["lng"]) >= 0
+    year = df["t"].dt.year
+    periods = manifest["periods"]
+    by_group = manifest["events"]
+    assert by_group[0][periods.index("all")] == int((inside & year.between(2020, 2025)).sum())
+    assert by_group[0][periods.index("2025")] == int((inside & (year == 2025)).sum())
+    assert sum(by_group[0][:12]) == by_group[0][periods.index("2025")]
+    # Each group's counts add up to the "All" group's
+    assert np.array_equal(np.sum(by_group[1:], axis=0), by_group[0])
+
+
+def test_png_round_trip():
+    gray = np.random.default_rng(2).integers(0, 256, size=(7, 5), dtype="uint8")
+    png = encode_png(gray)
+    idat = png[png.index(b"IDAT") + 4:png.index(b"IEND") - 8]
+    raw = np.frombuffer(zlib.decompress(idat), dtype="uint8").reshape(7, 6)
+    assert (raw[:, 0] == 1).all()  # Sub filter on every row
+    assert np.array_equal(np.cumsum(raw[:, 1:], axis=1, dtype="uint8"), gray)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
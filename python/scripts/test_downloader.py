@@ -0,0 +1,159 @@
+"""
+test_downloader.py — downloader.py against a local http.server.
+
+    uv run pytest scripts/test_downloader.py     # or: python test_downloader.py
+
+The server hands out files from memory with a strong ETag, answers
+If-None-Match with 304 and honors Range/If-Range with 206, so conditional
+requests, resumed transfers and per-job failures run without the network.
+"""
+
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from downloader import Downloader, DownloadJob, Manifest
+
+
+class Handler(BaseHTTPRequestHandler):
+    files: dict[str, bytes] = {}
+    seen: list[dict] = []
+
+    def do_GET(self):
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        self.seen.append({"path": self.path, **{k.lower(): v for k, v in self.headers.items()}})
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        status, start = 200, 0
+        byte_range = self.headers.get("Range", "")
+        if byte_range.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            start = int(byte_range[6:].split("-")[0])
+            if start >= len(body):
+                self.send_error(416)
+                return
+            status = 206
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def server(files: dict[str, bytes]):
+    Handler.files, Handler.seen = files, []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def downloader(root: Path) -> Downloader:
+    return Downloader(max_workers=4, retries=1, backoff=0, chunk_size=1024, manifest=Manifest(root / "manifest.json"))
+
+
+def test_conditional_get():
+    body = bytes(range(256)) * 64
+    with tempfile.TemporaryDirectory() as tmp, server({"/a.bin": body}) as base:
+        root = Path(tmp)
+        job = DownloadJob(f"{base}/a.bin", root / "a.bin")
+        with downloader(root) as dl:
+            first = dl.fetch(job)
+            assert first.ok and first.status == "downloaded" and first.changed
+            assert first.sha256 == hashlib.sha256(body).hexdigest()
+            assert (root / "a.bin").read_bytes() == body
+
+        # A fresh Downloader reads the validators back from the manifest
+        with downloader(root) as dl:
+            again = dl.fetch(job)
+        assert again.ok and again.status == "not_modified" and not again.changed
+        assert again.sha256 == first.sha256
+        assert Handler.seen[-1]["if-none-match"]
+
+        Handler.files["/a.bin"] = body[::-1]
+        with downloader(root) as dl:
+            changed = dl.fetch(job)
+        assert changed.status == "downloaded" and changed.changed
+        assert (root / "a.bin").read_bytes() == body[::-1]
+
+
+def test_range_resume():
+    body = bytes(range(256)) * 64
+    with tempfile.TemporaryDirectory() as tmp, server({"/b.bin": body}) as base:
+        root = Path(tmp)
+        dest = root / "b.bin"
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        (root / "b.bin.part").write_bytes(body[:5000])
+        manifest = Manifest(root / "manifest.json")
+        manifest.update(dest, part_etag=etag)
+        manifest.save()
+
+        with downloader(root) as dl:
+            res = dl.fetch(DownloadJob(f"{base}/b.bin", dest))
+        assert res.ok and res.status == "resumed"
+        assert res.bytes == len(body) - 5000
+        assert Handler.seen[-1]["range"] == "bytes=5000-"
+        assert dest.read_bytes() == body
+        assert res.sha256 == hashlib.sha256(body).hexdigest()
+        assert not (root / "b.bin.part").exists()
+
+
+def test_resume_restarts_when_source_changed():
+    body = b"new contents " * 500
+    with tempfile.TemporaryDirectory() as tmp, server({"/c.bin": body}) as base:
+        root = Path(tmp)
+        dest = root / "c.bin"
+        (root / "c.bin.part").write_bytes(b"old partial")
+        manifest = Manifest(root / "manifest.json")
+        manifest.update(dest, part_etag='"stale"')
+        manifest.save()
+
+        with downloader(root) as dl:
+            res = dl.fetch(DownloadJob(f"{base}/c.bin", dest))
+        assert res.ok and res.status == "downloaded"
+        assert dest.read_bytes() == body
+
+
+def test_local_error_fails_only_its_job():
+    with tempfile.TemporaryDirectory() as tmp, server({"/a.bin": b"a" * 100, "/b.bin": b"b" * 100}) as base:
+        root = Path(tmp)
+        (root / "blocked").write_text("a file where a directory should be")
+        jobs = [
+            DownloadJob(f"{base}/a.bin", root / "blocked" / "a.bin"),
+            DownloadJob(f"{base}/b.bin", root / "b.bin"),
+            DownloadJob(f"{base}/missing.bin", root / "missing.bin"),
+        ]
+        with downloader(root) as dl:
+            results = dl.fetch_many(jobs, quiet=True)
+        assert [r.ok for r in results] == [False, True, False]
+        assert results[0].attempts == 1 and results[0].error
+        assert (root / "b.bin").read_bytes() == b"b" * 100
+        assert "404" in results[2].error
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
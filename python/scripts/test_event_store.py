@@ -0,0 +1,96 @@
+"""
+test_event_store.py — EventStore.query matches a brute-force scan of the same rows.
+
+    uv run pytest scripts/test_event_store.py     # or: python test_event_store.py
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from event_store import EventStore, build
+
+
+def frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2022-01-01").value
+    end = pd.Timestamp("2025-12-31").value
+    lat = rng.normal(38.63, 0.05, n)
+    lng = rng.normal(-90.24, 0.06, n)
+    lat[::97] = np.nan  # no coordinates
+    return pd.DataFrame({
+        "t": pd.to_datetime(rng.integers(start, end, n)),
+        "lat": lat,
+        "lng": lng,
+        "category": rng.choice([f"cat{i}" for i in range(15)], n),
+        "neighborhood": rng.choice([f"{i:02d}" for i in range(1, 80)], n),
+    })
+
+
+def brute_force(store: EventStore, bbox=None, t0=None, t1=None, categories=None, sources=None) -> np.ndarray:
+    ev = store.to_frame()
+    keep = np.ones(len(ev), dtype=bool)
+    if bbox is not None:
+        # Compare in the stored float32 precision, as the store does
+        lng, lat = store.events["lng"], store.events["lat"]
+        keep &= (lng >= bbox[0]) & (lat >= bbox[1]) & (lng <= bbox[2]) & (lat <= bbox[3])
+    if t0 is not None:
+        keep &= (ev["t"] >= pd.Timestamp(t0)).to_numpy()
+    if t1 is not None:
+        keep &= (ev["t"] < pd.Timestamp(t1)).to_numpy()
+    if categories is not None:
+        keep &= ev["category"].isin(categories).to_numpy()
+    if sources is not None:
+        keep &= ev["source"].isin(sources).to_numpy()
+    return np.flatnonzero(keep)
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        build({"crime": frame(30_000, 1), "csb": frame(50_000, 2)}, Path(tmp))
+        store = EventStore.open(Path(tmp))
+        assert len(store) == 80_000
+        matched = 0
+        for _ in range(40):
+            lng0, lat0 = rng.uniform(-90.35, -90.15), rng.uniform(38.55, 38.70)
+            bbox = (lng0, lat0, lng0 + rng.uniform(0.001, 0.1), lat0 + rng.uniform(0.001, 0.08))
+            t0 = pd.Timestamp("2022-01-01") + pd.Timedelta(days=int(rng.integers(0, 1300)), seconds=int(rng.integers(0, 86400)))
+            t1 = t0 + pd.Timedelta(days=int(rng.integers(1, 400)))
+            filters = {
+                "bbox": bbox if rng.random() < 0.8 else None,
+                "t0": t0 if rng.random() < 0.8 else None,
+                "t1": t1 if rng.random() < 0.8 else None,
+                "categories": list(rng.choice(store.categories, 3)) if rng.random() < 0.5 else None,
+                "sources": ["csb"] if rng.random() < 0.3 else None,
+            }
+            rows = store.query(**filters)
+            assert np.array_equal(rows, brute_force(store, **filters)), filters
+            matched += len(rows)
+        assert matched > 0
+        # Rows without coordinates never match a bbox but do match the other filters
+        assert store.count() == 80_000
+        located = int((store.events["z"] != 0xFFFFFFFF).sum())
+        assert 0 < located < 80_000
+        assert store.count(bbox=(-91.0, 38.0, -89.0, 39.0)) == located
+
+
+def test_too_many_labels_is_rejected():
+    df = frame(10, 3).iloc[[0] * 256].assign(category=[f"c{i}" for i in range(256)])
+    with tempfile.TemporaryDirectory() as tmp:
+        build({"crime": df}, Path(tmp))  # 256 categories fit in uint16
+        try:
+            build({f"s{i}": df.iloc[:1] for i in range(257)}, Path(tmp))
+        except ValueError as e:
+            assert "source" in str(e)
+        else:
+            raise AssertionError("257 sources should not fit in a uint8 column")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
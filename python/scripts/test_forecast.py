@@ -0,0 +1,103 @@
+"""
+test_forecast.py — forecast.py agrees with statsmodels' Holt-Winters / ETS.
+
+    uv run pytest scripts/test_forecast.py     # or: python test_forecast.py
+
+With the parameters and initial states forecast.fit() picks, statsmodels'
+damped additive ExponentialSmoothing must give the same point forecasts,
+and ETSModel(A,Ad,A) the same means and interval widths relative to sigma.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from cube import build_cube
+from forecast import LEVEL, PHI, SEASON, cube_forecast, fit
+
+HORIZON = 14
+
+
+def series(n: int = 60, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return 200 + 1.5 * t + 30 * np.sin(2 * np.pi * t / SEASON) + rng.normal(0, 8, n)
+
+
+def initial_states(y: np.ndarray) -> dict:
+    """The start state forecast._run uses: first-season mean, season-over-season slope, first-season offsets."""
+    first = y[:SEASON].mean()
+    return {
+        "initial_level": first,
+        "initial_trend": (y[SEASON:2 * SEASON].mean() - first) / SEASON,
+        "initial_seasonal": y[:SEASON] - first,
+    }
+
+
+def test_point_forecast_matches_statsmodels():
+    for seed in range(3):
+        y = series(seed=seed)
+        model = fit(y)
+        alpha, beta, gamma = model.alpha[0], model.beta[0], model.gamma[0]
+        hw = ExponentialSmoothing(
+            y, trend="add", damped_trend=True, seasonal="add", seasonal_periods=SEASON,
+            initialization_method="known", **initial_states(y),
+        ).fit(
+            # statsmodels' trend smoothing acts on the level change: β* = β / α
+            smoothing_level=alpha, smoothing_trend=beta / alpha, smoothing_seasonal=gamma,
+            damping_trend=PHI, optimized=False,
+        )
+        # Only within one season: at h = SEASON, statsmodels' Holt-Winters reuses
+        # the seasonal state from before the last observation (ETSModel below
+        # agrees with forecast.py at every horizon)
+        mean, _, _ = model.forecast(SEASON - 1)
+        assert np.allclose(mean[0], hw.forecast(SEASON - 1), atol=1e-8)
+
+
+def test_intervals_match_ets_variance():
+    y = series(seed=4)
+    model = fit(y)
+    ets = ETSModel(
+        pd.Series(y, index=pd.period_range("2020-01", periods=len(y), freq="M")),
+        error="add", trend="add", damped_trend=True, seasonal="add", seasonal_periods=SEASON,
+        initialization_method="known", **initial_states(y),
+    ).smooth([model.alpha[0], model.beta[0], model.gamma[0], PHI])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        frame = ets.get_prediction(start=len(y), end=len(y) + HORIZON - 1).summary_frame(alpha=1 - LEVEL)
+    mean, lo, hi = model.forecast(HORIZON)
+    assert np.allclose(mean[0], frame["mean"], atol=1e-8)
+    # Same variance multipliers; the scale differs only by which residuals enter sigma
+    ours = (hi[0] - lo[0]) / 2 / model.sigma[0]
+    theirs = (frame["pi_upper"] - frame["pi_lower"]).to_numpy() / 2 / np.sqrt(ets.mse)
+    assert np.allclose(ours, theirs)
+
+
+def test_batch_equals_one_at_a_time():
+    ys = np.vstack([series(seed=s) for s in range(5)])
+    batch = fit(ys).forecast(6)
+    for i, y in enumerate(ys):
+        single = fit(y).forecast(6)
+        for a, b in zip(batch, single):
+            assert np.allclose(a[i], b[0])
+
+
+def test_cube_forecast_months_follow_cube():
+    rng = np.random.default_rng(5)
+    t = pd.Series(pd.to_datetime(rng.integers(pd.Timestamp("2021-01-01").value, pd.Timestamp("2024-07-01").value, 5000)))
+    cube = build_cube(t, pd.Series(rng.choice(["01", "02"], 5000)), pd.Series(rng.choice(["a", "b"], 5000)))
+    out = cube_forecast(cube, 3)
+    assert cube["months"][-1] == "2024-06"
+    assert out["months"] == ["2024-07", "2024-08", "2024-09"]
+    assert set(out["neighborhoods"]) == {"01", "02"} and set(out["categories"]) == {"a", "b"}
+    assert cube_forecast(cube, 3, drop_last=True)["months"][0] == "2024-06"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
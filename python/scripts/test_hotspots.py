@@ -0,0 +1,103 @@
+"""
+test_hotspots.py — Gi* on a square lattice matches the Getis-Ord formula cell by cell.
+
+    uv run pytest scripts/test_hotspots.py     # or: python test_hotspots.py
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.stats import norm
+
+from cube import build_cube, decode
+from hotspots import SpatialWeights, cube_hotspots, gi_star
+
+SIDE = 6
+
+
+def lattice() -> tuple[np.ndarray, list[str]]:
+    """SIDE × SIDE unit squares, ids "00".."35" in row-major order."""
+    boxes = [shapely.box(x, y, x + 1, y + 1) for y in range(SIDE) for x in range(SIDE)]
+    return np.array(boxes), [f"{i:02d}" for i in range(SIDE * SIDE)]
+
+
+def gi_star_formula(x: np.ndarray, neighbors: list[set[int]]) -> np.ndarray:
+    """Getis & Ord (1992) Gi* with binary weights and w_ii = 1, one location at a time."""
+    n = len(x)
+    mean = x.mean()
+    s = np.sqrt((x ** 2).mean() - mean ** 2)
+    z = np.empty(n)
+    for i in range(n):
+        w = np.zeros(n)
+        w[list(neighbors[i] | {i})] = 1
+        z[i] = (w @ x - mean * w.sum()) / (s * np.sqrt((n * (w ** 2).sum() - w.sum() ** 2) / (n - 1)))
+    return z
+
+
+def test_queen_lattice_neighbors():
+    shapes, ids = lattice()
+    weights = SpatialWeights.queen(shapes, ids)
+    card = weights.cardinalities.reshape(SIDE, SIDE)
+    assert card[0, 0] == card[0, -1] == card[-1, 0] == card[-1, -1] == 3
+    assert (card[0, 1:-1] == 5).all() and (card[1:-1, 0] == 5).all()
+    assert (card[1:-1, 1:-1] == 8).all()
+    # Same graph as points within √2 of each other at the cell centers
+    centers = shapely.get_coordinates(shapely.centroid(shapes))
+    band = SpatialWeights.distance_band(centers, ids, 1.5)
+    assert (weights.matrix != band.matrix).nnz == 0
+
+
+def test_gi_star_matches_formula():
+    shapes, ids = lattice()
+    weights = SpatialWeights.queen(shapes, ids)
+    neighbors = [set(weights.matrix[i].indices.tolist()) for i in range(len(ids))]
+    rng = np.random.default_rng(0)
+    X = rng.poisson(5, size=(len(ids), 4)).astype("float64")
+    X[[0, 1, SIDE, SIDE + 1], 0] += 40  # hot 2×2 block in the corner
+    z, p = gi_star(weights, X)
+    for k in range(X.shape[1]):
+        assert np.allclose(z[:, k], gi_star_formula(X[:, k], neighbors))
+    assert z[0, 0] > 3 and p[0, 0] < 0.01
+    assert np.allclose(p, 2 * norm.sf(np.abs(z)))
+    # A constant column has no variance: z = 0, p = 1
+    z, p = gi_star(weights, np.ones(len(ids)))
+    assert (z == 0).all() and (p == 1).all()
+
+
+def test_cube_hotspots_layout():
+    shapes, ids = lattice()
+    weights = SpatialWeights.queen(shapes, ids)
+    rng = np.random.default_rng(1)
+    n = 20_000
+    hoods = rng.choice(ids[:-1], n)  # the last cell has a polygon but no events
+    hot = rng.random(n) < 0.2
+    hoods[hot] = "00"
+    t = pd.Series(pd.to_datetime(rng.integers(pd.Timestamp("2024-01-01").value, pd.Timestamp("2025-12-31").value, n)))
+    cube = build_cube(t, pd.Series(hoods), pd.Series(rng.choice(["a", "b"], n)))
+    with tempfile.TemporaryDirectory() as tmp:
+        weights = SpatialWeights.queen(shapes, ids, cache_dir=Path(tmp))
+        cached = SpatialWeights.queen(shapes, ids, cache_dir=Path(tmp))
+        assert (weights.matrix != cached.matrix).nnz == 0
+    out = cube_hotspots(cube, weights, 2025)
+    assert set(out) == set(ids)
+    assert out["00"]["giStar"]["z"] > 1.96 and out["00"]["giStar"]["p"] < 0.05
+    assert set(out["00"]["giStarMonthly"]) == {f"2025-{m:02d}" for m in range(1, 13)}
+
+    # cube["giStar"] holds the cell z-scores in the counts layout
+    counts = decode(cube["dtype"], cube["counts"], cube["shape"]).astype("float64")
+    z_cells = decode("int16", cube["giStar"]["z"], cube["shape"]) * cube["giStar"]["scale"]
+    m, c = cube["months"].index("2025-03"), cube["categories"].index("a")
+    x = np.zeros(len(ids))
+    x[[ids.index(h) for h in cube["neighborhoods"]]] = counts[:, m, c]
+    expected = gi_star(weights, x)[0][[ids.index(h) for h in cube["neighborhoods"]], 0]
+    assert np.allclose(z_cells[:, m, c], expected, atol=0.005 + 1e-9)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
@@ -0,0 +1,160 @@
+"""
+weather_store.py — Local daily weather store for St. Louis (Open-Meteo archive).
+
+Daily high/low (°F) and precipitation (in) are kept on disk, one JSON file
+per year under data/weather/:
+
+    data/weather/2024.json  {"fetched": "2025-01-06", "days": {"2024-01-01": {"high": 41.2, ...}}}
+
+`WeatherStore.range(start, end)` serves any date span from disk and only
+goes to the network for days that are missing, or recent enough that the
+archive may still revise them. One request is made per year partition,
+covering the span of days it needs.
+
+Offline runs pass `get=None` and get whatever is on disk. A fixture file in
+the same {date: {high, low, precip}} shape can be loaded with `seed()`, into
+a scratch root: a store with `get` set refetches every fixture day.
+
+    store = WeatherStore(WEATHER_DIR, get=requests.get)
+    store.range("2023-01-01", "2025-12-31")
+"""
+
+import json
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+LATITUDE, LONGITUDE = 38.627, -90.199
+ARCHIVE_LAG_DAYS = 5  # the archive API has no data for the last few days
+RECENT_DAYS = 7  # days this close to the fetch date are refetched next run
+
+
+class WeatherStore:
+    def __init__(self, root: Path, get: Callable[..., object] | None = None, today: date | None = None, log=print):
+        self.root = root
+        self.get = get
+        self.today = today or date.today()
+        self.log = log
+
+    # ── Partitions ──
+
+    def _path(self, year: int) -> Path:
+        return self.root / f"{year}.json"
+
+    def load(self, year: int) -> dict:
+        path = self._path(year)
+        if path.exists():
+            try:
+                return json.loads(path.read_text())
+            except ValueError:
+                pass
+        return {"fetched": "", "days": {}}
+
+    def save(self, year: int, partition: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        partition["days"] = dict(sorted(partition["days"].items()))
+        tmp = self._path(year).with_suffix(".tmp")
+        tmp.write_text(json.dumps(partition, separators=(",", ":")))
+        tmp.replace(self._path(year))
+
+    def seed(self, fixture: Path) -> int:
+        """Merge a {date: {high, low, precip}} fixture into the partitions. Returns days added."""
+        days = json.loads(Path(fixture).read_text())
+        by_year: dict[int, dict] = {}
+        for d, rec in days.items():
+            by_year.setdefault(int(d[:4]), {})[d] = rec
+        for year, recs in by_year.items():
+            partition = self.load(year)
+            partition["days"].update(recs)
+            partition["fetched"] = partition["fetched"] or "fixture"
+            self.save(year, partition)
+        return len(days)
+
+    # ── Fetch ──
+
+    def _stale(self, partition: dict, day: date) -> bool:
+        rec = partition["days"].get(day.isoformat())
+        if rec is None or rec.get("high") is None:
+            return True
+        fetched = partition.get("fetched", "")
+        if fetched == "fixture":
+            # Seeded test data never stands in for the real archive
+            return self.get is not None
+        if not fetched:
+            return False
+        # Recent days may still be revised by the archive; recheck them on a later day
+        fetched_on = date.fromisoformat(fetched)
+        return fetched_on < self.today and day >= fetched_on - timedelta(days=RECENT_DAYS)
+
+    def _fetch(self, start: date, end: date) -> dict:
+        resp = self.get(
+            ARCHIVE_URL,
+            params={
+                "latitude": LATITUDE,
+                "longitude": LONGITUDE,
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+                "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
+                "temperature_unit": "fahrenheit",
+                "precipitation_unit": "inch",
+                "timezone": "America/Chicago",
+            },
+            timeout=30,
+        )
+        resp.raise_for_status()
+        daily = resp.json().get("daily", {})
+        highs = daily.get("temperature_2m_max", [])
+        lows = daily.get("temperature_2m_min", [])
+        precip = daily.get("precipitation_sum", [])
+        return {
+            d: {
+                "high": round(highs[i], 1) if highs[i] is not None else None,
+                "low": round(lows[i], 1) if lows[i] is not None else None,
+                "precip": round(precip[i], 2) if precip[i] is not None else 0,
+            }
+            for i, d in enumerate(daily.get("time", []))
+        }
+
+    def update(self, start: date, end: date) -> int:
+        """Fetch missing/recent days in [start, end]. Returns the number of days fetched."""
+        end = min(end, self.today - timedelta(days=ARCHIVE_LAG_DAYS))
+        fetched = 0
+        for year in range(start.year, end.year + 1):
+            lo, hi = max(start, date(year, 1, 1)), min(end, date(year, 12, 31))
+            if lo > hi:
+                continue
+            partition = self.load(year)
+            todo = [lo + timedelta(days=i) for i in range((hi - lo).days + 1)]
+            todo = [d for d in todo if self._stale(partition, d)]
+            if not todo:
+                continue
+            if self.get is None:
+                self.log(f"Weather {year}: {len(todo)} days missing (offline)")
+                continue
+            try:
+                days = self._fetch(todo[0], todo[-1])
+            except Exception as e:
+                self.log(f"WARNING: Could not fetch weather {todo[0]}..{todo[-1]}: {e}")
+                continue
+            partition["days"].update(days)
+            partition["fetched"] = self.today.isoformat()
+            self.save(year, partition)
+            fetched += len(days)
+            self.log(f"Weather {year}: fetched {len(days)} days ({todo[0]}..{todo[-1]})")
+        return fetched
+
+    # ── Read ──
+
+    def range(self, start: str | date, end: str | date, refresh: bool = True) -> dict:
+        """{date: {high, low, precip}} for every stored day in [start, end]."""
+        start = date.fromisoformat(start) if isinstance(start, str) else start
+        end = date.fromisoformat(end) if isinstance(end, str) else end
+        if refresh:
+            self.update(start, end)
+        out = {}
+        for year in range(start.year, end.year + 1):
+            for d, rec in self.load(year)["days"].items():
+                if start.isoformat() <= d <= end.isoformat() and rec.get("high") is not None:
+                    out[d] = rec
+        return dict(sorted(out.items()))
@@ -0,0 +1,249 @@
+"""
+xlsx_extract.py — Pull a few columns of matching rows out of a large xlsx.
+
+The USDA Food Access Research Atlas is one ~72k-row, ~150-column sheet, of
+which clean_data.py needs six columns for the ~100 St. Louis City tracts.
+Instead of materializing every cell through openpyxl, this streams the
+sheet XML straight out of the workbook zip:
+
+  - the decompressed XML is split on </row>, and each row's key cell is
+    checked against the prefix with one regex search; non-matching rows are
+    skipped without looking at their other cells
+  - only the requested columns of matching rows are decoded (shared
+    strings, inline strings, numbers)
+
+The result is cached as Parquet under data/cache/, named by the workbook's
+SHA-256 and a hash of the resolved spec: the header text and column index
+each predicate picked, plus the value kinds, key and prefix. Reading the
+header row costs one small read of the sheet, and later runs then read a
+few KB instead of decoding the sheet body.
+
+    df = extract_columns(
+        xlsx_path, "Food Access Research Atlas",
+        columns={"tract": (lambda h: "CensusTract" in h, "str"), "pop": (lambda h: h == "POP2010", "num")},
+        key="tract", prefix="29510", cache_dir=CACHE_DIR,
+    )
+"""
+
+import hashlib
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Callable
+from xml.etree import ElementTree
+
+import pandas as pd
+
+NS = {
+    "m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+BLOCK_SIZE = 4 * 1024 * 1024
+
+_CELL_RE = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_ATTR_RE = re.compile(rb'\b(r|t)="([^"]*)"')
+_VALUE_RE = re.compile(rb"<v>([^<]*)</v>")
+_INLINE_RE = re.compile(rb"<t[^>]*>([^<]*)</t>")
+_INT_RE = re.compile(r"^-?\d+$")
+
+# column spec: name -> (header predicate, "str" | "num")
+ColumnSpec = dict[str, tuple[Callable[[str], bool], str]]
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def column_index(ref: str) -> int:
+    """0-based column index of a cell reference like "AB12"."""
+    idx = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        idx = idx * 26 + (ord(ch.upper()) - 64)
+    return idx - 1
+
+
+def column_letters(idx: int) -> str:
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _unescape(raw: bytes) -> str:
+    text = raw.decode("utf-8")
+    if "&" in text:
+        text = (
+            text.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", '"')
+            .replace("&apos;", "'").replace("&amp;", "&")
+        )
+    return text
+
+
+def _sheet_path(zf: zipfile.ZipFile, sheet: str) -> str:
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall("rel:Relationship", NS)}
+    for node in workbook.findall("m:sheets/m:sheet", NS):
+        if node.get("name") == sheet:
+            target = targets[node.get(f"{{{NS['r']}}}id")]
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise KeyError(f"Sheet {sheet!r} not found")
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    si_tag, t_tag = f"{{{NS['m']}}}si", f"{{{NS['m']}}}t"
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in ElementTree.iterparse(f):
+            if elem.tag == si_tag:
+                strings.append("".join(t.text or "" for t in elem.iter(t_tag)))
+                elem.clear()
+    return strings
+
+
+def _iter_rows(zf: zipfile.ZipFile, path: str):
+    """Yield the raw bytes of each <row>...</row> element."""
+    buf = b""
+    with zf.open(path) as f:
+        while block := f.read(BLOCK_SIZE):
+            buf += block
+            start = 0
+            while (end := buf.find(b"</row>", start)) != -1:
+                begin = buf.rfind(b"<row", start, end)
+                yield buf[begin:end]
+                start = end + 6
+            buf = buf[start:]
+
+
+def _cell_value(attrs: bytes, body: bytes | None, strings: list[str]):
+    if not body:
+        return None
+    kind = dict(_ATTR_RE.findall(attrs)).get(b"t", b"n")
+    if kind == b"inlineStr":
+        return "".join(_unescape(t) for t in _INLINE_RE.findall(body))
+    m = _VALUE_RE.search(body)
+    if m is None:
+        return None
+    raw = _unescape(m.group(1))
+    if kind == b"s":
+        return strings[int(raw)]
+    if kind in (b"str", b"e"):
+        return raw
+    if kind == b"b":
+        return raw == "1"
+    return int(raw) if _INT_RE.match(raw) else float(raw)
+
+
+def _cells(row: bytes, strings: list[str], wanted: set[int] | None = None) -> dict[int, object]:
+    out = {}
+    for m in _CELL_RE.finditer(row):
+        attrs = m.group(1)
+        ref = dict(_ATTR_RE.findall(attrs)).get(b"r", b"").decode()
+        idx = column_index(ref) if ref else len(out)
+        if wanted is None or idx in wanted:
+            out[idx] = _cell_value(attrs, m.group(2), strings)
+    return out
+
+
+def _convert(value, kind: str):
+    if value is None or value == "":
+        return None
+    if kind == "str":
+        return str(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _positions(header: dict[int, object], columns: ColumnSpec, key: str) -> dict[str, int | None]:
+    """Column index of the first header each predicate matches (None if none does)."""
+    positions: dict[str, int | None] = {}
+    for name, (matches, _) in columns.items():
+        positions[name] = next(
+            (i for i, h in sorted(header.items()) if h is not None and matches(str(h).strip())), None
+        )
+    if positions[key] is None:
+        raise KeyError(f"No header matched key column {key!r}")
+    return positions
+
+
+def read_header(xlsx_path: Path, sheet: str) -> dict[int, object]:
+    """The first row of `sheet` as {column index: value}."""
+    with zipfile.ZipFile(xlsx_path) as zf:
+        return _cells(next(_iter_rows(zf, _sheet_path(zf, sheet))), _shared_strings(zf))
+
+
+def scan(xlsx_path: Path, sheet: str, columns: ColumnSpec, key: str, prefix: str) -> pd.DataFrame:
+    """Stream `sheet` and return the spec'd columns of rows whose `key` starts with `prefix`."""
+    with zipfile.ZipFile(xlsx_path) as zf:
+        strings = _shared_strings(zf)
+        rows = _iter_rows(zf, _sheet_path(zf, sheet))
+        positions = _positions(_cells(next(rows), strings), columns, key)
+
+        key_cell = re.compile(
+            rb'<c\b([^>]*\br="' + column_letters(positions[key]).encode() + rb'\d+"[^>]*?)(?:/>|>(.*?)</c>)', re.S
+        )
+        wanted = {i for i in positions.values() if i is not None}
+
+        records = []
+        for row in rows:
+            m = key_cell.search(row)
+            if m is None:
+                continue
+            value = _cell_value(m.group(1), m.group(2), strings)
+            if value is None or not str(value).startswith(prefix):
+                continue
+            cells = _cells(row, strings, wanted)
+            records.append({
+                name: _convert(cells.get(pos) if pos is not None else None, columns[name][1])
+                for name, pos in positions.items()
+            })
+
+    df = pd.DataFrame(records, columns=list(columns))
+    for name, (_, kind) in columns.items():
+        df[name] = df[name].astype("float64") if kind == "num" else df[name].astype(object)
+    return df
+
+
+def extract_columns(
+    xlsx_path: Path,
+    sheet: str,
+    columns: ColumnSpec,
+    key: str,
+    prefix: str,
+    cache_dir: Path,
+    log=print,
+) -> pd.DataFrame:
+    """Cached `scan()`: reuses data/cache/<stem>-<sha>-<spec>.parquet while the workbook and resolved spec are unchanged."""
+    digest = file_sha256(xlsx_path)[:16]
+    header = read_header(xlsx_path, sheet)
+    positions = _positions(header, columns, key)
+    resolved = sorted(
+        (name, columns[name][1], pos, None if pos is None else str(header[pos]).strip())
+        for name, pos in positions.items()
+    )
+    spec = hashlib.sha256(repr((sheet, resolved, key, prefix)).encode())
+    cache_path = cache_dir / f"{xlsx_path.stem}-{digest}-{spec.hexdigest()[:8]}.parquet"
+    if cache_path.exists():
+        log(f"Using cached {xlsx_path.name} extract ({cache_path.name})")
+        return pd.read_parquet(cache_path)
+
+    df = scan(xlsx_path, sheet, columns, key, prefix)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.glob(f"{xlsx_path.stem}-*.parquet"):
+        stale.unlink()
+    df.to_parquet(cache_path, index=False)
+    return df
@@ -0,0 +1,40 @@
+"""
+stl_data — Cached, lazily loaded access to the pipeline outputs in public/data/.
+
+    import stl_data
+    points = stl_data.heatmap_points("crime")   # categorical DataFrame
+    nbhd = stl_data.neighborhoods()             # GeoDataFrame
+    vac = stl_data.vacancies()
+    cube = stl_data.count_cube("csb")           # neighborhood × month × category counts
+
+The first load of each file parses the JSON and writes an uncompressed
+Feather copy to data/cache/, keyed by the source's SHA-256. Later loads are
+memory-mapped reads until the pipeline rewrites the source.
+"""
+
+from .cache import CACHE_DIR, clear_cache
+from .loaders import (
+    DATA_DIR,
+    count_cube,
+    heatmap_points,
+    load_geojson,
+    load_json,
+    neighborhood_stats,
+    neighborhoods,
+    tracts,
+    vacancies,
+)
+
+__all__ = [
+    "CACHE_DIR",
+    "DATA_DIR",
+    "clear_cache",
+    "count_cube",
+    "heatmap_points",
+    "load_geojson",
+    "load_json",
+    "neighborhood_stats",
+    "neighborhoods",
+    "tracts",
+    "vacancies",
+]
@@ -0,0 +1,85 @@
+"""
+On-disk binary cache for the data-access layer.
+
+Frames are written as uncompressed Feather (Arrow IPC) files named
+`<key>-<sha256 prefix of the source file>.feather` under data/cache/, so a
+repeat load is a memory-mapped read and any change to the source JSON
+invalidates the entry automatically. GeoDataFrames store their geometry as
+WKB with the CRS in the schema metadata.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent  # python/
+CACHE_DIR = PYTHON_DIR / "data" / "cache"
+
+_GEO_META = b"stl_data.geo"
+
+# (path, size, mtime_ns) -> sha256, so a kernel hashes each source only once
+_hashes: dict[tuple[str, int, int], str] = {}
+
+
+def file_hash(path: Path) -> str:
+    st = path.stat()
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    if key not in _hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(1024 * 1024):
+                digest.update(block)
+        _hashes[key] = digest.hexdigest()
+    return _hashes[key]
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    geo = None
+    if hasattr(df, "geometry") and hasattr(df, "crs"):
+        geo = {"column": df.geometry.name, "crs": df.crs.to_string() if df.crs else None}
+        df = pd.DataFrame(df.assign(**{geo["column"]: df.geometry.to_wkb()}))
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    if geo:
+        meta = dict(table.schema.metadata or {})
+        meta[_GEO_META] = json.dumps(geo).encode()
+        table = table.replace_schema_metadata(meta)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    feather.write_feather(table, tmp, compression="uncompressed")
+    tmp.replace(path)
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    table = feather.read_table(path, memory_map=True)
+    df = table.to_pandas()
+    meta = (table.schema.metadata or {}).get(_GEO_META)
+    if meta:
+        import geopandas as gpd
+
+        geo = json.loads(meta)
+        geom = gpd.GeoSeries.from_wkb(df[geo["column"]], crs=geo["crs"], index=df.index)
+        df = gpd.GeoDataFrame(df.drop(columns=geo["column"]), geometry=geom.rename(geo["column"]))
+    return df
+
+
+def cached_frame(source: Path, key: str, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Return `build()`'s frame, cached on disk against the hash of `source`."""
+    path = CACHE_DIR / f"{key}-{file_hash(source)[:16]}.feather"
+    if path.exists():
+        return read_frame(path)
+    df = build()
+    for stale in CACHE_DIR.glob(f"{key}-*.feather"):
+        stale.unlink()
+    write_frame(df, path)
+    return df
+
+
+def clear_cache() -> None:
+    for path in CACHE_DIR.glob("*.feather"):
+        path.unlink()
+    _hashes.clear()
@@ -0,0 +1,123 @@
+"""
+Typed accessors for the pipeline outputs in public/data/.
+
+Nothing is read at import time. Each accessor parses its source JSON once,
+then serves later calls (including after a kernel restart) from the
+Feather cache in cache.py.
+"""
+
+import base64
+import json
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import pandas as pd
+
+from .cache import PYTHON_DIR, cached_frame
+
+DATA_DIR = PYTHON_DIR.parent / "public" / "data"
+
+HEATMAP_SOURCES = {"crime": "crime.json", "csb": "csb_latest.json"}
+CUBE_SOURCES = {"crime": "crime_cube.json", "csb": "csb_cube.json"}
+POINT_COLUMNS = ["lat", "lng", "category", "date", "neighborhood"]
+
+
+def data_path(name: str) -> Path:
+    path = DATA_DIR / name
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found — run scripts/clean_data.py first")
+    return path
+
+
+def load_json(name: str) -> Any:
+    with open(data_path(name)) as f:
+        return json.load(f)
+
+
+def heatmap_points(dataset: Literal["crime", "csb"] = "crime") -> pd.DataFrame:
+    """Heatmap points as lat/lng floats, categorical category/neighborhood and datetime date."""
+    source = data_path(HEATMAP_SOURCES[dataset])
+
+    def build() -> pd.DataFrame:
+        points = load_json(source.name)["heatmapPoints"]
+        df = pd.DataFrame(points, columns=POINT_COLUMNS)
+        df["lat"] = df["lat"].astype("float64")
+        df["lng"] = df["lng"].astype("float64")
+        df["category"] = df["category"].astype("category")
+        df["neighborhood"] = df["neighborhood"].astype("category")
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        return df
+
+    return cached_frame(source, f"heatmap_{dataset}", build)
+
+
+def neighborhood_stats(dataset: Literal["crime", "csb"] = "crime") -> pd.DataFrame:
+    """Per-neighborhood summary from crime.json / csb_latest.json, indexed by id.
+
+    Nested breakdowns (topOffenses, topCategories) are kept as JSON strings.
+    """
+    source = data_path(HEATMAP_SOURCES[dataset])
+
+    def build() -> pd.DataFrame:
+        df = pd.DataFrame.from_dict(load_json(source.name)["neighborhoods"], orient="index")
+        df.index.name = "neighborhood_id"
+        for col in df.columns:
+            if df[col].map(lambda v: isinstance(v, (dict, list))).any():
+                df[col] = df[col].map(json.dumps)
+        return df
+
+    return cached_frame(source, f"neighborhood_stats_{dataset}", build)
+
+
+def count_cube(dataset: Literal["crime", "csb"] = "crime") -> pd.DataFrame:
+    """Non-zero cells of crime_cube.json / csb_cube.json as neighborhood, month, category, count."""
+    source = data_path(CUBE_SOURCES[dataset])
+
+    def build() -> pd.DataFrame:
+        cube = load_json(source.name)
+        if not cube.get("total"):
+            return pd.DataFrame({"neighborhood": [], "month": [], "category": [], "count": []})
+        raw = base64.b64decode(cube["counts"])
+        counts = np.frombuffer(raw, dtype=np.dtype(cube["dtype"]).newbyteorder("<")).reshape(cube["shape"])
+        h, m, c = np.nonzero(counts)
+        return pd.DataFrame({
+            "neighborhood": pd.Categorical.from_codes(h, categories=cube["neighborhoods"]),
+            "month": pd.Categorical.from_codes(m, categories=cube["months"], ordered=True),
+            "category": pd.Categorical.from_codes(c, categories=cube["categories"]),
+            "count": counts[h, m, c].astype("int64"),
+        })
+
+    return cached_frame(source, f"count_cube_{dataset}", build)
+
+
+def vacancies() -> pd.DataFrame:
+    """vacancies.json flattened (scoreBreakdown.* columns); list fields as JSON strings."""
+    source = data_path("vacancies.json")
+
+    def build() -> pd.DataFrame:
+        df = pd.json_normalize(load_json(source.name))
+        for col in df.columns:
+            if df[col].map(lambda v: isinstance(v, list)).any():
+                df[col] = df[col].map(json.dumps)
+        return df
+
+    return cached_frame(source, "vacancies", build)
+
+
+def load_geojson(name: str):
+    """Any GeoJSON in public/data as a GeoDataFrame."""
+    import geopandas as gpd
+
+    source = data_path(name)
+    return cached_frame(source, f"geo_{source.stem}", lambda: gpd.read_file(source))
+
+
+def neighborhoods():
+    """neighborhoods.geojson as a GeoDataFrame (EPSG:4326)."""
+    return load_geojson("neighborhoods.geojson")
+
+
+def tracts():
+    """Census tracts with food-desert attributes (food_deserts.geojson) as a GeoDataFrame."""
+    return load_geojson("food_deserts.geojson")
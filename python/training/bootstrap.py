@@ -0,0 +1,103 @@
+"""
+bootstrap.py — Batched (cluster) bootstrap for linear model coefficients.
+
+A resample is just a vector of non-negative integer weights over the rows
+(how many times each row was drawn), so B refits become one batched
+weighted least-squares solve:
+
+    β_b = (Xᵀ W_b X)⁻¹ Xᵀ W_b y      for all b at once
+
+with the B × k × k normal matrices built by a single einsum. Replicates are
+split into chunks, and each chunk runs on a thread pool (NumPy releases the
+GIL inside einsum/solve). Each chunk draws from its own child SeedSequence,
+so results are identical for any worker count.
+
+Cluster bootstrap resamples whole clusters (e.g. all months of one
+neighborhood) and expands the cluster counts to row weights.
+
+    from bootstrap import bootstrap, percentile_intervals
+    draws = bootstrap(X, y, n_boot=5000, clusters=panel["neighborhood_id"])
+    lo_hi = percentile_intervals(draws, alpha=0.05)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+CHUNK_SIZE = 500
+
+
+def resample_weights(rng: np.random.Generator, n_boot: int, cluster_codes: np.ndarray) -> np.ndarray:
+    """(n_boot × n_rows) draw counts; rows in the same cluster share their cluster's count."""
+    n_clusters = int(cluster_codes.max()) + 1
+    counts = rng.multinomial(n_clusters, np.full(n_clusters, 1.0 / n_clusters), size=n_boot)
+    return counts[:, cluster_codes].astype("float64")
+
+
+def batched_wls(X: np.ndarray, y: np.ndarray, W: np.ndarray) -> np.ndarray:
+    """Solve one weighted least-squares problem per row of W. Returns (B × k)."""
+    xtwx = np.einsum("bn,ni,nj->bij", W, X, X, optimize=True)
+    xtwy = W @ (X * y[:, None])
+    try:
+        return np.linalg.solve(xtwx, xtwy[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        # A resample can drop enough rows to make Xᵀ W X singular
+        return (np.linalg.pinv(xtwx) @ xtwy[..., None])[..., 0]
+
+
+def bootstrap(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_boot: int = 5000,
+    clusters=None,
+    seed: int = 0,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> np.ndarray:
+    """Coefficient draws (n_boot × k) from a pairs or cluster bootstrap.
+
+    `clusters` is any per-row label array; None resamples individual rows.
+    """
+    X = np.asarray(X, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    if clusters is None:
+        codes = np.arange(len(y))
+    else:
+        _, codes = np.unique(np.asarray(clusters), return_inverse=True)
+
+    sizes = [min(chunk_size, n_boot - start) for start in range(0, n_boot, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    def run(job: tuple[int, np.random.SeedSequence]) -> np.ndarray:
+        size, ss = job
+        W = resample_weights(np.random.default_rng(ss), size, codes)
+        return batched_wls(X, y, W)
+
+    workers = workers or min(len(sizes), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        return np.vstack(list(pool.map(run, zip(sizes, seeds))))
+
+
+def percentile_intervals(draws: np.ndarray, alpha: float = 0.05) -> np.ndarray:
+    """(k × 2) percentile interval per coefficient."""
+    return np.percentile(draws, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0).T
+
+
+def summarize(draws: np.ndarray, names: list[str], alpha: float = 0.05, quantiles: int = 21) -> dict:
+    """JSON-ready per-coefficient bootstrap summary.
+
+    `quantiles` evenly spaced quantiles (0..100%) describe each distribution
+    compactly enough for the frontend to draw it.
+    """
+    lo_hi = percentile_intervals(draws, alpha)
+    qs = np.percentile(draws, np.linspace(0, 100, quantiles), axis=0)
+    return {
+        name: {
+            "mean": round(float(draws[:, i].mean()), 6),
+            "std": round(float(draws[:, i].std(ddof=1)), 6),
+            "ci": [round(float(lo_hi[i, 0]), 6), round(float(lo_hi[i, 1]), 6)],
+            "quantiles": [round(float(q), 6) for q in qs[:, i]],
+        }
+        for i, name in enumerate(names)
+    }
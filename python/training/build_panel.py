@@ -0,0 +1,312 @@
+"""
+build_panel.py — Rebuild the Model 2 panel and cross-sectional CSVs.
+
+Derives every column documented in model2_codebook.json from the pipeline
+outputs (public/data/*.json via stl_data) and the staged event Parquet
+(scripts/staging.py):
+
+  - static features: demographics.json, vacancies.json, stops.geojson +
+    stop_stats.json (stops assigned to neighborhoods with an STRtree
+    point-in-polygon query), CSB 311 aggregates for the latest year
+  - monthly_crime_count / monthly_firearm_count: true per-neighborhood
+    incident counts grouped from staged crime, replacing the old
+    share × city-total estimate
+  - snapshot targets: crime.json neighborhood totals
+  - spatial lags (w_<column>): the row-standardized queen-contiguity mean of
+    the regressors, controls and targets over adjacent neighborhoods, for
+    every month in one sparse product (spatial_lag.py)
+
+Every step is a vectorized join or groupby. The panel is split by the
+periods in the codebook's "files" section, the cross-section by a seeded
+80/20 shuffle of neighborhoods, and row counts are written back to the
+codebook.
+
+Usage (from python/training/):
+    python build_panel.py
+    python build_panel.py --start 2021-01 --end 2024-12
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+TRAINING_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TRAINING_DIR.parent))
+sys.path.insert(0, str(TRAINING_DIR.parent / "scripts"))
+
+try:
+    import numpy as np
+    import pandas as pd
+    import shapely
+
+    import staging
+    import stl_data
+    from spatial_lag import PREFIX, add_spatial_lags, contiguity
+except ImportError:
+    sys.exit("Missing dependency: uv sync")
+
+CODEBOOK_PATH = TRAINING_DIR / "model2_codebook.json"
+
+PANEL_START = "2021-01"
+PANEL_END = "2024-03"
+CROSS_SECTION_TEST_FRAC = 0.2
+SEED = 42
+
+COLUMNS = [
+    "neighborhood_id", "neighborhood_name", "month", "year", "month_num",
+    "population", "pct_black", "pct_white", "pct_hispanic",
+    "total_housing_units", "census_vacancy_rate", "census_vacant_units",
+    "active_vacancy_count", "avg_condition_rating", "condemned_count",
+    "total_violation_count", "violations_per_vacancy",
+    "transit_stop_count", "transit_trip_count", "transit_route_count", "transit_trips_per_1000pop",
+    "csb_complaint_count", "csb_vacant_bldg_complaints", "csb_avg_resolution_days", "complaints_per_1000pop",
+    "city_monthly_crime", "monthly_crime_count", "monthly_firearm_count",
+    "neigh_total_crime_snapshot", "firearm_incidents_snapshot",
+    "crime_rate_per_1000pop", "firearm_rate_per_1000pop",
+]
+# Spatially lagged as w_<column>: ols.py/panel_fe.py regressors, controls and targets
+LAG_COLUMNS = [
+    "active_vacancy_count", "transit_stop_count", "csb_complaint_count", "csb_vacant_bldg_complaints",
+    "avg_condition_rating", "census_vacancy_rate", "complaints_per_1000pop",
+    "population", "pct_black", "pct_hispanic",
+    "monthly_crime_count", "monthly_firearm_count", "crime_rate_per_1000pop",
+]
+INT_COLUMNS = [
+    "population", "total_housing_units", "census_vacant_units",
+    "active_vacancy_count", "condemned_count", "total_violation_count",
+    "transit_stop_count", "transit_trip_count", "transit_route_count",
+    "csb_complaint_count", "csb_vacant_bldg_complaints",
+    "city_monthly_crime", "monthly_crime_count", "monthly_firearm_count",
+    "neigh_total_crime_snapshot", "firearm_incidents_snapshot",
+]
+
+
+def log(msg: str):
+    print(f"  → {msg}")
+
+
+def nhd_ids(values: pd.Series) -> pd.Series:
+    """Zero-padded NHD_NUM strings; non-numeric values become NA."""
+    nums = pd.to_numeric(values, errors="coerce").astype("Int64")
+    return nums.astype("string").str.zfill(2)
+
+
+def per_1000(count: pd.Series, population: pd.Series) -> pd.Series:
+    return (count / population.where(population > 0) * 1000).fillna(0.0)
+
+
+# ── Static neighborhood features ─────────────────────────────────────────────
+
+def demographics() -> pd.DataFrame:
+    raw = pd.json_normalize(
+        [{"neighborhood_id": nhd_id, **rec} for nhd_id, rec in stl_data.load_json("demographics.json").items()]
+    )
+    pop = raw["population.2020"].fillna(0).astype(int)
+    units = raw["housing.totalUnits"].fillna(0).astype(int)
+    vacant = raw["housing.vacant"].fillna(0).astype(int)
+
+    def pct(col: str) -> pd.Series:
+        return (raw[col] / pop.where(pop > 0) * 100).fillna(0.0)
+
+    return pd.DataFrame({
+        "neighborhood_id": nhd_ids(raw["neighborhood_id"]),
+        "neighborhood_name": raw["name"],
+        "population": pop,
+        "pct_black": pct("race.black"),
+        "pct_white": pct("race.white"),
+        "pct_hispanic": pct("race.hispanic"),
+        "total_housing_units": units,
+        "census_vacancy_rate": (vacant / units.where(units > 0) * 100).fillna(0.0),
+        "census_vacant_units": vacant,
+    }).dropna(subset=["neighborhood_id"])
+
+
+def vacancy_features() -> pd.DataFrame:
+    vac = stl_data.vacancies()
+    vac = vac.assign(neighborhood_id=nhd_ids(vac["neighborhood"])).dropna(subset=["neighborhood_id"])
+    out = vac.groupby("neighborhood_id").agg(
+        active_vacancy_count=("neighborhood_id", "size"),
+        avg_condition_rating=("conditionRating", "mean"),
+        condemned_count=("condemned", "sum"),
+        total_violation_count=("violationCount", "sum"),
+    )
+    out["violations_per_vacancy"] = out["total_violation_count"] / out["active_vacancy_count"]
+    return out.reset_index()
+
+
+def transit_features() -> pd.DataFrame:
+    hoods = stl_data.load_json("neighborhoods.geojson")["features"]
+    polys = shapely.from_geojson([json.dumps(f["geometry"]) for f in hoods])
+    hood_ids = nhd_ids(pd.Series([f["properties"].get("NHD_NUM") for f in hoods]))
+
+    stops = stl_data.load_json("stops.geojson")["features"]
+    coords = np.array([f["geometry"]["coordinates"] for f in stops], dtype="float64").reshape(-1, 2)
+    stop_idx, hood_idx = shapely.STRtree(polys).query(shapely.points(coords), predicate="within")
+    # A stop on a shared boundary matches both polygons; keep the first
+    stop_hood = pd.Series(hood_ids.to_numpy()[hood_idx], index=stop_idx)
+    stop_hood = stop_hood[~stop_hood.index.duplicated()]
+
+    stats = stl_data.load_json("stop_stats.json")
+    assigned = pd.DataFrame({
+        "neighborhood_id": stop_hood.to_numpy(),
+        "stop_id": [stops[i]["properties"]["stop_id"] for i in stop_hood.index],
+    })
+    assigned["trip_count"] = assigned["stop_id"].map(lambda s: stats.get(s, {}).get("trip_count", 0))
+    assigned["routes"] = assigned["stop_id"].map(lambda s: stats.get(s, {}).get("routes", []))
+
+    out = assigned.groupby("neighborhood_id").agg(
+        transit_stop_count=("stop_id", "size"),
+        transit_trip_count=("trip_count", "sum"),
+    )
+    routes = assigned.explode("routes").dropna(subset=["routes"])
+    out["transit_route_count"] = routes.groupby("neighborhood_id")["routes"].nunique()
+    log(f"Transit: {len(assigned):,} of {len(stops):,} stops inside a neighborhood")
+    return out.reset_index()
+
+
+def csb_features(year: int) -> pd.DataFrame:
+    csb = staging.read(
+        "csb",
+        columns=["requested_at", "closed_at", "category", "neighborhood"],
+        filters=[("year", "=", year)],
+    )
+    csb["neighborhood_id"] = nhd_ids(csb["neighborhood"])
+    csb = csb.dropna(subset=["neighborhood_id"])
+    res_days = (csb["closed_at"] - csb["requested_at"]).dt.days
+    csb["res_days"] = res_days.where((csb["closed_at"] > csb["requested_at"]) & (res_days < 365))
+    csb["vacant_bldg"] = csb["category"].fillna("").str.contains("vacant", case=False)
+    out = csb.groupby("neighborhood_id").agg(
+        csb_complaint_count=("neighborhood_id", "size"),
+        csb_vacant_bldg_complaints=("vacant_bldg", "sum"),
+        csb_avg_resolution_days=("res_days", "mean"),
+    )
+    log(f"CSB {year}: {len(csb):,} requests")
+    return out.reset_index()
+
+
+def crime_snapshot() -> pd.DataFrame:
+    stats = stl_data.neighborhood_stats("crime")
+    return pd.DataFrame({
+        "neighborhood_id": nhd_ids(stats.index.to_series()).to_numpy(),
+        "neigh_total_crime_snapshot": stats["total"].to_numpy(),
+        "firearm_incidents_snapshot": stats["firearmIncidents"].to_numpy(),
+    }).dropna(subset=["neighborhood_id"])
+
+
+# ── Monthly crime counts ─────────────────────────────────────────────────────
+
+def monthly_crime(start: str, end: str) -> tuple[pd.DataFrame, pd.Series]:
+    """(neighborhood_id, month) incident counts and the city-wide monthly total."""
+    first, last = pd.Period(start, "M"), pd.Period(end, "M")
+    crime = staging.read(
+        "crime",
+        columns=["occurred_at", "neighborhood_num", "firearm"],
+        filters=[("year", ">=", first.year), ("year", "<=", last.year)],
+    )
+    crime["month"] = crime["occurred_at"].dt.to_period("M")
+    crime = crime[(crime["month"] >= first) & (crime["month"] <= last)]
+    crime["month"] = crime["month"].astype(str)
+    log(f"Crime {start}..{end}: {len(crime):,} incidents")
+
+    city = crime.groupby("month").size().rename("city_monthly_crime")
+    crime["neighborhood_id"] = nhd_ids(crime["neighborhood_num"])
+    counts = crime.dropna(subset=["neighborhood_id"]).groupby(["neighborhood_id", "month"]).agg(
+        monthly_crime_count=("month", "size"),
+        monthly_firearm_count=("firearm", "sum"),
+    )
+    return counts.reset_index(), city
+
+
+# ── Assemble ─────────────────────────────────────────────────────────────────
+
+def build_panel(start: str = PANEL_START, end: str = PANEL_END) -> pd.DataFrame:
+    csb_year = stl_data.load_json("csb_latest.json")["year"]
+    static = demographics()
+    for features in (vacancy_features(), transit_features(), csb_features(csb_year), crime_snapshot()):
+        static = static.merge(features, on="neighborhood_id", how="left")
+
+    pop = static["population"]
+    static["transit_trips_per_1000pop"] = per_1000(static["transit_trip_count"].fillna(0), pop)
+    static["complaints_per_1000pop"] = per_1000(static["csb_complaint_count"].fillna(0), pop)
+    static["crime_rate_per_1000pop"] = per_1000(static["neigh_total_crime_snapshot"].fillna(0), pop)
+    static["firearm_rate_per_1000pop"] = per_1000(static["firearm_incidents_snapshot"].fillna(0), pop)
+
+    months = pd.period_range(start, end, freq="M")
+    grid = static.merge(pd.DataFrame({"month": months.astype(str)}), how="cross")
+    grid["year"] = grid["month"].str[:4].astype(int)
+    grid["month_num"] = grid["month"].str[5:].astype(int)
+
+    counts, city = monthly_crime(start, end)
+    panel = grid.merge(counts, on=["neighborhood_id", "month"], how="left")
+    panel["city_monthly_crime"] = panel["month"].map(city)
+
+    panel[INT_COLUMNS] = panel[INT_COLUMNS].fillna(0).astype(int)
+    float_cols = [c for c in COLUMNS if c not in INT_COLUMNS and panel[c].dtype.kind == "f"]
+    panel[float_cols] = panel[float_cols].fillna(0.0).round(2)
+    panel[["census_vacancy_rate", "csb_avg_resolution_days"]] = panel[
+        ["census_vacancy_rate", "csb_avg_resolution_days"]
+    ].round(1)
+
+    lag_columns = [PREFIX + c for c in LAG_COLUMNS]
+    panel = add_spatial_lags(panel, LAG_COLUMNS, contiguity())
+    panel[lag_columns] = panel[lag_columns].round(2)
+
+    return panel.sort_values(["neighborhood_id", "month"], ignore_index=True)[COLUMNS + lag_columns]
+
+
+def period(codebook: dict, name: str) -> tuple[str, str]:
+    first, last = codebook["files"][name]["period"].split(" to ")
+    return first.strip(), last.strip()
+
+
+def split_cross_section(panel: pd.DataFrame, seed: int = SEED) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """One row per neighborhood (first panel month), split 80/20 by neighborhood."""
+    first = panel[panel["month"] == panel["month"].min()]
+    ids = first["neighborhood_id"].to_numpy()
+    shuffled = np.random.default_rng(seed).permutation(ids)
+    n_test = round(len(ids) * CROSS_SECTION_TEST_FRAC)
+    test_ids = set(shuffled[:n_test])
+    is_test = first["neighborhood_id"].isin(test_ids)
+    return first[~is_test], first[is_test]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the Model 2 panel/cross-sectional CSVs")
+    parser.add_argument("--start", default=PANEL_START, help="First panel month (YYYY-MM)")
+    parser.add_argument("--end", default=PANEL_END, help="Last panel month (YYYY-MM)")
+    parser.add_argument("--seed", type=int, default=SEED, help="Cross-section split seed")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    with open(CODEBOOK_PATH) as f:
+        codebook = json.load(f)
+
+    panel = build_panel(args.start, args.end)
+    train_start, train_end = period(codebook, "panel_train.csv")
+    test_start, test_end = period(codebook, "panel_test.csv")
+    outputs = {
+        "panel_full.csv": panel,
+        "panel_train.csv": panel[panel["month"].between(train_start, train_end)],
+        "panel_test.csv": panel[panel["month"].between(test_start, test_end)],
+    }
+    outputs["crosssectional_train.csv"], outputs["crosssectional_test.csv"] = split_cross_section(panel, args.seed)
+
+    for name, df in outputs.items():
+        df.to_csv(TRAINING_DIR / name, index=False)
+        codebook["files"][name]["rows"] = len(df)
+        log(f"Wrote {name} ({len(df):,} rows)")
+
+    n_hoods, n_months = panel["neighborhood_id"].nunique(), panel["month"].nunique()
+    codebook["files"]["panel_full.csv"]["description"] = (
+        f"Full panel dataset: {n_hoods} neighborhoods × {n_months} months "
+        f"({args.start} to {args.end}). Use for fixed-effects regression."
+    )
+    with open(CODEBOOK_PATH, "w") as f:
+        json.dump(codebook, f, indent=2)
+    log(f"Done in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,13 @@ import pandas as pd
 import numpy as np
 import statsmodels.api as sm
 from sklearn.metrics import r2_score, mean_absolute_error
+import datetime
+import hashlib
 import json
+import os
+
+from bootstrap import bootstrap, summarize
+from scenarios import export_scenarios
 
 # ── Load data ──────────────────────────────────────────────────────────────
 train = pd.read_csv("crosssectional_train.csv")
@@ -38,3 +44,61 @@ y_test = test[TARGET]
 
 model = sm.OLS(y_train, X_train).fit()
 print(model.summary())
+
+# ── Bootstrap coefficient uncertainty ──────────────────────────────────────
+# One row per neighborhood, so a pairs bootstrap is the cluster bootstrap.
+N_BOOT = 5000
+draws = bootstrap(X_train.to_numpy(), y_train.to_numpy(), n_boot=N_BOOT, seed=42)
+boot = summarize(draws, list(X_train.columns))
+
+print(f"\nBootstrap 95% intervals ({N_BOOT} replicates):")
+for name in INTERVENTION_FEATURES:
+    lo, hi = boot[name]["ci"]
+    print(f"  {name:<28} {model.params[name]:>10.4f}  [{lo:.4f}, {hi:.4f}]")
+
+# ── Spatial spillover check (SLX) ──────────────────────────────────────────
+# Neighbors' intervention levels (w_* columns from spatial_lag.py) as extra
+# regressors. Diagnostic only: the exported model stays on ALL_FEATURES.
+LAG_FEATURES = [f"w_{name}" for name in INTERVENTION_FEATURES]
+if set(LAG_FEATURES) <= set(train.columns):
+    slx = sm.OLS(y_train, sm.add_constant(train[ALL_FEATURES + LAG_FEATURES])).fit()
+    print("\nSpatial spillover (SLX), neighbors' interventions:")
+    for name in LAG_FEATURES:
+        print(f"  {name:<30} {slx.params[name]:>10.4f}  (p={slx.pvalues[name]:.3f})")
+else:
+    print("\nNo w_* columns in the CSVs; rerun build_panel.py for the spatial spillover check")
+
+# ── Export model artifact ──────────────────────────────────────────────────
+# Full-precision parameters for predictor.py plus rounded views for the UI.
+# The model is fit on raw features, so scaling is the identity.
+out_path = "../../public/data/crime_model.json"
+feature_order = list(X_train.columns)  # ["const", *ALL_FEATURES]
+params = [float(v) for v in model.params[feature_order]]
+train_stats = train[ALL_FEATURES + [TARGET]].agg(["mean", "std", "min", "max"])
+export = {
+    "schemaVersion": 1,
+    "version": hashlib.sha256(json.dumps([feature_order, params]).encode()).hexdigest()[:12],
+    "trainedAt": datetime.date.today().isoformat(),
+    "target": TARGET,
+    "features": ALL_FEATURES,
+    "interventionFeatures": INTERVENTION_FEATURES,
+    "intercept": params[0],
+    "coef": params[1:],
+    "covariance": model.cov_params().loc[feature_order, feature_order].to_numpy().tolist(),
+    "scaling": {"center": [0.0] * len(ALL_FEATURES), "scale": [1.0] * len(ALL_FEATURES)},
+    "trainStats": {"n": int(model.nobs), **{col: train_stats[col].round(6).to_dict() for col in train_stats.columns}},
+    "coefficients": {k: round(float(v), 6) for k, v in model.params.items()},
+    "stdErrors": {k: round(float(v), 6) for k, v in model.bse.items()},
+    "bootstrap": {"replicates": N_BOOT, "alpha": 0.05, "coefficients": boot},
+    "r2Test": round(float(r2_score(y_test, model.predict(X_test))), 4),
+}
+os.makedirs(os.path.dirname(out_path), exist_ok=True)
+with open(out_path, "w") as f:
+    json.dump(export, f, separators=(",", ":"))
+print(f"\nWrote {out_path} (version {export['version']})")
+
+# ── What-if scenario lookup table ──────────────────────────────────────────
+hoods = pd.concat([train, test]).sort_values("neighborhood_id")
+scenario_path = "../../public/data/crime_scenarios.json"
+max_err = export_scenarios(model.params, hoods, TARGET, scenario_path)
+print(f"Wrote {scenario_path} ({len(hoods)} neighborhoods, max quantization error {max_err:.4f})")
@@ -0,0 +1,264 @@
+"""
+panel_fe.py — Two-way fixed-effects regression by iterative demeaning.
+
+Instead of adding one dummy column per neighborhood and per month (LSDV),
+the fixed effects are absorbed by alternating projections: y and X are
+repeatedly demeaned within neighborhood, then within month, until they stop
+changing (Frisch–Waugh–Lovell). The regression on the demeaned data gives
+the same slopes as LSDV while only ever holding n × k floats, and group
+means are single np.bincount passes.
+
+Standard errors are cluster-robust by neighborhood, with the same
+small-sample correction statsmodels applies to the LSDV fit
+(G/(G-1) · (N-1)/(N-K), K counting the absorbed dummies), so `bse` matches
+`sm.OLS(y, X + dummies).fit(cov_type="cluster")`. Inference uses t(G-1).
+
+Only regressors that vary within a neighborhood over time are identified
+under entity effects. The codebook regressors are all neighborhood-level
+(constant across months in panel_full.csv), so the default CLI run fits
+them with month effects only, still clustering by neighborhood; asking for
+two-way effects on them raises, since every column is absorbed.
+
+Usage (from python/training/):
+    python panel_fe.py                         # codebook regressors, month effects only
+    python panel_fe.py --effects pooled        # same regressors, no fixed effects
+    python panel_fe.py --effects twoway --x <time-varying columns ...>
+
+    from panel_fe import fit_fe
+    res = fit_fe(panel, "monthly_crime_count", ["active_vacancy_count"])
+    print(res.summary())
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import numpy as np
+    import pandas as pd
+    from scipy import stats
+except ImportError:
+    sys.exit("Missing dependency: uv sync")
+
+TRAINING_DIR = Path(__file__).resolve().parent
+
+ABSORBED_TOL = 1e-8  # demeaned column norm / raw norm below this → absorbed by the FE
+
+
+def demean(
+    values: np.ndarray,
+    groups: list[np.ndarray],
+    tol: float = 1e-10,
+    max_iter: int = 1000,
+) -> tuple[np.ndarray, int]:
+    """Project `values` (n × k) off every set of group dummies.
+
+    `groups` holds one integer code array per fixed effect. Returns the
+    demeaned copy and the number of sweeps it took to converge.
+    """
+    out = np.array(values, dtype="float64", copy=True)
+    if out.ndim == 1:
+        out = out[:, None]
+    counts = [np.bincount(g) for g in groups]
+    scale = max(float(np.abs(out).max(initial=0.0)), 1.0)
+
+    for sweep in range(1, max_iter + 1):
+        change = 0.0
+        for g, n in zip(groups, counts):
+            for j in range(out.shape[1]):
+                means = np.bincount(g, weights=out[:, j], minlength=len(n)) / np.maximum(n, 1)
+                shift = means[g]
+                out[:, j] -= shift
+                change = max(change, float(np.abs(shift).max(initial=0.0)))
+        if change <= tol * scale or len(groups) == 1:
+            return out, sweep
+    return out, max_iter
+
+
+@dataclass
+class FEResult:
+    names: list[str]
+    params: np.ndarray
+    bse: np.ndarray
+    tvalues: np.ndarray
+    pvalues: np.ndarray
+    conf_int: np.ndarray  # k × 2
+    cov: np.ndarray
+    nobs: int
+    n_clusters: int
+    n_entities: int
+    n_periods: int
+    df_resid: int
+    rsquared_within: float
+    dep_var: str
+    sweeps: int
+    dropped: list[str] = field(default_factory=list)
+    model: str = "Two-way FE"
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "coef": self.params,
+                "std err": self.bse,
+                "t": self.tvalues,
+                "P>|t|": self.pvalues,
+                "[0.025": self.conf_int[:, 0],
+                "0.975]": self.conf_int[:, 1],
+            },
+            index=self.names,
+        )
+
+    def summary(self) -> str:
+        width = 78
+        header = [
+            ("Dep. Variable:", self.dep_var, "No. Observations:", f"{self.nobs}"),
+            ("Model:", self.model, "Entities:", f"{self.n_entities}"),
+            ("Method:", "Within (demeaned)", "Time periods:", f"{self.n_periods}"),
+            ("Cov. Type:", "cluster", "No. Clusters:", f"{self.n_clusters}"),
+            ("R-squared (within):", f"{self.rsquared_within:.3f}", "Df Residuals:", f"{self.df_resid}"),
+        ]
+        lines = ["Panel Regression Results".center(width), "=" * width]
+        for l1, v1, l2, v2 in header:
+            lines.append(f"{l1:<20}{v1:>18}   {l2:<20}{v2:>17}")
+        lines.append("=" * width)
+        lines.append(f"{'':<20}{'coef':>10}{'std err':>10}{'t':>8}{'P>|t|':>8}{'[0.025':>11}{'0.975]':>11}")
+        lines.append("-" * width)
+        for i, name in enumerate(self.names):
+            lo, hi = self.conf_int[i]
+            lines.append(
+                f"{name[:20]:<20}{self.params[i]:>10.4g}{self.bse[i]:>10.3g}{self.tvalues[i]:>8.3f}"
+                f"{self.pvalues[i]:>8.3f}{lo:>11.3g}{hi:>11.3g}"
+            )
+        lines.append("=" * width)
+        if self.dropped:
+            lines.append(f"Absorbed by the fixed effects (dropped): {', '.join(self.dropped)}")
+        lines.append(f"Fixed effects absorbed in {self.sweeps} alternating-projection sweeps.")
+        return "\n".join(lines)
+
+
+def fit_fe(
+    df: pd.DataFrame,
+    y: str,
+    x: list[str],
+    entity: str = "neighborhood_id",
+    time: str | None = "month",
+    cluster: str | None = None,
+    alpha: float = 0.05,
+    entity_effects: bool = True,
+) -> FEResult:
+    """Regress `y` on `x` with entity and/or time fixed effects absorbed.
+
+    Columns that are constant within an entity or period (e.g. Census
+    features in the neighborhood panel) are collinear with the fixed effects
+    and are dropped, as LSDV would; ValueError if that leaves no regressor.
+    With `entity_effects=False` the entity column only sets the clusters, and
+    with `time=None` as well the fit is pooled OLS with a constant.
+    """
+    data = df[[y, *x, entity] + ([time] if time else []) + ([cluster] if cluster and cluster != entity else [])]
+    data = data.dropna()
+    ent_codes, ent_levels = pd.factorize(data[entity])
+    # An all-zero code array demeans by the grand mean, i.e. the constant of a pooled fit
+    groups = [ent_codes if entity_effects else np.zeros(len(data), dtype="int64")]
+    n_periods = 0
+    if time:
+        time_codes, time_levels = pd.factorize(data[time])
+        groups.append(time_codes)
+        n_periods = len(time_levels)
+    clusters = ent_codes if cluster in (None, entity) else pd.factorize(data[cluster])[0]
+
+    raw = data[[y, *x]].to_numpy(dtype="float64")
+    tilde, sweeps = demean(raw, groups)
+    y_t, X_t = tilde[:, 0], tilde[:, 1:]
+
+    raw_norm = np.linalg.norm(raw[:, 1:] - raw[:, 1:].mean(axis=0), axis=0)
+    keep = np.linalg.norm(X_t, axis=0) > ABSORBED_TOL * np.maximum(raw_norm, 1.0)
+    names = [c for c, k in zip(x, keep) if k]
+    dropped = [c for c, k in zip(x, keep) if not k]
+    X_t = X_t[:, keep]
+    if not names:
+        raise ValueError(
+            f"every regressor is absorbed by the fixed effects ({', '.join(dropped)}); "
+            "time-invariant features need a time-only or pooled spec"
+        )
+
+    n, k = X_t.shape
+    xtx_inv = np.linalg.pinv(X_t.T @ X_t)
+    params = xtx_inv @ (X_t.T @ y_t)
+    resid = y_t - X_t @ params
+
+    # Cluster "meat": sum over clusters of (X_g' u_g)(X_g' u_g)'
+    n_clusters = int(clusters.max()) + 1 if n else 0
+    scores = np.zeros((n_clusters, k))
+    np.add.at(scores, clusters, X_t * resid[:, None])
+    # LSDV column count incl. constant
+    k_total = k + (len(ent_levels) if entity_effects else 1) + max(n_periods - 1, 0)
+    correction = n_clusters / (n_clusters - 1) * (n - 1) / (n - k_total)
+    cov = correction * xtx_inv @ (scores.T @ scores) @ xtx_inv
+
+    bse = np.sqrt(np.diag(cov))
+    tvalues = params / bse
+    df_t = n_clusters - 1
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_t)
+    crit = stats.t.ppf(1 - alpha / 2, df_t)
+    conf_int = np.column_stack([params - crit * bse, params + crit * bse])
+
+    ss_tot = float(y_t @ y_t)
+    r2 = 1 - float(resid @ resid) / ss_tot if ss_tot > 0 else 0.0
+
+    return FEResult(
+        names=names,
+        params=params,
+        bse=bse,
+        tvalues=tvalues,
+        pvalues=pvalues,
+        conf_int=conf_int,
+        cov=cov,
+        nobs=n,
+        n_clusters=n_clusters,
+        n_entities=len(ent_levels),
+        n_periods=n_periods,
+        df_resid=n - k_total,
+        rsquared_within=r2,
+        dep_var=y,
+        sweeps=sweeps,
+        dropped=dropped,
+        model={(True, True): "Two-way FE", (True, False): "Entity FE", (False, True): "Time FE"}.get(
+            (entity_effects, bool(time)), "Pooled OLS"
+        ),
+    )
+
+
+def main():
+    with open(TRAINING_DIR / "model2_codebook.json") as f:
+        spec = json.load(f)["modeling_notes"]["panel_regression"]
+
+    parser = argparse.ArgumentParser(description="Two-way FE regression on the neighborhood panel")
+    parser.add_argument("--data", default=str(TRAINING_DIR / "panel_full.csv"))
+    parser.add_argument("--y", default=None, help="Dependent variable (default: monthly_crime_count)")
+    parser.add_argument("--x", nargs="+", default=spec["key_regressors"], help="Regressors")
+    parser.add_argument(
+        "--effects",
+        choices=["twoway", "entity", "time", "pooled"],
+        default=None,
+        help="Fixed effects (default: twoway with --x, time for the codebook's neighborhood-level regressors)",
+    )
+    args = parser.parse_args()
+    effects = args.effects or ("time" if args.x == spec["key_regressors"] else "twoway")
+
+    panel = pd.read_csv(args.data, dtype={"neighborhood_id": str})
+    y = args.y or next(c for c in ("monthly_crime_count", "est_monthly_crime_count") if c in panel.columns)
+    try:
+        res = fit_fe(
+            panel, y, args.x,
+            time="month" if effects in ("twoway", "time") else None,
+            entity_effects=effects in ("twoway", "entity"),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(res.summary())
+
+
+if __name__ == "__main__":
+    main()
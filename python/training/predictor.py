@@ -0,0 +1,68 @@
+"""
+predictor.py — Score the crime model from its exported artifact.
+
+Loads the JSON artifact written by ols.py (public/data/crime_model.json) and
+evaluates the linear model with nothing but the standard library, so a
+script or service that only needs predictions doesn't pay for importing
+statsmodels, sklearn or pandas. NumPy batches work too: the batch is
+multiplied against the coefficient list, which NumPy accepts directly, so
+numpy is never imported here.
+
+    from predictor import Predictor
+    model = Predictor.load("../../public/data/crime_model.json")
+    model.predict_one({"active_vacancy_count": 120, ...})
+    model.predict(X)              # (n × k) array in model.features order
+    model.standard_error(row)     # SE of the fitted mean from the covariance
+"""
+
+import json
+import math
+
+SCHEMA_VERSION = 1
+
+
+class Predictor:
+    def __init__(self, artifact: dict):
+        if artifact.get("schemaVersion") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported model artifact schema {artifact.get('schemaVersion')!r}")
+        self.artifact = artifact
+        self.version = artifact["version"]
+        self.target = artifact["target"]
+        self.features: list[str] = artifact["features"]
+        self.intercept: float = artifact["intercept"]
+        self.coef: list[float] = artifact["coef"]
+        self.covariance: list[list[float]] = artifact["covariance"]  # over [const, *features]
+        scaling = artifact.get("scaling") or {}
+        self.center: list[float] = scaling.get("center") or [0.0] * len(self.features)
+        self.scale: list[float] = scaling.get("scale") or [1.0] * len(self.features)
+        self._identity = all(c == 0.0 for c in self.center) and all(s == 1.0 for s in self.scale)
+
+    @classmethod
+    def load(cls, path: str) -> "Predictor":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _row(self, row) -> list[float]:
+        values = [float(row[f]) for f in self.features] if isinstance(row, dict) else [float(v) for v in row]
+        if len(values) != len(self.features):
+            raise ValueError(f"Expected {len(self.features)} features, got {len(values)}")
+        if self._identity:
+            return values
+        return [(v - c) / s for v, c, s in zip(values, self.center, self.scale)]
+
+    def predict_one(self, row) -> float:
+        """Prediction for one row: a dict keyed by feature name, or a sequence in `features` order."""
+        x = self._row(row)
+        return self.intercept + math.fsum(c * v for c, v in zip(self.coef, x))
+
+    def predict(self, batch):
+        """Predictions for an (n × k) NumPy array (columns in `features` order)."""
+        if not self._identity:
+            batch = (batch - self.center) / self.scale
+        return batch @ self.coef + self.intercept
+
+    def standard_error(self, row) -> float:
+        """Standard error of the fitted mean at `row`: sqrt(x' Σ x) with x = [1, *row]."""
+        x = [1.0] + self._row(row)
+        var = math.fsum(x[i] * self.covariance[i][j] * x[j] for i in range(len(x)) for j in range(len(x)))
+        return math.sqrt(max(var, 0.0))
@@ -0,0 +1,72 @@
+"""
+scenarios.py — Precomputed what-if lookup table for the crime simulator.
+
+Evaluates the fitted linear model over a dense grid of changes to the three
+intervention features for every neighborhood at once: one broadcasted
+tensor expression gives a (neighborhood × Δvacancy × Δstops × Δcomplaints)
+array, with the controls held at each neighborhood's own values. Counts are
+clipped so a delta can't take a feature below zero, and predicted rates are
+floored at zero.
+
+The table is quantized to uint16 with a single offset/scale and written as
+base64, so the frontend can trilinearly interpolate within a neighborhood's
+slice without any model code:
+
+    rate = offset + scale * data[((n * len(ax0) + i) * len(ax1) + j) * len(ax2) + k]
+"""
+
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+
+# Absolute changes per intervention feature (grid axes)
+AXES = {
+    "active_vacancy_count": np.arange(-200, 101, 20),
+    "transit_stop_count": np.arange(-10, 21, 5),
+    "csb_vacant_bldg_complaints": np.arange(-100, 101, 20),
+}
+
+
+def scenario_tensor(params: pd.Series, hoods: pd.DataFrame, axes: dict = AXES) -> np.ndarray:
+    """Predicted target for every neighborhood × grid point, shape (n_hoods, *axis lengths)."""
+    features = [f for f in params.index if f != "const"]
+    base = hoods[features].to_numpy(dtype="float64") @ params[features].to_numpy() + params.get("const", 0.0)
+
+    out = base.reshape(-1, *([1] * len(axes)))
+    for axis, (feature, deltas) in enumerate(axes.items()):
+        current = hoods[feature].to_numpy(dtype="float64")[:, None]
+        effective = np.maximum(deltas[None, :], -current)  # can't remove more than exist
+        shape = [len(hoods)] + [1] * len(axes)
+        shape[axis + 1] = len(deltas)
+        out = out + (params[feature] * effective).reshape(shape)
+    return np.maximum(out, 0.0)
+
+
+def quantize(values: np.ndarray) -> tuple[np.ndarray, float, float]:
+    lo, hi = float(values.min()), float(values.max())
+    scale = (hi - lo) / 65535 if hi > lo else 1.0
+    q = np.rint((values - lo) / scale).astype("<u2")
+    return q, lo, scale
+
+
+def export_scenarios(params: pd.Series, hoods: pd.DataFrame, target: str, out_path: str, axes: dict = AXES) -> float:
+    """Write the quantized table to `out_path`. Returns the max quantization error."""
+    table = scenario_tensor(params, hoods, axes)
+    q, offset, scale = quantize(table)
+    zero = tuple(int(np.flatnonzero(deltas == 0)[0]) for deltas in axes.values())
+    payload = {
+        "target": target,
+        "neighborhoods": hoods["neighborhood_id"].astype(str).str.zfill(2).tolist(),
+        "baseline": [round(float(v), 3) for v in table[(slice(None), *zero)]],
+        "axes": {feature: deltas.tolist() for feature, deltas in axes.items()},
+        "shape": list(table.shape),
+        "dtype": "uint16",
+        "offset": offset,
+        "scale": scale,
+        "data": base64.b64encode(q.tobytes()).decode("ascii"),
+    }
+    with open(out_path, "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    return float(np.abs(offset + q * scale - table).max())
@@ -0,0 +1,84 @@
+"""
+spatial_lag.py — Spatial-lag (W·x) features for the neighborhood panel.
+
+W is the queen contiguity of neighborhoods.geojson (scripts/hotspots.py,
+cached under data/cache/), and a lag is the mean of x over a neighborhood's
+adjacent neighborhoods. Lagging every column in every month is two sparse
+products: the panel is laid out as a neighborhoods × (months · columns)
+matrix, and W times the values divided by W times a has-a-value mask
+averages only the neighbors actually observed in that month.
+
+    from spatial_lag import add_spatial_lags, contiguity
+    panel = add_spatial_lags(panel, ["monthly_crime_count", "active_vacancy_count"], contiguity())
+    # → w_monthly_crime_count, w_active_vacancy_count
+
+Neighborhoods without a polygon and rows without a month get NaN lags; a
+neighborhood with no observed neighbors that month (e.g. an island) gets 0.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+TRAINING_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TRAINING_DIR.parent))
+sys.path.insert(0, str(TRAINING_DIR.parent / "scripts"))
+
+try:
+    import numpy as np
+    import pandas as pd
+    import shapely
+
+    import stl_data
+    from hotspots import SpatialWeights
+except ImportError:
+    sys.exit("Missing dependency: uv sync")
+
+PREFIX = "w_"
+
+
+def contiguity() -> SpatialWeights:
+    """Queen contiguity of neighborhoods.geojson, ids as zero-padded NHD_NUM strings."""
+    hoods = [f for f in stl_data.load_json("neighborhoods.geojson")["features"] if f.get("geometry")]
+    polys = shapely.from_geojson([json.dumps(f["geometry"]) for f in hoods])
+    ids = pd.to_numeric(pd.Series([f["properties"].get("NHD_NUM") for f in hoods]), errors="coerce")
+    ids = ids.astype("Int64").astype("string").str.zfill(2).fillna("")
+    return SpatialWeights.queen(polys, ids.to_numpy(dtype=str), cache_dir=stl_data.CACHE_DIR)
+
+
+def add_spatial_lags(
+    panel: pd.DataFrame,
+    columns: list[str],
+    weights: SpatialWeights,
+    entity: str = "neighborhood_id",
+    time: str = "month",
+    prefix: str = PREFIX,
+) -> pd.DataFrame:
+    """Copy of `panel` with a `prefix + column` spatial lag for each of `columns`.
+
+    Each lag averages the neighbors that have a non-missing value in the
+    same month; (neighborhood, month) pairs absent from the panel are left
+    out of the mean rather than counted as 0.
+    """
+    present = np.isin(weights.ids, panel[entity].dropna().unique())
+    ids = weights.ids[present]
+    W = weights.matrix[present][:, present]
+
+    hood = pd.Categorical(panel[entity], categories=ids).codes
+    period, periods = pd.factorize(panel[time])
+    ok = (hood >= 0) & (period >= 0)  # factorize gives NaN months -1
+
+    values = panel[columns].to_numpy(dtype="float64")
+    observed = np.zeros((len(ids), len(periods), len(columns)))
+    totals = np.zeros(observed.shape)
+    observed[hood[ok], period[ok]] = ~np.isnan(values[ok])
+    totals[hood[ok], period[ok]] = np.nan_to_num(values[ok])
+
+    flat = (len(ids), -1)
+    sums = (W @ totals.reshape(flat)).reshape(totals.shape)
+    counts = (W @ observed.reshape(flat)).reshape(totals.shape)
+    lagged = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    out = np.full(values.shape, np.nan)
+    out[ok] = lagged[hood[ok], period[ok]]
+    return panel.assign(**{prefix + c: out[:, j] for j, c in enumerate(columns)})
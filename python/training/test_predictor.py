@@ -0,0 +1,109 @@
+"""
+test_predictor.py — predictor.py against a NumPy least-squares fit.
+
+    uv run pytest training/test_predictor.py     # or: python test_predictor.py
+
+Builds an artifact in the crime_model.json layout from a synthetic fit, so
+no trained model is needed. The import check only looks at which modules
+predictor.py pulls in; set PREDICTOR_IMPORT_BUDGET_MS to also time it
+(off by default: wall-clock limits depend on the machine).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from predictor import SCHEMA_VERSION, Predictor
+
+TRAINING_DIR = Path(__file__).resolve().parent
+HEAVY_MODULES = {"numpy", "pandas", "scipy", "sklearn", "statsmodels"}
+FEATURES = ["active_vacancy_count", "transit_stop_count", "population"]
+
+
+def fitted_artifact(seed: int = 0) -> tuple[dict, np.ndarray, np.ndarray]:
+    """(artifact, X_test, expected) from an OLS fit on synthetic data."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(120, len(FEATURES))) * [40, 5, 3000] + [100, 10, 8000]
+    y = 3 + X @ [0.05, -0.4, 0.001] + rng.normal(size=len(X))
+    design = np.column_stack([np.ones(len(X)), X])
+    params, *_ = np.linalg.lstsq(design[:80], y[:80], rcond=None)
+    resid = y[:80] - design[:80] @ params
+    cov = np.linalg.inv(design[:80].T @ design[:80]) * (resid @ resid / (80 - design.shape[1]))
+    artifact = {
+        "schemaVersion": SCHEMA_VERSION,
+        "version": "test",
+        "target": "y",
+        "features": FEATURES,
+        "intercept": float(params[0]),
+        "coef": params[1:].tolist(),
+        "covariance": cov.tolist(),
+        "scaling": {"center": [0.0] * len(FEATURES), "scale": [1.0] * len(FEATURES)},
+    }
+    return artifact, X[80:], design[80:] @ params
+
+
+def test_batch_matches_fit():
+    artifact, X, expected = fitted_artifact()
+    assert np.allclose(Predictor(artifact).predict(X), expected, rtol=1e-12, atol=1e-9)
+
+
+def test_rows_match_fit():
+    artifact, X, expected = fitted_artifact()
+    predictor = Predictor(artifact)
+    by_name = [predictor.predict_one(dict(zip(FEATURES, row))) for row in X]
+    by_position = [predictor.predict_one(row) for row in X]
+    assert np.allclose(by_name, expected, rtol=1e-12, atol=1e-9)
+    assert np.allclose(by_position, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_standard_error_matches_covariance():
+    artifact, X, _ = fitted_artifact()
+    predictor = Predictor(artifact)
+    cov = np.array(artifact["covariance"])
+    for row in X[:5]:
+        x = np.concatenate([[1.0], row])
+        assert np.isclose(predictor.standard_error(row), np.sqrt(x @ cov @ x), rtol=1e-10)
+
+
+def test_load_round_trip():
+    artifact, X, expected = fitted_artifact()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "crime_model.json"
+        path.write_text(json.dumps(artifact))
+        assert np.allclose(Predictor.load(str(path)).predict(X), expected, rtol=1e-12, atol=1e-9)
+
+
+def test_rejects_unknown_schema():
+    artifact, _, _ = fitted_artifact()
+    try:
+        Predictor({**artifact, "schemaVersion": SCHEMA_VERSION + 1})
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for an unknown schemaVersion")
+
+
+def test_import_is_lightweight():
+    probe = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import sys, predictor; print(','.join(sorted(sys.modules)))"],
+        capture_output=True, text=True, check=True, cwd=TRAINING_DIR,
+    )
+    heavy = HEAVY_MODULES & set(probe.stdout.strip().split(","))
+    assert not heavy, f"predictor.py imports {sorted(heavy)}"
+
+    budget_ms = os.environ.get("PREDICTOR_IMPORT_BUDGET_MS")
+    if budget_ms:
+        line = next(line for line in probe.stderr.splitlines() if line.rstrip().endswith("| predictor"))
+        import_ms = int(line.split("|")[1]) / 1000
+        assert import_ms < float(budget_ms), f"predictor import took {import_ms:.1f}ms"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"  → {name} ok")
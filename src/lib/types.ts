@@ -1,23 +1,132 @@
 // ── 311 Complaints ──────────────────────────────────────────
 
-export interface NeighborhoodStats {
+/** Streaming-sketch quantiles in days (~1% relative error); null when count is 0 */
+export interface QuantileSummary {
+  count: number
+  p50: number | null
+  p90: number | null
+  p99: number | null
+}
+
+/** Getis-Ord Gi* (queen contiguity); z > 1.96 with p < 0.05 is a hotspot */
+export interface GiStar {
+  z: number
+  p: number
+}
+
+/** Per-neighborhood Gi* for the target year, present once neighborhoods.geojson exists */
+export interface HotspotStats {
+  giStar?: GiStar // all categories
+  giStarMonthly?: Record<string, number> // YYYY-MM → z
+  giStarCategories?: Record<string, GiStar> // significant categories only
+}
+
+/** Next-months count forecast (damped seasonal Holt-Winters) with a `level` prediction interval */
+export interface ForecastSeries {
+  mean: Array<number>
+  lo: Array<number>
+  hi: Array<number>
+}
+
+/** A day whose count spiked above its same-weekday baseline (robust z ≥ 3.5) */
+export interface DailyAlert {
+  date: string // YYYY-MM-DD
+  series: 'city' | 'neighborhood' | 'category'
+  key: string // 'all', zero-padded NHD_NUM, or category name
+  count: number
+  expected: number // mean of the same weekday over the previous 8 weeks
+  z: number
+}
+
+export interface CountForecast {
+  months: Array<string> // YYYY-MM, aligned with each series
+  level: number // interval coverage, e.g. 0.9
+  city: ForecastSeries
+  categories: Record<string, ForecastSeries>
+}
+
+/** Per-neighborhood forecast; category series only for the neighborhood's top categories */
+export interface NeighborhoodForecast extends ForecastSeries {
+  categories: Record<string, ForecastSeries>
+}
+
+export interface NeighborhoodStats extends HotspotStats {
   name: string
   total: number
   closed: number
   avgResolutionDays: number
   topCategories: Record<string, number>
+  resolutionDays?: QuantileSummary
+  openAgeDays?: QuantileSummary
+  forecast?: NeighborhoodForecast
 }
 
 export interface CSBData {
   year: number
   totalRequests: number
   categories: Record<string, number>
+  categoryGroups?: Record<string, number> // categories rolled up by keyword group
+  resolutionDays?: QuantileSummary
+  openAgeDays?: QuantileSummary // age of still-open tickets as of openAsOf
+  openAsOf?: string | null
+  resolutionByCategory?: Record<string, QuantileSummary>
+  openAgeByCategory?: Record<string, QuantileSummary>
   neighborhoods: Record<string, NeighborhoodStats>
   dailyCounts: Record<string, number>
+  alerts?: Array<DailyAlert> // newest first
   monthly: Record<string, Record<string, number>>
   hourly: Record<string, number>
   weekday: Record<string, number>
   heatmapPoints: Array<[number, number, string, string?, string?]> // [lat, lng, category, date?, neighborhood?]
+  forecast?: CountForecast | null
+}
+
+/**
+ * crime_cube.json / csb_cube.json: counts by neighborhood × month × category
+ * (the pipeline's year window). `counts` is base64 of a little-endian `dtype`
+ * array in C order: counts[(n * months.length + m) * categories.length + c].
+ */
+export interface CountCube {
+  dims: ['neighborhood', 'month', 'category']
+  neighborhoods: Array<string>
+  months: Array<string> // contiguous YYYY-MM range
+  categories: Array<string>
+  total: number
+  outOfRange: number // rows dated outside the pipeline's year window, not counted
+  shape: [number, number, number]
+  dtype: 'uint8' | 'uint16' | 'uint32'
+  counts: string
+  hourWeekday: {
+    dims: ['month', 'weekday', 'hour'] // weekday 0 = Monday
+    shape: [number, 7, 24]
+    dtype: 'uint8' | 'uint16' | 'uint32'
+    counts: string
+  }
+  giStar?: { dtype: 'int16'; scale: number; z: string } // Gi* z per cell (× scale), same layout as counts
+}
+
+export interface DensityManifest {
+  bounds: [number, number, number, number] // west, south, east, north
+  coordinates: [[number, number], [number, number], [number, number], [number, number]] // NW, NE, SE, SW
+  shape: [number, number] // rows, cols
+  cellMeters: number
+  bandwidthMeters: number
+  unit: 'events/km²'
+  years: [number, number] // first, last year included in 'all'
+  periods: Array<string> // the target year's YYYY-MM × 12, then 'YYYY', then 'all'
+  groups: Array<string> // 'All' first
+  path: string // e.g. 'density/csb/{group}/{period}.png', {group} = index into groups
+  events: Array<Array<number>> // [group][period]; 0 = no PNG written
+  max: Array<Array<number>> // [group][period] events/km² at pixel value 255
+  giStar?: {
+    // '{period}-gi.png' next to each density PNG: Gi* z = (pixel - 128) * zStep
+    bounds: [number, number, number, number]
+    coordinates: [[number, number], [number, number], [number, number], [number, number]]
+    shape: [number, number]
+    cellMeters: number
+    bandMeters: number
+    zStep: number
+  }
 }
 
 export interface TrendsData {
@@ -91,7 +200,9 @@ export interface VacantProperty {
   lotSqFt: number
   zoning: string
   taxYearsDelinquent: number
-  complaintsNearby: number
+  complaintsNearby: number // CSB complaints on the parcel (vacancy API)
+  crimeNearby?: number | null // staged crime within the first radius, all years
+  nearbyCounts?: Record<string, Record<string, number>> // dataset → radius (m) → count, all years
   proximityScore: number
   neighborhoodDemand: number
   boardUpStatus: string
@@ -144,12 +255,13 @@ export type VacancyBestUse = 'housing' | 'solar' | 'garden'
 
 // ── Crime ──────────────────────────────────────────────────
 
-export interface CrimeNeighborhoodStats {
+export interface CrimeNeighborhoodStats extends HotspotStats {
   name: string
   total: number
   topOffenses: Record<string, number>
   felonies: number
   firearmIncidents: number
+  forecast?: NeighborhoodForecast
 }
 
 export interface CrimeData {
@@ -160,10 +272,12 @@ export interface CrimeData {
   categories: Record<string, number>
   neighborhoods: Record<string, CrimeNeighborhoodStats>
   dailyCounts: Record<string, number>
+  alerts?: Array<DailyAlert> // newest first
   hourly: Record<string, number>
   weekday: Record<string, number>
   monthly: Record<string, Record<string, number>>
   heatmapPoints: Array<[number, number, string, string?, string?]> // [lat, lng, category, date?, neighborhood?]
+  forecast?: CountForecast | null
 }
 
 // ── ARPA Funds ─────────────────────────────────────────────